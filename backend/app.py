@@ -1,20 +1,50 @@
 # backend/app.py
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.requests import Request
 
-from config import ALLOWED_ORIGINS
-from database.database import init_db
-from routes import audio
+from config import ALLOWED_ORIGINS, OUTPUT_DIR, TTS_CACHE_PREWARM, MODEL_PRELOAD, DEGRADATION_ENABLED
+from database.database import init_db, close_db
+from routes import audio, jobs, stream
+from utils.logger import metrics, request_timer, REQUEST_SECONDS, REQUEST_PEAK_RSS
 
-# Initialize database
-init_db()
+async def prewarm_tts_cache():
+    """Render the canned fallback replies so Gemini outages (and template tiers) hit the TTS cache"""
+    tts_engine = await audio.registry.aget("tts_engine")
+    response_generator = await audio.registry.aget("response_generator")
+    phrases = response_generator.fallback_phrases()
+    await audio.inference_pool.run(tts_engine.prewarm, phrases)
+    if DEGRADATION_ENABLED:
+        await audio.inference_pool.run(tts_engine.prewarm, phrases, fast=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize database
+    init_db()
+    
+    # Load models in parallel in the background; /health answers immediately, /ready tracks them
+    if MODEL_PRELOAD:
+        audio.registry.start()
+    
+    # Resume jobs interrupted by the previous shutdown
+    await jobs.job_queue.start(await jobs.pending_job_ids())
+    
+    if TTS_CACHE_PREWARM and MODEL_PRELOAD:
+        app.state.tts_prewarm = asyncio.create_task(prewarm_tts_cache())
+    yield
+    await jobs.job_queue.stop()
+    await close_db()
 
 # Create FastAPI app
 app = FastAPI(
     title="MoodMate API",
     description="Emotion-aware wellness companion API",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -26,14 +56,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount outputs directory
-import os
-if not os.path.exists("outputs"):
-    os.makedirs("outputs")
-app.mount("/outputs", StaticFiles(directory="outputs"), name="outputs")
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Per-stage timings in a Server-Timing header, plus request latency / peak RSS metrics"""
+    with request_timer() as timer:
+        response = await call_next(request)
+        response.headers["Server-Timing"] = timer.server_timing()
+    
+    # Route template, not the raw path, so ids don't explode label cardinality
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    REQUEST_SECONDS.observe(timer.elapsed, method=request.method, route=route, status=response.status_code)
+    REQUEST_PEAK_RSS.observe(timer.peak_rss, route=route)
+    return response
+
+# Mount outputs directory (created by config)
+app.mount("/outputs", StaticFiles(directory=OUTPUT_DIR), name="outputs")
 
 # Include routes
 app.include_router(audio.router)
+app.include_router(jobs.router)
+app.include_router(stream.router)
 
 @app.get("/")
 def root():
@@ -42,7 +84,11 @@ def root():
         "docs": "/docs",
         "endpoints": {
             "process_audio": "POST /api/audio/process",
-            "mood_history": "GET /api/audio/history"
+            "job_status": "GET /api/audio/jobs/{job_id}",
+            "stream_audio": "WS /api/audio/stream",
+            "mood_history": "GET /api/audio/history",
+            "mood_analytics": "GET /api/audio/analytics",
+            "metrics": "GET /metrics"
         }
     }
 
@@ -50,6 +96,24 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 200 once every model is loaded and warmed up (or when loading lazily)"""
+    ready = audio.registry.ready or not MODEL_PRELOAD
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "loading",
+            "models": audio.registry.status(),
+            "degradation": audio.degradation.status()
+        }
+    )
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Stage latency histograms, queue depths, cache hit ratios, model load times, RSS (Prometheus text)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
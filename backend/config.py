@@ -8,6 +8,8 @@ load_dotenv()
 # Project paths
 BASE_DIR = Path(__file__).parent.parent
 BACKEND_DIR = Path(__file__).parent
+# Uploads, generated audio and on-disk caches (relative audio paths resolve against it)
+DATA_DIR = Path(os.getenv("DATA_DIR", BACKEND_DIR))
 
 # API Keys
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
@@ -15,18 +17,133 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./moodmate.db")
 
+def _async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# Connection pool (server databases; SQLite uses per-thread connections).
+# Postgres URLs need psycopg2 and asyncpg installed.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
 # Audio settings
 SAMPLE_RATE = 16000
 CHUNK_SIZE = 1024
-UPLOAD_DIR = BACKEND_DIR / "uploads"
-OUTPUT_DIR = BACKEND_DIR / "outputs"
+UPLOAD_DIR = DATA_DIR / "uploads"
+OUTPUT_DIR = DATA_DIR / "outputs"
 
 # Create directories
-UPLOAD_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# Upload limits
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "25"))
+MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", "300"))
+
+# Voice activity detection and segmenting
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "12"))  # speech must exceed the noise floor by this much
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "120"))
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "300"))  # shorter pauses stay inside a segment
+VAD_PAD_MS = int(os.getenv("VAD_PAD_MS", "100"))
+MAX_SEGMENT_SECONDS = float(os.getenv("MAX_SEGMENT_SECONDS", "10"))
+
+# Whisper transcription
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, ...
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "1"))  # model instances per worker
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "0"))  # 0 = greedy
+WHISPER_TEMPERATURE_FALLBACK = os.getenv("WHISPER_TEMPERATURE_FALLBACK", "true").lower() == "true"
+WHISPER_CONDITION_ON_PREVIOUS = os.getenv("WHISPER_CONDITION_ON_PREVIOUS", "true").lower() == "true"
+WHISPER_LITE_MODEL = os.getenv("WHISPER_LITE_MODEL", "tiny")  # used by the "minimal" degradation tier
 
 # TTS settings
 TTS_MODE = os.getenv("TTS_MODE", "quality")  # "quality" or "fast"
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "256"))
+TTS_CACHE_MAX_AGE_HOURS = float(os.getenv("TTS_CACHE_MAX_AGE_HOURS", "168"))
+TTS_CACHE_PREWARM = os.getenv("TTS_CACHE_PREWARM", "true").lower() == "true"
+
+# Gemini response cache
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "600"))  # seconds
+
+# Per-upload inference cache (transcript, features, raw model scores by content hash)
+INFERENCE_CACHE_ENABLED = os.getenv("INFERENCE_CACHE_ENABLED", "true").lower() == "true"
+INFERENCE_CACHE_PATH = DATA_DIR / "model_cache" / "inference.sqlite3"
+INFERENCE_CACHE_MAX_MB = float(os.getenv("INFERENCE_CACHE_MAX_MB", "128"))
+
+# Model loading
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "true").lower() == "true"  # false: load on first use
+MODEL_LOAD_WORKERS = int(os.getenv("MODEL_LOAD_WORKERS", "4"))
+
+# Shared model server (model_server.py); empty = every web worker loads its own models
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET", "")
+MODEL_SERVER_THREADS = int(os.getenv("MODEL_SERVER_THREADS", "8"))  # concurrent model calls in the server
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", "300"))  # seconds per call
+MODEL_SERVER_SHM_MIN_KB = int(os.getenv("MODEL_SERVER_SHM_MIN_KB", "64"))  # larger arrays go through shared memory
+
+# Inference worker pool
+INFERENCE_CONCURRENCY = int(os.getenv("INFERENCE_CONCURRENCY", "2"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "8"))
+INFERENCE_QUEUE_TIMEOUT = float(os.getenv("INFERENCE_QUEUE_TIMEOUT", "30"))
+INFERENCE_STAGE_PARALLELISM = int(os.getenv("INFERENCE_STAGE_PARALLELISM", "3"))  # stages one request runs at once
+
+# Adaptive degradation: under load, step requests down through cheaper tiers
+# (full → fast_tts → template → minimal, see utils/degradation.py) and back up as load drops.
+# Off by default. To tune it, first measure the pipeline's normal latency under
+# light load (GET /metrics, stage histograms):
+#   - TARGET_SECONDS must sit well above that (about 2-3x the p95), or the
+#     node degrades on a CPU-only host even when it isn't overloaded
+#   - STEP_UP is the fraction of the target (or of pool capacity) that
+#     triggers a drop; raise it toward 1.0 to degrade later
+#   - keep STEP_DOWN well below STEP_UP so tiers don't flap
+#   - MAX_TIER=2 never reaches "minimal", so the lite Whisper is never loaded;
+#     otherwise it loads on first use, not at startup
+DEGRADATION_ENABLED = os.getenv("DEGRADATION_ENABLED", "false").lower() == "true"
+DEGRADATION_MAX_TIER = int(os.getenv("DEGRADATION_MAX_TIER", "3"))  # 0 = never degrade
+DEGRADATION_TARGET_SECONDS = float(os.getenv("DEGRADATION_TARGET_SECONDS", "30"))  # pipeline latency budget
+DEGRADATION_STEP_UP = float(os.getenv("DEGRADATION_STEP_UP", "0.8"))  # load at which to drop a tier
+DEGRADATION_STEP_DOWN = float(os.getenv("DEGRADATION_STEP_DOWN", "0.5"))  # load below which to recover
+DEGRADATION_STEP_SECONDS = float(os.getenv("DEGRADATION_STEP_SECONDS", "5"))  # min time between drops
+DEGRADATION_RECOVER_SECONDS = float(os.getenv("DEGRADATION_RECOVER_SECONDS", "20"))  # calm time per recovery step
+
+# WebSocket streaming
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "3.0"))  # emotion window
+STREAM_UPDATE_SECONDS = float(os.getenv("STREAM_UPDATE_SECONDS", "1.0"))  # partial result interval
+STREAM_TRANSCRIBE_WINDOW_SECONDS = float(os.getenv("STREAM_TRANSCRIBE_WINDOW_SECONDS", "10"))  # most audio one partial re-transcribes
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "120"))
+
+# Async job pipeline
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "15"))  # how often each web worker looks for queued jobs
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))  # a running job without a heartbeat this long is re-queued
+JOB_UPLOAD_DIR = UPLOAD_DIR / "jobs"
+JOB_UPLOAD_DIR.mkdir(exist_ok=True)
+
+# Classifier inference backends: "pytorch", "int8" (dynamic quantization) or "onnx"
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "pytorch")
+AUDIO_EMOTION_BACKEND = os.getenv("AUDIO_EMOTION_BACKEND", EMOTION_BACKEND)
+TEXT_SENTIMENT_BACKEND = os.getenv("TEXT_SENTIMENT_BACKEND", EMOTION_BACKEND)
+ONNX_CACHE_DIR = DATA_DIR / "model_cache" / "onnx"
+
+# Emotion model micro-batching
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "8"))
+EMOTION_BATCH_WAIT_MS = float(os.getenv("EMOTION_BATCH_WAIT_MS", "10"))
+
+# Fusion weights: audio, text, prosody
+FUSION_WEIGHTS = [float(w) for w in os.getenv("FUSION_WEIGHTS", "0.6,0.3,0.1").split(",")]
 
 # Emotion categories
 EMOTIONS = ["happy", "sad", "angry", "anxious", "calm", "neutral", "surprised"]
@@ -1,21 +1,162 @@
 # backend/database/database.py
-from sqlalchemy import create_engine
+import fcntl
+import json
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
-from database.models import Base
+from config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT, DB_POOL_RECYCLE, SQLITE_BUSY_TIMEOUT_MS
+)
+from database.models import Base, MoodEntry, score_columns
+from database.rollups import backfill_rollups
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+def _engine_options() -> dict:
+    """Pool settings: SQLite files share one connection per thread; servers get a sized pool"""
+    if IS_SQLITE:
+        return {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers run alongside the single writer; synchronous=NORMAL is
+    durable under WAL and skips an fsync per commit; busy_timeout makes a
+    writer wait for the lock instead of failing with "database is locked"
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-16000")  # 16 MB
+    cursor.close()
 
 # Create engine
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_engine(DATABASE_URL, **_engine_options())
+if IS_SQLITE:
+    event.listen(engine, "connect", _sqlite_pragmas)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers (aiosqlite / asyncpg); created on first use
+# so sync-only tools (scripts, migrations) don't need the async drivers
+_async_engine = None
+_async_sessionmaker = None
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        options = _engine_options()
+        if IS_SQLITE:
+            options = {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **options)
+        if IS_SQLITE:
+            event.listen(_async_engine.sync_engine, "connect", _sqlite_pragmas)
+    return _async_engine
+
+def AsyncSessionLocal():
+    """New AsyncSession; objects stay readable after commit"""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), expire_on_commit=False)
+    return _async_sessionmaker()
+
+# Arbitrary application-wide key for the Postgres advisory lock
+MIGRATION_LOCK_KEY = 0x6D6F6F64  # "mood"
+
+@contextmanager
+def migration_lock():
+    """
+    Serialize schema setup across processes: every uvicorn worker calls
+    init_db() at startup, so one migrates while the others wait and then
+    find nothing left to do. SQLite takes an exclusive flock on a file next
+    to the database; Postgres takes a session advisory lock.
+    """
+    if IS_SQLITE:
+        path = engine.url.database
+        if not path or path == ":memory:":
+            yield
+            return
+        with open(f"{path}.migrate.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    elif engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    else:
+        yield
+
 # Create tables
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    with migration_lock():
+        Base.metadata.create_all(bind=engine)
+        _migrate()
+
+def _migrate():
+    """
+    Bring tables created by an older version up to date: add missing
+    (nullable) columns and indexes, then backfill per-emotion score columns
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    print(f"✅ Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        pending = db.query(MoodEntry).filter(
+            MoodEntry.score_happy.is_(None), MoodEntry.emotion_scores.isnot(None)
+        )
+        count = 0
+        for entry in pending.yield_per(500):
+            for name, value in score_columns(json.loads(entry.emotion_scores)).items():
+                setattr(entry, name, value)
+            count += 1
+        if count:
+            db.commit()
+            print(f"✅ Backfilled emotion score columns for {count} entries")
+        
+        count = backfill_rollups(db)
+        if count:
+            print(f"✅ Built mood rollups from {count} entries")
+    finally:
+        db.close()
+
+async def close_db():
+    """Release pooled connections on shutdown"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    engine.dispose()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
 
 def get_db():
     db = SessionLocal()
@@ -1,7 +1,8 @@
 # backend/database/models.py
-from sqlalchemy import Column, String, Float, DateTime, Integer, Text
+from sqlalchemy import Column, String, Float, Date, DateTime, Integer, Text, Boolean, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
+from config import EMOTIONS
 
 Base = declarative_base()
 
@@ -11,15 +12,26 @@ class MoodEntry(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    user_id = Column(String, nullable=True)  # client-supplied user/session id
     
     # Emotion data
     primary_emotion = Column(String, index=True)
     emotion_scores = Column(String)  # JSON: {"happy": 0.8, "sad": 0.2, ...}
     confidence = Column(Float)
     
+    # Same scores as columns, so SQL can filter on intensity
+    score_happy = Column(Float, nullable=True)
+    score_sad = Column(Float, nullable=True)
+    score_angry = Column(Float, nullable=True)
+    score_anxious = Column(Float, nullable=True)
+    score_calm = Column(Float, nullable=True)
+    score_neutral = Column(Float, nullable=True)
+    score_surprised = Column(Float, nullable=True)
+    
     # Audio data
     transcription = Column(Text)
     audio_duration = Column(Float)  # seconds
+    audio_path = Column(String, nullable=True, index=True)  # source recording (scripts/reanalyze_audio.py)
     
     # Response data
     ai_response = Column(Text)
@@ -29,5 +41,76 @@ class MoodEntry(Base):
     user_rating = Column(Integer, nullable=True)  # 1-5 stars
     user_notes = Column(Text, nullable=True)
     
+    # History is read newest-first per user; id breaks timestamp ties for cursors
+    __table_args__ = (
+        Index("ix_mood_entries_user_timestamp", "user_id", "timestamp", "id"),
+    )
+    
     class Config:
         from_attributes = True
+
+
+class MoodRollup(Base):
+    """Per day/week totals of mood entries, updated on every insert (see database/rollups.py)"""
+    __tablename__ = "mood_rollups"
+    
+    id = Column(Integer, primary_key=True)
+    period = Column(String, nullable=False)  # day, week
+    bucket_start = Column(Date, nullable=False)  # the day, or the Monday of the week
+    user_key = Column(String, nullable=False)  # user_id, or "*" for all users
+    
+    count = Column(Integer, default=0, nullable=False)
+    confidence_sum = Column(Float, default=0.0, nullable=False)
+    
+    # Primary-emotion counts
+    happy_count = Column(Integer, default=0, nullable=False)
+    sad_count = Column(Integer, default=0, nullable=False)
+    angry_count = Column(Integer, default=0, nullable=False)
+    anxious_count = Column(Integer, default=0, nullable=False)
+    calm_count = Column(Integer, default=0, nullable=False)
+    neutral_count = Column(Integer, default=0, nullable=False)
+    surprised_count = Column(Integer, default=0, nullable=False)
+    
+    # Fused score sums (divide by count for the mean)
+    happy_score_sum = Column(Float, default=0.0, nullable=False)
+    sad_score_sum = Column(Float, default=0.0, nullable=False)
+    angry_score_sum = Column(Float, default=0.0, nullable=False)
+    anxious_score_sum = Column(Float, default=0.0, nullable=False)
+    calm_score_sum = Column(Float, default=0.0, nullable=False)
+    neutral_score_sum = Column(Float, default=0.0, nullable=False)
+    surprised_score_sum = Column(Float, default=0.0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("period", "user_key", "bucket_start", name="uq_mood_rollups_bucket"),
+    )
+
+
+def score_columns(scores: dict) -> dict:
+    """MoodEntry score_<emotion> column values for an emotion_scores dict"""
+    return {f"score_{emotion}": scores.get(emotion, 0.0) for emotion in EMOTIONS}
+
+
+class AudioJob(Base):
+    """Asynchronous /api/audio/process job; each stage output is persisted for resume"""
+    __tablename__ = "audio_jobs"
+    
+    id = Column(String, primary_key=True)  # uuid4 hex
+    status = Column(String, default="queued", index=True)  # queued, running, completed, failed
+    stage = Column(String, default="uploaded")  # last completed stage
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Options
+    transcribe = Column(Boolean, default=True)
+    user_id = Column(String, nullable=True)
+    
+    # Stage outputs
+    audio_path = Column(String)
+    audio_duration = Column(Float, nullable=True)
+    transcription = Column(Text, nullable=True)
+    emotion_result = Column(String, nullable=True)  # JSON: detect() result
+    ai_response = Column(Text, nullable=True)
+    response_audio_path = Column(String, nullable=True)
+    mood_entry_id = Column(Integer, nullable=True)
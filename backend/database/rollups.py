@@ -0,0 +1,139 @@
+# backend/database/rollups.py
+from datetime import date, datetime, timedelta
+from sqlalchemy import Date, Integer, case, cast, delete, func, insert, literal, literal_column, select
+from sqlalchemy.orm import Session
+from database.models import MoodEntry, MoodRollup
+from config import EMOTIONS
+
+PERIODS = ("day", "week")
+
+# Rollup rows for entries from every user (user_id is NULL for anonymous entries)
+ALL_USERS = "*"
+
+
+def bucket_start(timestamp: datetime, period: str) -> date:
+    """First day of the bucket holding timestamp (weeks start on Monday)"""
+    day = timestamp.date()
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def rollup_statements(entry: MoodEntry, dialect: str) -> list:
+    """
+    Upserts adding one entry to its day and week buckets, for its user
+    and for ALL_USERS. Each is atomic (ON CONFLICT ... count = count + 1),
+    so concurrent inserts never lose increments.
+    """
+    scores = {emotion: getattr(entry, f"score_{emotion}") or 0.0 for emotion in EMOTIONS}
+    increments = {"count": 1, "confidence_sum": entry.confidence or 0.0}
+    for emotion in EMOTIONS:
+        increments[f"{emotion}_score_sum"] = scores[emotion]
+        increments[f"{emotion}_count"] = 1 if entry.primary_emotion == emotion else 0
+
+    user_keys = [ALL_USERS] + ([entry.user_id] if entry.user_id else [])
+    insert = _dialect_insert(dialect)
+
+    statements = []
+    for period in PERIODS:
+        for user_key in user_keys:
+            stmt = insert(MoodRollup).values(
+                period=period,
+                bucket_start=bucket_start(entry.timestamp, period),
+                user_key=user_key,
+                **increments
+            )
+            statements.append(stmt.on_conflict_do_update(
+                index_elements=["period", "user_key", "bucket_start"],
+                set_={name: getattr(MoodRollup, name) + value for name, value in increments.items()}
+            ))
+    return statements
+
+
+def update_rollups(db: Session, entry: MoodEntry):
+    """Apply rollup_statements in the caller's (sync) transaction"""
+    for stmt in rollup_statements(entry, db.get_bind().dialect.name):
+        db.execute(stmt)
+
+
+def backfill_rollups(db: Session) -> int:
+    """Build rollups from existing entries (only when the rollup table is empty)"""
+    if db.query(MoodRollup.id).first() is not None:
+        return 0
+    return rebuild_rollups(db)
+
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Replace every rollup row with totals recomputed from mood_entries, in
+    one transaction: a DELETE plus one INSERT ... SELECT ... GROUP BY per
+    period and scope. Running it again gives the same table, so a rebuild
+    can never double count. Returns the number of entries rolled up.
+    """
+    dialect = db.get_bind().dialect.name
+    columns = ["period", "bucket_start", "user_key", "count", "confidence_sum"]
+    aggregates = [func.count(), func.coalesce(func.sum(MoodEntry.confidence), 0.0)]
+    for emotion in EMOTIONS:
+        columns += [f"{emotion}_count", f"{emotion}_score_sum"]
+        aggregates += [
+            func.sum(case((MoodEntry.primary_emotion == emotion, 1), else_=0)),
+            func.coalesce(func.sum(getattr(MoodEntry, f"score_{emotion}")), 0.0),
+        ]
+    
+    has_timestamp = MoodEntry.timestamp.isnot(None)
+    has_user = MoodEntry.user_id.isnot(None) & (MoodEntry.user_id != "")
+    
+    db.execute(delete(MoodRollup))
+    for period in PERIODS:
+        bucket = _bucket_expression(MoodEntry.timestamp, period, dialect)
+        for user_key, condition in ((literal(ALL_USERS), has_timestamp), (MoodEntry.user_id, has_timestamp & has_user)):
+            query = (
+                select(literal(period), bucket, user_key, *aggregates)
+                .where(condition)
+                .group_by(bucket, user_key)
+            )
+            db.execute(insert(MoodRollup).from_select(columns, query))
+    
+    count = db.query(func.count(MoodEntry.id)).filter(has_timestamp).scalar()
+    db.commit()
+    return count
+
+
+def _bucket_expression(timestamp, period: str, dialect: str):
+    """SQL for bucket_start(timestamp, period)"""
+    if dialect == "postgresql":
+        return cast(func.date_trunc(literal_column(f"'{period}'"), timestamp), Date)
+    if period == "week":
+        # strftime('%w') counts from Sunday; step back to Monday
+        days_back = (cast(func.strftime("%w", timestamp), Integer) + 6) % 7
+        return func.date(timestamp, func.printf("-%d days", days_back))
+    return func.date(timestamp)
+
+
+def rollup_payload(rollup: MoodRollup) -> dict:
+    """API view of one bucket: counts, mean confidence and emotion distribution"""
+    n = rollup.count or 0
+    return {
+        "start": rollup.bucket_start.isoformat(),
+        "count": n,
+        "mean_confidence": round(rollup.confidence_sum / n, 4) if n else None,
+        # Share of entries whose primary emotion was each emotion
+        "distribution": {
+            emotion: round(getattr(rollup, f"{emotion}_count") / n, 4) if n else 0.0
+            for emotion in EMOTIONS
+        },
+        # Mean fused score per emotion
+        "mean_scores": {
+            emotion: round(getattr(rollup, f"{emotion}_score_sum") / n, 4) if n else 0.0
+            for emotion in EMOTIONS
+        },
+    }
+
+
+def _dialect_insert(dialect: str):
+    """INSERT construct with on_conflict_do_update for the database dialect"""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
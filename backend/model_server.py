@@ -0,0 +1,181 @@
+# backend/model_server.py
+"""
+Shared model server: hosts the heavy models once per node.
+
+    python model_server.py                       # socket from MODEL_SERVER_SOCKET
+    MODEL_SERVER_SOCKET=/run/moodmate/models.sock uvicorn app:app --workers 8
+
+Web workers started with MODEL_SERVER_SOCKET set load no weights of their
+own; they call into this process (see models/remote.py). HTTP concurrency
+then scales with workers while model memory stays one copy, and the
+emotion micro-batchers see every worker's traffic.
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import os
+import pickle
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from models.loaders import SERVED_MODELS, register_models
+from models.registry import ModelRegistry
+from models.remote import FRAME_HEADER, READY_POLL_SECONDS, loads_request, release_segments
+from utils.logger import metrics
+from config import BACKEND_DIR, MODEL_LOAD_WORKERS, MODEL_SERVER_SOCKET, MODEL_SERVER_THREADS
+
+_END = object()
+
+
+class ModelServer:
+    """Serves model method calls from web workers over a Unix socket"""
+
+    def __init__(self, socket_path: str, names=SERVED_MODELS, threads: int = MODEL_SERVER_THREADS):
+        self.socket_path = socket_path
+        self.registry = ModelRegistry(max_workers=MODEL_LOAD_WORKERS)
+        register_models(self.registry, names)
+        # Model calls block; they run here while the loop keeps reading requests
+        self._executor = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="model-server")
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # left over from a previous run
+
+        # Owner-only from the moment it is bound (a chmod afterwards leaves a window)
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        finally:
+            os.umask(umask)
+        # SIGTERM (docker stop, systemd) shuts down like Ctrl-C, removing the socket
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+        self.registry.start()
+        print(f"🧠 Model server listening on {self.socket_path}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self._executor.shutdown(wait=False)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """One client connection: requests are answered in order"""
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                    payload = await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+                except asyncio.IncompleteReadError:
+                    break
+                await self._dispatch(payload, writer)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, payload: bytes, writer: asyncio.StreamWriter):
+        request, result, segments = None, None, []
+        try:
+            request, segments = loads_request(payload)
+            result = await self._call(*request)
+
+            if inspect.isgenerator(result):
+                await self._send(writer, ("stream", None))
+                loop = asyncio.get_running_loop()
+                while True:
+                    item = await loop.run_in_executor(self._executor, next, result, _END)
+                    if item is _END:
+                        break
+                    await self._send(writer, ("item", item))
+                await self._send(writer, ("end", None))
+            else:
+                await self._send(writer, ("ok", result))
+
+        except ConnectionError:
+            raise
+        except Exception as e:
+            print(f"❌ Model server call failed: {e}")
+            await self._send(writer, ("error", e))
+        finally:
+            request = result = None  # drop the shared-memory views before unmapping
+            release_segments(segments)
+
+    async def _call(self, name: str, method: str, args: tuple, kwargs: dict):
+        if name is None:
+            return await self._control(method, *args)
+        if method.startswith("_"):
+            raise AttributeError(f"{name}.{method} is not callable remotely")
+
+        model = await self.registry.aget(name)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(getattr(model, method), *args, **kwargs)
+        )
+
+    async def _control(self, method: str, *args):
+        if method == "ready":
+            # Bounded wait, so clients see a live connection while models load
+            try:
+                await asyncio.wait_for(asyncio.shield(self.registry.aget(args[0])), READY_POLL_SECONDS)
+                return True
+            except asyncio.TimeoutError:
+                return False
+        if method == "status":
+            return self.registry.status()
+        raise AttributeError(f"Unknown model server request '{method}'")
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, reply: tuple):
+        try:
+            payload = pickle.dumps(reply, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # e.g. an exception type that can't be pickled
+            payload = pickle.dumps(("error", RuntimeError(f"{type(reply[1]).__name__}: {reply[1]}")))
+        writer.write(FRAME_HEADER.pack(len(payload)))
+        writer.write(payload)
+        await writer.drain()
+
+
+def serve_metrics(port: int):
+    """Prometheus endpoint on a background thread (GET any path)"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"📈 Model server metrics on http://127.0.0.1:{port}/metrics")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=MODEL_SERVER_SOCKET or str(BACKEND_DIR / "model_server.sock"))
+    parser.add_argument("--threads", type=int, default=MODEL_SERVER_THREADS, help="concurrent model calls")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics for the model stages on this port")
+    parser.add_argument("--models", nargs="+", default=list(SERVED_MODELS), choices=list(SERVED_MODELS))
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    try:
+        asyncio.run(ModelServer(args.socket, names=args.models, threads=args.threads).serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("👋 Model server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,23 @@
 # backend/models/emotion_detector.py
 import numpy as np
-from transformers import pipeline
-from utils.audio_processor import AudioProcessor
-import json
-from typing import Dict
+from models.emotion_fusion import AudioAnalysis, EmotionFusion, N_EMOTIONS, AUDIO_LABEL_MAP, TEXT_LABEL_MAP
+from models.inference_backends import build_classifier
+from utils.audio_processor import AudioProcessor, FEATURE_VERSION
+from utils.audio_buffer import AudioBuffer
+from utils.micro_batcher import MicroBatcher
+from utils.inference_cache import InferenceCache, get_inference_cache
+from utils.logger import timed
+from config import (
+    SAMPLE_RATE, EMOTION_BATCH_SIZE, EMOTION_BATCH_WAIT_MS,
+    AUDIO_EMOTION_BACKEND, TEXT_SENTIMENT_BACKEND, VAD_ENABLED,
+    VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_PAD_MS, MAX_SEGMENT_SECONDS
+)
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple, Union
+
+AUDIO_EMOTION_MODEL = "ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition"
+TEXT_SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
 
 class EmotionDetector:
     """
@@ -13,14 +27,18 @@ class EmotionDetector:
     3. Prosodic features
     """
     
-    def __init__(self):
+    def __init__(self, audio_backend: str = None, text_backend: str = None):
         print("Loading emotion detection models...")
         
+        audio_backend = audio_backend or AUDIO_EMOTION_BACKEND
+        text_backend = text_backend or TEXT_SENTIMENT_BACKEND
+        
         try:
             # Use the verified working model you suggested!
-            self.audio_emotion = pipeline(
+            self.audio_emotion = build_classifier(
                 "audio-classification",
-                model="ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition"
+                AUDIO_EMOTION_MODEL,
+                backend=audio_backend
             )
             print("✅ Speech emotion model loaded!")
         except Exception as e:
@@ -29,9 +47,10 @@ class EmotionDetector:
         
         # Text sentiment (for transcription)
         try:
-            self.text_sentiment = pipeline(
+            self.text_sentiment = build_classifier(
                 "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english"
+                TEXT_SENTIMENT_MODEL,
+                backend=text_backend
             )
             print("✅ Text sentiment model loaded!")
         except Exception as e:
@@ -39,18 +58,55 @@ class EmotionDetector:
             self.text_sentiment = None
         
         # Audio features
-        self.audio_processor = AudioProcessor(sr=16000)
+        self.audio_processor = AudioProcessor(sr=SAMPLE_RATE)
+        
+        # Score arrays over config.EMOTIONS → fused result
+        self.fusion = EmotionFusion()
+        
+        # Pre-fusion results by upload hash, so fusion weight changes still apply;
+        # each kind is fingerprinted with the settings that produced it
+        self.cache = get_inference_cache()
+        segmentation = (
+            VAD_ENABLED, VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS,
+            VAD_PAD_MS, MAX_SEGMENT_SECONDS
+        )
+        self.cache_kinds = {
+            "audio": "audio-emotion:" + InferenceCache.fingerprint(
+                AUDIO_EMOTION_MODEL, audio_backend, sorted(AUDIO_LABEL_MAP.items()), segmentation
+            ),
+            "features": "features:" + InferenceCache.fingerprint(FEATURE_VERSION, segmentation),
+            "text": "text-sentiment:" + InferenceCache.fingerprint(
+                TEXT_SENTIMENT_MODEL, text_backend, repr(TEXT_LABEL_MAP)
+            ),
+        }
+        
+        # Concurrent detect() calls share one batched forward pass per model
+        self.audio_batcher = MicroBatcher(
+            "audio-emotion", self._classify_audio_batch,
+            max_batch_size=EMOTION_BATCH_SIZE, max_wait_ms=EMOTION_BATCH_WAIT_MS
+        )
+        self.text_batcher = MicroBatcher(
+            "text-sentiment", self._classify_text_batch,
+            max_batch_size=EMOTION_BATCH_SIZE, max_wait_ms=EMOTION_BATCH_WAIT_MS
+        )
         
         print("✅ All emotion detection models loaded!")
     
     def detect(
         self, 
-        audio_path: str, 
-        transcription: str = None
+        audio: Union[AudioBuffer, str], 
+        transcription: str = None,
+        cache_key: str = None
     ) -> Dict:
         """
         Comprehensive emotion detection combining multiple signals
         
+        Args:
+            audio: Decoded AudioBuffer (or a file path, decoded once here)
+            transcription: Optional Whisper transcript
+            cache_key: Content hash of the upload (InferenceCache.key); a
+                repeat upload reuses its scores and features, skipping inference
+        
         Returns:
             {
                 "primary_emotion": "anxious",
@@ -59,170 +115,201 @@ class EmotionDetector:
             }
         """
         
-        # 1. Audio-based emotion detection
-        audio_emotions = self._detect_from_audio(audio_path)
+        # The text model runs on its batcher thread while the audio branch works here
+        pending_text = self._submit_text(transcription)
+        analysis = self.analyze_audio(audio, cache_key)
+        text_emotions = self._collect_text(*pending_text)
+        
+        return self.fuse(analysis, text_emotions)
+    
+    def analyze_audio(self, audio: Union[AudioBuffer, str], cache_key: str = None) -> AudioAnalysis:
+        """
+        Transcript-independent branch: per-segment audio emotion scores and
+        prosodic features (from the inference cache for a repeat upload)
+        """
+        cached = self._cached_analysis(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Decode at most once; both stages below share the buffer
+        audio = AudioBuffer.coerce(audio, SAMPLE_RATE)
+        
+        # Voiced regions only, in bounded-length segments
+        with timed("vad"):
+            if VAD_ENABLED:
+                segments = self.audio_processor.speech_segments(audio)
+                speech = AudioBuffer.concat(segments)
+            else:
+                segments = self.audio_processor.split_segments(audio)
+                speech = audio
+        
+        # 1. Audio-based emotion detection: queue the segments on the batcher thread...
+        pending_audio = self._submit_audio(segments)
+        
+        # 2. ...and extract prosodic features here while the model runs
+        with timed("features"):
+            features = self.audio_processor.extract_features(speech)
+        
+        audio_emotions = self._collect_audio(pending_audio)
+        audio_weights = [segment.duration for segment in segments]
+        
+        # A failed model call returns no rows; never cache that
+        if cache_key and self.cache and len(audio_emotions) == len(segments):
+            self.cache.put_array(
+                cache_key, self.cache_kinds["audio"],
+                np.column_stack([audio_emotions, audio_weights]) if segments else audio_emotions
+            )
+            self.cache.put_array(cache_key, self.cache_kinds["features"], features)
+        
+        return AudioAnalysis(audio_emotions, audio_weights, features)
+    
+    def score_text(self, transcription: str) -> Optional[np.ndarray]:
+        """Transcript branch: text sentiment as one score row (None without text)"""
+        return self._collect_text(*self._submit_text(transcription))
+    
+    def fuse(self, analysis: AudioAnalysis, text_emotions: np.ndarray = None) -> Dict:
+        """Fuse all signals, weighting segments by length"""
+        with timed("fusion"):
+            return self._fuse_emotions(
+                analysis.scores, text_emotions, analysis.features,
+                audio_weights=analysis.weights
+            )
+    
+    def _cached_analysis(self, cache_key: str) -> Optional[AudioAnalysis]:
+        """(segment scores, segment weights, features) for a repeat upload, or None"""
+        if not (cache_key and self.cache):
+            return None
+        
+        rows = self.cache.get_array(cache_key, self.cache_kinds["audio"])
+        features = self.cache.get_array(cache_key, self.cache_kinds["features"]) if rows is not None else None
+        if features is None:
+            return None
         
-        # 2. Text-based emotion (if transcription available)
-        text_emotions = self._detect_from_text(transcription) if transcription else None
+        if len(rows) == 0:
+            return AudioAnalysis(np.zeros((0, N_EMOTIONS), dtype=np.float32), [], features)
+        return AudioAnalysis(rows[:, :N_EMOTIONS], list(rows[:, N_EMOTIONS]), features)
+    
+    def detect_batch(
+        self,
+        segments: List[List[AudioBuffer]],
+        features: np.ndarray,
+        transcriptions: List[str] = None,
+        batch_size: int = EMOTION_BATCH_SIZE
+    ) -> List[Dict]:
+        """
+        Offline scoring of many clips: one classifier call per model over
+        every segment/transcript, then one vectorized fusion over the batch
         
-        # 3. Prosodic features analysis
-        features = self.audio_processor.extract_features(audio_path)
+        Args:
+            segments: Per-clip speech segments (as from speech_segments())
+            features: (n_clips, N_FEATURES) AudioProcessor vectors
+            transcriptions: Optional per-clip transcripts ("" or None to skip)
+        """
+        n_clips = len(segments)
+        
+        # 1. Audio: flatten all segments into one pipeline call, regroup per clip
+        audio = np.zeros((n_clips, N_EMOTIONS), dtype=np.float32)
+        flat = [segment for clip in segments for segment in clip]
+        if self.audio_emotion is not None and flat:
+            predictions = self.audio_emotion([s.as_pipeline_input() for s in flat], batch_size=batch_size)
+            rows = self.fusion.audio_scores(predictions)
+            offset = 0
+            for i, clip in enumerate(segments):
+                audio[i] = self.fusion.aggregate_segments(
+                    rows[offset:offset + len(clip)], [s.duration for s in clip]
+                )
+                offset += len(clip)
         
-        # 4. Fuse all signals
-        result = self._fuse_emotions(audio_emotions, text_emotions, features)
+        # 2. Text: only clips with a transcript
+        text = np.zeros((n_clips, N_EMOTIONS), dtype=np.float32)
+        if self.text_sentiment is not None and transcriptions:
+            indices = [i for i, t in enumerate(transcriptions) if t]
+            if indices:
+                texts = [transcriptions[i][:512] for i in indices]
+                text[indices] = self.fusion.text_scores(self.text_sentiment(texts, batch_size=batch_size))
         
-        return result
+        # 3. Prosody + fusion for the whole block
+        prosody = self.fusion.prosody_scores(features)
+        return self.fusion.to_results(self.fusion.fuse(audio, text, prosody))
+    
+    def _classify_audio_batch(self, inputs: List[dict]) -> List[List[dict]]:
+        """One wav2vec2 forward pass over a batch of waveforms"""
+        return self.audio_emotion(inputs, batch_size=len(inputs))
     
-    def _detect_from_audio(self, audio_path: str) -> Dict[str, float]:
-        """Speech emotion recognition from audio"""
+    def _classify_text_batch(self, texts: List[str]) -> List[dict]:
+        """One DistilBERT forward pass over a batch of transcripts"""
+        return self.text_sentiment(texts, batch_size=len(texts))
+    
+    def _submit_audio(self, segments: List[AudioBuffer]) -> Optional[List[Future]]:
+        """Queue segments for speech emotion recognition; None if the model is unavailable"""
         if self.audio_emotion is None:
             print("⚠️ Audio emotion model not available")
-            return {}
+            return None
+        # Segments of one clip go through the batcher together
+        return self.audio_batcher.enqueue_many([segment.as_pipeline_input() for segment in segments])
+    
+    def _collect_audio(self, pending: Optional[List[Future]]) -> np.ndarray:
+        """One score row per audio segment (no rows on failure)"""
+        if not pending:
+            return np.zeros((0, N_EMOTIONS), dtype=np.float32)
         
         try:
-            predictions = self.audio_emotion(audio_path)
-            
-            # Model outputs 8 emotions: 'angry', 'calm', 'disgust', 'fearful', 'happy', 'neutral', 'sad', 'surprised'
-            # Map to our 7 emotion categories
-            emotion_map = {
-                "angry": "angry",
-                "calm": "calm",
-                "disgust": "angry",      # Disgust → Angry
-                "fearful": "anxious",    # Fearful → Anxious
-                "happy": "happy",
-                "neutral": "neutral",
-                "sad": "sad",
-                "surprised": "surprised"
-            }
-            
-            scores = {e: 0.0 for e in ["happy", "sad", "angry", "anxious", "calm", "neutral", "surprised"]}
-            
-            print(f"Raw model predictions: {predictions}")
-            
-            for pred in predictions:
-                label = pred['label'].lower()
-                mapped = emotion_map.get(label, "neutral")
-                confidence = pred['score']
-                
-                # Aggregate multiple scores for same emotion
-                scores[mapped] = max(scores[mapped], confidence)
-            
-            print(f"Mapped emotion scores: {scores}")
-            
-            return scores
+            with timed("audio_emotion"):
+                predictions = [future.result() for future in pending]
+            return self.fusion.audio_scores(predictions)
         
         except Exception as e:
             print(f"❌ Audio emotion detection failed: {e}")
             import traceback
             traceback.print_exc()
-            return {}
+            return np.zeros((0, N_EMOTIONS), dtype=np.float32)
+    
+    def _submit_text(self, text: str) -> Tuple[Optional[str], Union[np.ndarray, Future, None]]:
+        """(cache key, cached score row or pending batcher future) for a transcript"""
+        if self.text_sentiment is None or not text:
+            return None, None
+        
+        text = text[:512]  # Limit to 512 chars
+        key = InferenceCache.key(text.encode("utf-8"))
+        if self.cache:
+            cached = self.cache.get_array(key, self.cache_kinds["text"])
+            if cached is not None:
+                return key, cached
+        
+        return key, self.text_batcher.enqueue(text)
     
-    def _detect_from_text(self, text: str) -> Dict[str, float]:
-        """Sentiment from transcribed text"""
-        if self.text_sentiment is None:
-            return {}
+    def _collect_text(self, key: Optional[str], pending: Union[np.ndarray, Future, None]) -> Optional[np.ndarray]:
+        """Sentiment from transcribed text as one score row"""
+        if pending is None or isinstance(pending, np.ndarray):
+            return pending
         
         try:
-            result = self.text_sentiment(text[:512])  # Limit to 512 chars
-            
-            sentiment = result[0]['label'].lower()
-            score = result[0]['score']
-            
-            scores = {e: 0.0 for e in ["happy", "sad", "angry", "anxious", "calm", "neutral", "surprised"]}
-            
-            # Map sentiment to emotions
-            if sentiment == "positive":
-                scores["happy"] = score
-                scores["calm"] = score * 0.3
-            else:
-                scores["sad"] = score
-                scores["anxious"] = score * 0.4
-            
+            with timed("text_sentiment"):
+                prediction = pending.result()
+            scores = self.fusion.text_scores([prediction])[0]
+            if self.cache:
+                self.cache.put_array(key, self.cache_kinds["text"], scores)
             return scores
         except Exception as e:
             print(f"⚠️ Text emotion detection failed: {e}")
-            return {}
+            return None
     
     def _fuse_emotions(
         self, 
-        audio_emotions: Dict, 
-        text_emotions: Dict = None,
-        features: Dict = None
+        audio_emotions: np.ndarray, 
+        text_emotions: np.ndarray = None,
+        features: np.ndarray = None,
+        audio_weights: List[float] = None
     ) -> Dict:
         """
-        Combine audio, text, and prosodic signals
-        Weights: 60% audio, 30% text, 10% prosody
-        """
+        Combine audio, text, and prosodic signals (FUSION_WEIGHTS,
+        60% audio / 30% text / 10% prosody by default)
         
-        emotion_categories = ["happy", "sad", "angry", "anxious", "calm", "neutral", "surprised"]
-        fused_scores = {e: 0.0 for e in emotion_categories}
-        
-        # Initialize defaults if empty
-        if not audio_emotions:
-            audio_emotions = {e: 0.0 for e in emotion_categories}
-        if not text_emotions:
-            text_emotions = {e: 0.0 for e in emotion_categories}
-        
-        # Audio emotions (60% weight - strongest signal)
-        for emotion in emotion_categories:
-            fused_scores[emotion] += audio_emotions.get(emotion, 0.0) * 0.6
-        
-        # Text emotions (30% weight)
-        if text_emotions:
-            for emotion in emotion_categories:
-                fused_scores[emotion] += text_emotions.get(emotion, 0.0) * 0.3
-        
-        # Prosody-based adjustments (10% weight)
-        if features:
-            prosody_scores = self._prosody_to_emotion(features)
-            for emotion in emotion_categories:
-                fused_scores[emotion] += prosody_scores.get(emotion, 0.0) * 0.1
-        
-        # Normalize to sum to 1
-        total = sum(fused_scores.values())
-        if total > 0:
-            fused_scores = {k: v / total for k, v in fused_scores.items()}
-        else:
-            fused_scores["neutral"] = 1.0
-        
-        # Get primary emotion
-        primary_emotion = max(fused_scores.items(), key=lambda x: x[1])
-        
-        return {
-            "primary_emotion": primary_emotion[0],
-            "confidence": round(primary_emotion[1], 4),
-            "scores": {k: round(v, 4) for k, v in fused_scores.items()}
-        }
-    
-    def _prosody_to_emotion(self, features: Dict) -> Dict[str, float]:
-        """Infer emotion from prosodic features"""
-        scores = {e: 0.1 for e in ["happy", "sad", "angry", "anxious", "calm", "neutral", "surprised"]}
+        audio_emotions holds one row per segment; segments are averaged,
+        weighted by audio_weights (segment durations)
+        """
+        audio = self.fusion.aggregate_segments(audio_emotions, audio_weights)
+        prosody = self.fusion.prosody_scores(features) if features is not None else None
         
-        try:
-            pitch_mean = features.get('pitch_mean', 100)
-            pitch_std = features.get('pitch_std', 20)
-            energy_mean = features.get('energy_mean', 0.05)
-            
-            # High pitch + high energy → happy
-            if pitch_mean > 150 and energy_mean > 0.1:
-                scores['happy'] = 0.8
-                scores['surprised'] = 0.4
-            
-            # Low pitch + low energy → sad
-            elif pitch_mean < 100 and energy_mean < 0.05:
-                scores['sad'] = 0.7
-                scores['calm'] = 0.3
-            
-            # High pitch variation + high energy → anxious
-            elif pitch_std > 50 and energy_mean > 0.08:
-                scores['anxious'] = 0.6
-                scores['angry'] = 0.3
-            
-            # Consistent pitch + moderate energy → calm
-            elif pitch_std < 30 and 0.05 < energy_mean < 0.1:
-                scores['calm'] = 0.7
-                scores['neutral'] = 0.4
-        except:
-            pass
-        
-        return scores
+        fused = self.fusion.fuse(audio, text_emotions, prosody)
+        return self.fusion.to_results(fused)[0]
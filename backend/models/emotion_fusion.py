@@ -0,0 +1,170 @@
+# backend/models/emotion_fusion.py
+import numpy as np
+from typing import Dict, List, NamedTuple, Sequence
+from utils.audio_processor import FEATURE_INDEX
+from config import EMOTIONS, FUSION_WEIGHTS
+
+EMOTION_INDEX = {emotion: i for i, emotion in enumerate(EMOTIONS)}
+N_EMOTIONS = len(EMOTIONS)
+
+
+class AudioAnalysis(NamedTuple):
+    """Transcript-independent half of EmotionDetector.detect(), ready to fuse with text scores"""
+    scores: np.ndarray      # (n_segments, N_EMOTIONS)
+    weights: List[float]    # segment durations
+    features: np.ndarray    # AudioProcessor vector over the speech
+
+
+# wav2vec2 outputs 8 emotions; map onto our 7 categories
+AUDIO_LABEL_MAP = {
+    "angry": "angry",
+    "calm": "calm",
+    "disgust": "angry",      # Disgust → Angry
+    "fearful": "anxious",    # Fearful → Anxious
+    "happy": "happy",
+    "neutral": "neutral",
+    "sad": "sad",
+    "surprised": "surprised"
+}
+
+# Sentiment label → spread over emotions (scaled by the label's score)
+TEXT_LABEL_MAP = {
+    "positive": {"happy": 1.0, "calm": 0.3},
+    "negative": {"sad": 1.0, "anxious": 0.4},
+}
+
+# Prosody rules, first match wins: (pitch_mean, pitch_std, energy_mean) → scores
+PROSODY_BASE = 0.1
+PROSODY_RULES = [
+    # High pitch + high energy → happy
+    (lambda p, s, e: (p > 150) & (e > 0.1), {"happy": 0.8, "surprised": 0.4}),
+    # Low pitch + low energy → sad
+    (lambda p, s, e: (p < 100) & (e < 0.05), {"sad": 0.7, "calm": 0.3}),
+    # High pitch variation + high energy → anxious
+    (lambda p, s, e: (s > 50) & (e > 0.08), {"anxious": 0.6, "angry": 0.3}),
+    # Consistent pitch + moderate energy → calm
+    (lambda p, s, e: (s < 30) & (e > 0.05) & (e < 0.1), {"calm": 0.7, "neutral": 0.4}),
+]
+
+
+def label_matrix(labels: Sequence[str], label_map: Dict, default: str = "neutral") -> np.ndarray:
+    """
+    (n_labels, N_EMOTIONS) matrix; row i spreads label i over EMOTIONS.
+    label_map values are an emotion name or an {emotion: weight} dict.
+    """
+    matrix = np.zeros((len(labels), N_EMOTIONS), dtype=np.float32)
+    for i, label in enumerate(labels):
+        target = label_map.get(label.lower(), default)
+        if isinstance(target, str):
+            target = {target: 1.0}
+        for emotion, weight in target.items():
+            matrix[i, EMOTION_INDEX[emotion]] = weight
+    return matrix
+
+
+def scores_to_dict(row: np.ndarray) -> Dict[str, float]:
+    return {emotion: float(row[i]) for i, emotion in enumerate(EMOTIONS)}
+
+
+class EmotionFusion:
+    """
+    Fuses (audio, text, prosody) emotion scores held as fixed-order
+    arrays over config.EMOTIONS. Every method takes a batch: one row
+    per clip, so offline scoring fuses thousands of rows in one call.
+    """
+
+    def __init__(self, weights: Sequence[float] = FUSION_WEIGHTS):
+        self.weights = np.asarray(weights, dtype=np.float32)  # audio, text, prosody
+        self.audio_labels = list(AUDIO_LABEL_MAP)
+        self.audio_label_index = {label: i for i, label in enumerate(self.audio_labels)}
+        self.audio_matrix = label_matrix(self.audio_labels, AUDIO_LABEL_MAP)
+        self.text_labels = list(TEXT_LABEL_MAP)
+        self.text_label_index = {label: i for i, label in enumerate(self.text_labels)}
+        self.text_matrix = label_matrix(self.text_labels, TEXT_LABEL_MAP)
+
+    def audio_scores(self, predictions: List[List[dict]]) -> np.ndarray:
+        """
+        Map raw classifier outputs (one label/score list per clip) to
+        (batch, N_EMOTIONS). Labels that land on the same emotion keep
+        the max score.
+        """
+        raw = np.zeros((len(predictions), len(self.audio_labels)), dtype=np.float32)
+        for row, clip in enumerate(predictions):
+            for pred in clip:
+                # Unknown labels count as neutral
+                col = self.audio_label_index.get(pred["label"].lower(), self.audio_label_index["neutral"])
+                raw[row, col] = max(raw[row, col], pred["score"])
+
+        # (batch, labels, 1) * (labels, emotions) → max over labels
+        return (raw[:, :, None] * self.audio_matrix[None, :, :]).max(axis=1, initial=0.0)
+
+    def text_scores(self, predictions: List[dict]) -> np.ndarray:
+        """Map top-1 sentiment outputs (one dict per text) to (batch, N_EMOTIONS)"""
+        # Anything but "positive" (e.g. LABEL_0 from an exported head) counts as negative
+        negative = self.text_label_index["negative"]
+        rows = [self.text_label_index.get(p["label"].lower(), negative) for p in predictions]
+        confidence = np.array([p["score"] for p in predictions], dtype=np.float32)
+        return self.text_matrix[rows] * confidence[:, None]
+
+    def prosody_scores(self, features: np.ndarray) -> np.ndarray:
+        """Rule-based scores from AudioProcessor feature rows (batch, N_FEATURES)"""
+        features = np.atleast_2d(features)
+        pitch_mean = features[:, FEATURE_INDEX["pitch_mean"]]
+        pitch_std = features[:, FEATURE_INDEX["pitch_std"]]
+        energy_mean = features[:, FEATURE_INDEX["energy_mean"]]
+
+        scores = np.full((len(features), N_EMOTIONS), PROSODY_BASE, dtype=np.float32)
+        matched = np.zeros(len(features), dtype=bool)
+        for condition, targets in PROSODY_RULES:
+            hit = condition(pitch_mean, pitch_std, energy_mean) & ~matched
+            for emotion, value in targets.items():
+                scores[hit, EMOTION_INDEX[emotion]] = value
+            matched |= hit
+        return scores
+
+    @staticmethod
+    def aggregate_segments(segment_scores: np.ndarray, weights: Sequence[float] = None) -> np.ndarray:
+        """Weighted mean of per-segment rows (e.g. by duration) → one row"""
+        if len(segment_scores) == 0:
+            return np.zeros(N_EMOTIONS, dtype=np.float32)
+        if weights is None or len(weights) != len(segment_scores) or np.sum(weights) <= 0:
+            weights = None
+        return np.average(segment_scores, axis=0, weights=weights).astype(np.float32)
+
+    def fuse(
+        self,
+        audio: np.ndarray,
+        text: np.ndarray = None,
+        prosody: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        Weighted sum of the three (batch, N_EMOTIONS) signals, normalized
+        per row. Missing signals (None or zero rows) contribute nothing;
+        an all-zero row becomes neutral.
+        """
+        audio = np.atleast_2d(audio).astype(np.float32)
+        fused = audio * self.weights[0]
+        if text is not None:
+            fused += np.atleast_2d(text) * self.weights[1]
+        if prosody is not None:
+            fused += np.atleast_2d(prosody) * self.weights[2]
+
+        total = fused.sum(axis=1, keepdims=True)
+        fused = np.divide(fused, total, out=np.zeros_like(fused), where=total > 0)
+        fused[total[:, 0] <= 0, EMOTION_INDEX["neutral"]] = 1.0
+        return fused
+
+    @staticmethod
+    def to_results(fused: np.ndarray) -> List[Dict]:
+        """Rows of fused scores → detect() result dicts"""
+        fused = np.atleast_2d(fused).astype(np.float64)
+        primary = fused.argmax(axis=1)
+        fused = np.round(fused, 4)
+        return [
+            {
+                "primary_emotion": EMOTIONS[p],
+                "confidence": float(row[p]),
+                "scores": scores_to_dict(row)
+            }
+            for row, p in zip(fused, primary)
+        ]
@@ -0,0 +1,101 @@
+# backend/models/inference_backends.py
+"""
+Pluggable CPU backends for the transformers classifiers.
+
+    pytorch  full-precision PyTorch (default)
+    int8     PyTorch with dynamic int8 quantization of Linear layers
+    onnx     ONNX Runtime via optimum (exported once, cached on disk)
+
+All three return a regular transformers pipeline, so callers don't change.
+"""
+import numpy as np
+from pathlib import Path
+from typing import Dict, List
+from transformers import pipeline
+from config import ONNX_CACHE_DIR
+
+BACKENDS = ("pytorch", "int8", "onnx")
+
+
+def build_classifier(task: str, model_id: str, backend: str = "pytorch"):
+    """transformers pipeline for `task` running on the requested backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+    if backend == "onnx":
+        try:
+            return _build_onnx(task, model_id)
+        except ImportError as e:
+            print(f"⚠️ ONNX backend unavailable ({e}), falling back to int8")
+            backend = "int8"
+
+    classifier = pipeline(task, model=model_id)
+
+    if backend == "int8":
+        import torch
+        classifier.model = torch.quantization.quantize_dynamic(
+            classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    print(f"✅ {model_id} running on {backend} backend")
+    return classifier
+
+
+def _build_onnx(task: str, model_id: str):
+    # Optional dependency: pip install optimum[onnxruntime]
+    from optimum.onnxruntime import ORTModelForAudioClassification, ORTModelForSequenceClassification
+
+    if task == "audio-classification":
+        from transformers import AutoFeatureExtractor
+        model_cls = ORTModelForAudioClassification
+        preprocessor = {"feature_extractor": AutoFeatureExtractor.from_pretrained(model_id)}
+    else:
+        from transformers import AutoTokenizer
+        model_cls = ORTModelForSequenceClassification
+        preprocessor = {"tokenizer": AutoTokenizer.from_pretrained(model_id)}
+
+    export_dir = onnx_export_dir(model_id)
+    if (export_dir / "model.onnx").exists():
+        model = model_cls.from_pretrained(export_dir)
+    else:
+        print(f"📦 Exporting {model_id} to ONNX (one-time)...")
+        model = model_cls.from_pretrained(model_id, export=True)
+        model.save_pretrained(export_dir)
+
+    print(f"✅ {model_id} running on onnx backend")
+    return pipeline(task, model=model, **preprocessor)
+
+
+def onnx_export_dir(model_id: str) -> Path:
+    return Path(ONNX_CACHE_DIR) / model_id.replace("/", "__")
+
+
+def label_scores(classifier, inputs: List) -> List[Dict[str, float]]:
+    """Full {label: score} distribution for each input"""
+    num_labels = len(classifier.model.config.id2label)
+    outputs = classifier(inputs, top_k=num_labels)
+    return [{p["label"].lower(): float(p["score"]) for p in output} for output in outputs]
+
+
+def parity_report(candidate, reference, inputs: List) -> dict:
+    """
+    Compare a candidate backend against the PyTorch reference on the same inputs.
+    Returns max/mean absolute score difference and top-1 label agreement.
+    """
+    candidate_scores = label_scores(candidate, inputs)
+    reference_scores = label_scores(reference, inputs)
+
+    diffs = []
+    agree = 0
+    for cand, ref in zip(candidate_scores, reference_scores):
+        labels = sorted(ref)
+        diffs.append(np.abs(np.array([cand.get(l, 0.0) for l in labels]) - np.array([ref[l] for l in labels])))
+        agree += max(cand, key=cand.get) == max(ref, key=ref.get)
+
+    diffs = np.concatenate(diffs) if diffs else np.zeros(1)
+    return {
+        "samples": len(inputs),
+        "max_abs_diff": round(float(np.max(diffs)), 5),
+        "mean_abs_diff": round(float(np.mean(diffs)), 5),
+        "top1_agreement": round(agree / max(1, len(inputs)), 4),
+    }
@@ -0,0 +1,61 @@
+# backend/models/loaders.py
+import numpy as np
+from models.registry import ModelRegistry
+from utils.audio_buffer import AudioBuffer
+from config import (
+    SAMPLE_RATE, WHISPER_MODEL, WHISPER_LITE_MODEL, DEGRADATION_ENABLED, DEGRADATION_MAX_TIER
+)
+from utils.degradation import TIERS
+
+# The smaller Whisper is only registered when a reachable degradation tier uses it
+LITE_WHISPER = (
+    DEGRADATION_ENABLED and WHISPER_LITE_MODEL != WHISPER_MODEL
+    and any(tier.lite_whisper for tier in TIERS[:DEGRADATION_MAX_TIER + 1])
+)
+
+# Models heavy enough to host once per node in the model server
+SERVED_MODELS = ("emotion_detector", "transcriber", "tts_engine") + (("transcriber_lite",) if LITE_WHISPER else ())
+
+# Not preloaded (and not counted by /ready): loaded when first needed, e.g.
+# the first time load pushes requests down to the "minimal" tier
+LAZY_MODELS = ("transcriber_lite",)
+
+# Model loaders import their heavy libraries lazily so importing this module stays cheap
+def _load_emotion_detector():
+    from models.emotion_detector import EmotionDetector
+    return EmotionDetector()
+
+def _load_response_generator():
+    from models.response_generator import ResponseGenerator
+    return ResponseGenerator()
+
+def _load_tts_engine():
+    from models.tts_engine import TTSEngine
+    return TTSEngine()
+
+def _load_transcriber():
+    from models.transcriber import Transcriber
+    return Transcriber()
+
+def _load_transcriber_lite():
+    from models.transcriber import Transcriber
+    return Transcriber(model_name=WHISPER_LITE_MODEL)
+
+def _warmup_audio():
+    return AudioBuffer(np.zeros(SAMPLE_RATE, dtype=np.float32), SAMPLE_RATE)
+
+LOADERS = {
+    "emotion_detector": (_load_emotion_detector, lambda m: m.detect(_warmup_audio(), "warming up")),
+    "response_generator": (_load_response_generator, None),
+    "tts_engine": (_load_tts_engine, lambda m: list(m.synthesize_stream(iter(["Warming up."])))),
+    "transcriber": (_load_transcriber, lambda m: m.transcribe(_warmup_audio())),
+}
+if LITE_WHISPER:
+    LOADERS["transcriber_lite"] = (_load_transcriber_lite, lambda m: m.transcribe(_warmup_audio()))
+
+
+def register_models(registry: ModelRegistry, names=None):
+    """Register in-process loaders (with warmup) for `names` (all models by default)"""
+    for name in names or LOADERS:
+        loader, warmup = LOADERS[name]
+        registry.register(name, loader, warmup=warmup, preload=name not in LAZY_MODELS)
@@ -0,0 +1,108 @@
+# backend/models/registry.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from utils.logger import MODEL_LOAD_SECONDS, MODEL_WARMUP_SECONDS
+
+
+class ModelRegistry:
+    """
+    Loads models in background threads, in parallel, on first use or at start().
+
+    Each model goes pending → loading → warming → ready (or failed). Warmup
+    runs one small inference so the first real request doesn't pay for lazy
+    kernel/graph initialisation. A failed model is retried on the next get().
+    Models registered with preload=False are skipped by start() and ready;
+    they load on first use (or an explicit start([name])).
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._specs: Dict[str, tuple] = {}
+        self._preload: Set[str] = set()
+        self._state: Dict[str, dict] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="model-load")
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        warmup: Optional[Callable[[Any], None]] = None,
+        preload: bool = True
+    ):
+        self._specs[name] = (loader, warmup)
+        if preload:
+            self._preload.add(name)
+        else:
+            self._preload.discard(name)
+        self._state[name] = state = {"state": "pending", "load_seconds": None, "warmup_seconds": None, "error": None}
+        MODEL_LOAD_SECONDS.set_function(lambda: state["load_seconds"], model=name)
+        MODEL_WARMUP_SECONDS.set_function(lambda: state["warmup_seconds"], model=name)
+
+    def start(self, names: Iterable[str] = None):
+        """Begin loading (all preloaded models by default) without waiting"""
+        for name in names or [name for name in self._specs if name in self._preload]:
+            self._submit(name)
+
+    def get(self, name: str) -> Any:
+        """Model instance, blocking until it is loaded"""
+        return self._submit(name).result()
+
+    async def aget(self, name: str) -> Any:
+        """Model instance, awaiting its load without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(name))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def is_ready(self, name: str) -> bool:
+        return self._state[name]["state"] == "ready"
+
+    @property
+    def ready(self) -> bool:
+        return all(self._state[name]["state"] == "ready" for name in self._preload)
+
+    def status(self) -> dict:
+        return {name: dict(state) for name, state in self._state.items()}
+
+    def _submit(self, name: str) -> Future:
+        if name not in self._specs:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._lock:
+            future = self._futures.get(name)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._executor.submit(self._load, name)
+                self._futures[name] = future
+            return future
+
+    def _load(self, name: str) -> Any:
+        loader, warmup = self._specs[name]
+        state = self._state[name]
+        state.update(state="loading", error=None)
+
+        try:
+            start = time.perf_counter()
+            model = loader()
+            state["load_seconds"] = round(time.perf_counter() - start, 3)
+        except Exception as e:
+            print(f"❌ Failed to load {name}: {e}")
+            state.update(state="failed", error=str(e))
+            raise
+
+        if warmup is not None:
+            state["state"] = "warming"
+            start = time.perf_counter()
+            try:
+                warmup(model)
+            except Exception as e:
+                # A failed warmup only costs first-request latency
+                print(f"⚠️ Warmup failed for {name}: {e}")
+            state["warmup_seconds"] = round(time.perf_counter() - start, 3)
+
+        state["state"] = "ready"
+        print(f"✅ {name} ready in {state['load_seconds']}s (+{state['warmup_seconds'] or 0}s warmup)")
+        return model
@@ -0,0 +1,241 @@
+# backend/models/remote.py
+"""
+Client side of the shared model server (model_server.py).
+
+With MODEL_SERVER_SOCKET set, the heavy models live in one model-server
+process per node and web workers register RemoteModel proxies in their
+ModelRegistry instead of loading weights: every method call becomes one
+request over the Unix socket, and generator methods stream their items
+back one frame at a time.
+
+Frames are a 4-byte big-endian length followed by a pickle. numpy arrays
+of at least MODEL_SERVER_SHM_MIN_KB (PCM buffers) travel out of band: the
+client copies the samples into a shared memory segment and the server maps
+that segment as an ndarray without copying it again. The socket is created
+with mode 0600, so only the app's own user can connect; that is what makes
+pickle acceptable here.
+"""
+import functools
+import io
+import pickle
+import queue
+import socket
+import struct
+from contextlib import nullcontext
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, List, Tuple
+import numpy as np
+from models.registry import ModelRegistry
+from utils.logger import timed
+from config import MODEL_SERVER_TIMEOUT, MODEL_SERVER_SHM_MIN_KB
+
+FRAME_HEADER = struct.Struct(">I")
+
+# How long one "ready" request waits on the server before the client asks again
+READY_POLL_SECONDS = 5.0
+
+
+class ModelServerError(Exception):
+    """Raised when the model server can't be reached or drops the connection"""
+
+
+class _SharedMemoryPickler(pickle.Pickler):
+    """Moves large ndarrays into shared memory segments instead of the stream"""
+
+    def __init__(self, file, min_bytes: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.min_bytes = min_bytes
+        self.segments = []
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray or obj.dtype.hasobject or obj.nbytes < self.min_bytes:
+            return None
+        segment = shared_memory.SharedMemory(create=True, size=obj.nbytes)
+        np.ndarray(obj.shape, obj.dtype, buffer=segment.buf)[...] = obj
+        self.segments.append(segment)
+        return ("shm", segment.name, obj.shape, obj.dtype.str)
+
+
+class _SharedMemoryUnpickler(pickle.Unpickler):
+    """Maps shared memory segments back as ndarrays (no copy)"""
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.segments = []
+
+    def persistent_load(self, pid):
+        _, name, shape, dtype = pid
+        segment = _attach(name)
+        self.segments.append(segment)
+        return np.ndarray(shape, np.dtype(dtype), buffer=segment.buf)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment for cleanup at
+        # exit, which would unlink a segment the sender owns
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def dumps_request(obj: Any, min_bytes: int) -> Tuple[bytes, List[shared_memory.SharedMemory]]:
+    buf = io.BytesIO()
+    pickler = _SharedMemoryPickler(buf, min_bytes)
+    try:
+        pickler.dump(obj)
+    except BaseException:
+        release_segments(pickler.segments, unlink=True)
+        raise
+    return buf.getvalue(), pickler.segments
+
+
+def loads_request(data: bytes) -> Tuple[Any, List[shared_memory.SharedMemory]]:
+    unpickler = _SharedMemoryUnpickler(io.BytesIO(data))
+    return unpickler.load(), unpickler.segments
+
+
+def release_segments(segments: List[shared_memory.SharedMemory], unlink: bool = False):
+    """Unmap segments (the owner also unlinks them); arrays over them must be gone first"""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # Something still holds a view; the mapping goes when that does
+            pass
+        if unlink:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(FRAME_HEADER.pack(len(payload)))
+    sock.sendall(payload)
+
+
+def recv_frame(sock: socket.socket) -> bytearray:
+    (size,) = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+    return _recv_exact(sock, size)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("model server closed the connection")
+        received += n
+    return buf
+
+
+class ModelServerClient:
+    """Blocking client with a small pool of idle connections (one call per connection at a time)"""
+
+    def __init__(
+        self,
+        socket_path: str,
+        timeout: float = MODEL_SERVER_TIMEOUT,
+        shm_min_bytes: int = MODEL_SERVER_SHM_MIN_KB * 1024
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.shm_min_bytes = shm_min_bytes
+        self._idle = queue.LifoQueue()
+
+    def call(self, model: str, method: str, *args, **kwargs) -> Any:
+        """Run model.method(*args, **kwargs) in the server; generators come back as generators"""
+        payload, segments = dumps_request((model, method, args, kwargs), self.shm_min_bytes)
+        try:
+            sock = self._checkout()
+            try:
+                # Model stages run in the server; here they show up as the round trip
+                with timed(f"{model}.{method}") if model else nullcontext():
+                    send_frame(sock, payload)
+                    status, value = pickle.loads(recv_frame(sock))
+            except OSError as e:
+                sock.close()
+                raise ModelServerError(f"Model server call {model}.{method} failed: {e}") from e
+        finally:
+            # The server is done with the input by the time it replies
+            release_segments(segments, unlink=True)
+
+        if status == "stream":
+            return self._stream(sock)
+        self._idle.put(sock)
+        if status == "error":
+            raise value
+        return value
+
+    def connect(self, name: str) -> "RemoteModel":
+        """Proxy for `name`, once the server has it loaded (the registry loader for remote models)"""
+        while not self.call(None, "ready", name):
+            pass
+        return RemoteModel(self, name)
+
+    def status(self) -> dict:
+        return self.call(None, "status")
+
+    def _checkout(self) -> socket.socket:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise ModelServerError(f"Model server unavailable at {self.socket_path}: {e}") from e
+        return sock
+
+    def _stream(self, sock: socket.socket):
+        """Items of a streamed reply; the connection is reused only if the stream is read to the end"""
+        finished = False
+        try:
+            while True:
+                try:
+                    status, value = pickle.loads(recv_frame(sock))
+                except OSError as e:
+                    raise ModelServerError(f"Model server stream failed: {e}") from e
+                if status != "item":
+                    finished = True
+                    if status == "error":
+                        raise value
+                    return
+                yield value
+        finally:
+            if finished:
+                self._idle.put(sock)
+            else:
+                sock.close()
+
+
+class RemoteModel:
+    """Stands in for a model hosted by the model server: public methods become calls"""
+
+    def __init__(self, client: ModelServerClient, name: str):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return functools.partial(self._client.call, self._name, method)
+
+    def __repr__(self):
+        return f"RemoteModel({self._name!r} @ {self._client.socket_path})"
+
+
+def register_remote_models(registry: ModelRegistry, socket_path: str, names, lazy=()) -> ModelServerClient:
+    """Register `names` as proxies to the model server (no weights load in this process)"""
+    client = ModelServerClient(socket_path)
+    for name in names:
+        registry.register(name, functools.partial(client.connect, name), preload=name not in lazy)
+    return client
@@ -1,13 +1,49 @@
 # backend/models/response_generator.py
+import time
 import google.generativeai as genai
-from config import GEMINI_API_KEY
+from config import GEMINI_API_KEY, EMOTIONS, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+from typing import Iterator
+from utils.text import normalize_text, split_sentences, stream_sentences
+from utils.ttl_cache import TTLCache
+from utils.logger import STAGE_SECONDS, register_cache_metrics, timed
+
+SYSTEM_PROMPT = """
+You are MoodMate, an empathetic AI wellness companion designed for mental health support.
+
+CURRENT EMOTIONAL STATE: {emotion}
+Tone: {tone}
+Focus: {focus}
+
+GUIDELINES:
+1. Keep responses warm, authentic, and non-judgmental
+2. Acknowledge their emotional state explicitly
+3. Offer practical, actionable suggestions when appropriate
+4. Use positive but realistic language
+5. Keep responses under 150 words
+6. Avoid being preachy or dismissive
+7. If they mention specific concerns, address them directly
+8. End with a supportive closing or gentle question
+
+Remember: You're a companion, not a therapist. Never pretend to diagnose or treat mental health conditions. If they mention crisis/harm, suggest professional resources.
+"""
 
 class ResponseGenerator:
     """Generate empathetic AI responses using Google Gemini"""
     
-    def __init__(self):
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel("models/gemini-2.5-flash-lite")
+    def __init__(self, model=None):
+        """
+        Args:
+            model: Optional object with Gemini's generate_content(prompt, stream=...)
+                   interface, e.g. a local stub for tests
+        """
+        if model is None:
+            genai.configure(api_key=GEMINI_API_KEY)
+            model = genai.GenerativeModel("models/gemini-2.5-flash-lite")
+        self.model = model
+        
+        # Successful replies keyed by (emotion, normalized input)
+        self.cache = TTLCache(max_size=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_TTL)
+        register_cache_metrics("response", self.cache)
         
         # Emotion-specific context
         self.emotion_context = {
@@ -40,52 +76,102 @@ class ResponseGenerator:
                 "focus": "explore their thoughts and feelings",
             }
         }
+        
+        # System prompts are static per emotion; build them once
+        self._system_prompts = {e: self._build_system_prompt(e) for e in self.emotion_context}
     
-    def generate(self, emotion: str, user_input: str = None) -> str:
+    def generate(self, emotion: str, user_input: str = None, template: bool = False) -> str:
         """
         Generate emotion-aware response
         
         Args:
             emotion: Detected emotion
             user_input: Optional user question/statement
+            template: Reply with the canned response for the emotion
+                instead of calling Gemini (degraded tiers under load)
         
         Returns:
             AI response text
         """
         
-        context = self.emotion_context.get(emotion, self.emotion_context["neutral"])
+        if template:
+            return self._fallback_response(emotion)
         
-        system_prompt = f"""
-You are MoodMate, an empathetic AI wellness companion designed for mental health support.
-
-CURRENT EMOTIONAL STATE: {emotion.upper()}
-Tone: {context['tone']}
-Focus: {context['focus']}
-
-GUIDELINES:
-1. Keep responses warm, authentic, and non-judgmental
-2. Acknowledge their emotional state explicitly
-3. Offer practical, actionable suggestions when appropriate
-4. Use positive but realistic language
-5. Keep responses under 150 words
-6. Avoid being preachy or dismissive
-7. If they mention specific concerns, address them directly
-8. End with a supportive closing or gentle question
-
-Remember: You're a companion, not a therapist. Never pretend to diagnose or treat mental health conditions. If they mention crisis/harm, suggest professional resources.
-"""
+        prompt, cache_key = self._prepare(emotion, user_input)
         
-        user_message = user_input or f"I'm feeling {emotion} right now."
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            response = self.model.generate_content(
-                f"{system_prompt}\n\nUser: {user_message}"
-            )
-            return response.text
+            with timed("gemini"):
+                response = self.model.generate_content(prompt)
+                text = response.text
         except Exception as e:
             print(f"❌ Gemini API error: {e}")
-            # Fallback response
+            # Fallback response (not cached, so the next call retries Gemini)
             return self._fallback_response(emotion)
+        
+        self.cache.set(cache_key, text)
+        return text
+    
+    def generate_stream(self, emotion: str, user_input: str = None, template: bool = False) -> Iterator[str]:
+        """
+        Generate emotion-aware response sentence by sentence
+        
+        Yields each complete sentence as soon as Gemini has streamed it, so
+        TTS can start before the whole reply exists. template=True yields
+        the canned response instead (see generate).
+        """
+        if template:
+            yield from split_sentences(self._fallback_response(emotion))
+            return
+        
+        prompt, cache_key = self._prepare(emotion, user_input)
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield from split_sentences(cached)
+            return
+        
+        sentences = []
+        try:
+            start = time.perf_counter()
+            chunks = self.model.generate_content(prompt, stream=True)
+            for sentence in stream_sentences(chunk.text for chunk in chunks):
+                if not sentences:
+                    # Time to the first sentence: what delays the spoken reply
+                    STAGE_SECONDS.observe(time.perf_counter() - start, stage="gemini_first_sentence")
+                sentences.append(sentence)
+                yield sentence
+        except Exception as e:
+            print(f"❌ Gemini API error: {e}")
+            if not sentences:
+                yield from split_sentences(self._fallback_response(emotion))
+            return
+        
+        self.cache.set(cache_key, " ".join(sentences))
+    
+    def _prepare(self, emotion: str, user_input: str = None):
+        """Prompt and cache key for one request"""
+        system_prompt = self._system_prompts.get(emotion) or self._build_system_prompt(emotion)
+        user_message = user_input or f"I'm feeling {emotion} right now."
+        
+        prompt = f"{system_prompt}\n\nUser: {user_message}"
+        cache_key = (emotion, normalize_text(user_message))
+        return prompt, cache_key
+    
+    def _build_system_prompt(self, emotion: str) -> str:
+        context = self.emotion_context.get(emotion, self.emotion_context["neutral"])
+        return SYSTEM_PROMPT.format(
+            emotion=emotion.upper(),
+            tone=context['tone'],
+            focus=context['focus']
+        )
+    
+    def fallback_phrases(self) -> dict:
+        """Every canned fallback reply, keyed by emotion"""
+        return {emotion: self._fallback_response(emotion) for emotion in EMOTIONS}
     
     def _fallback_response(self, emotion: str) -> str:
         """Fallback if API fails"""
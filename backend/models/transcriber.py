@@ -0,0 +1,87 @@
+# backend/models/transcriber.py
+import queue
+from typing import Union
+from utils.audio_buffer import AudioBuffer
+from utils.inference_cache import InferenceCache, get_inference_cache
+from utils.logger import timed
+from config import (
+    SAMPLE_RATE, WHISPER_MODEL, WHISPER_POOL_SIZE, WHISPER_BEAM_SIZE,
+    WHISPER_TEMPERATURE_FALLBACK, WHISPER_CONDITION_ON_PREVIOUS,
+    VAD_ENABLED, VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_PAD_MS
+)
+
+# Whisper's default temperature schedule, retried when decoding looks degenerate
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+class Transcriber:
+    """
+    Speech-to-text with a pool of Whisper instances.
+
+    A Whisper model holds per-decode state (kv-cache hooks), so concurrent
+    requests each borrow their own instance; `pool_size` bounds how many
+    transcriptions run at once in this worker.
+    """
+
+    def __init__(
+        self,
+        model_name: str = WHISPER_MODEL,
+        pool_size: int = WHISPER_POOL_SIZE,
+        beam_size: int = WHISPER_BEAM_SIZE,
+        temperature_fallback: bool = WHISPER_TEMPERATURE_FALLBACK,
+        condition_on_previous_text: bool = WHISPER_CONDITION_ON_PREVIOUS,
+        language: str = "en"
+    ):
+        import whisper
+
+        self.model_name = model_name
+        print(f"Loading Whisper '{model_name}' x{pool_size}...")
+
+        self._pool = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            self._pool.put(whisper.load_model(model_name))
+
+        # Greedy decoding with no fallback is fastest; beams/fallback trade latency for accuracy
+        self.options = {
+            "language": language,
+            "temperature": FALLBACK_TEMPERATURES if temperature_fallback else 0.0,
+            "condition_on_previous_text": condition_on_previous_text,
+        }
+        if beam_size:
+            self.options["beam_size"] = beam_size
+
+        # Transcripts by upload hash; the kind changes with model/decoding/VAD settings
+        self.cache = get_inference_cache()
+        self.cache_kind = "transcription:" + InferenceCache.fingerprint(
+            model_name, sorted(self.options.items()),
+            VAD_ENABLED, VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_PAD_MS
+        )
+
+        print(f"✅ Whisper '{model_name}' loaded")
+
+    def transcribe(self, audio: Union[AudioBuffer, str], cache_key: str = None) -> str:
+        """
+        Transcript text for a clip
+
+        cache_key: content hash of the original upload (InferenceCache.key);
+        a repeat upload returns the stored transcript without running Whisper
+        """
+        if self.cache and cache_key:
+            cached = self.cache.get_text(cache_key, self.cache_kind)
+            if cached is not None:
+                return cached
+
+        audio = AudioBuffer.coerce(audio, SAMPLE_RATE)
+        if len(audio) == 0:
+            return ""
+
+        model = self._pool.get()
+        try:
+            with timed("whisper"):
+                result = model.transcribe(audio.samples, **self.options)
+        finally:
+            self._pool.put(model)
+
+        if self.cache and cache_key:
+            self.cache.put_text(cache_key, self.cache_kind, result["text"])
+        return result["text"]
@@ -1,18 +1,52 @@
 # backend/models/tts_engine.py
 import pyttsx3
 from TTS.api import TTS
-from config import TTS_MODE
-from typing import Literal
+from config import (
+    TTS_MODE, DATA_DIR, OUTPUT_DIR, TTS_CACHE_ENABLED,
+    TTS_CACHE_MAX_MB, TTS_CACHE_MAX_AGE_HOURS
+)
+from utils.tts_cache import TTSCache
+from utils.logger import register_cache_metrics, timed
+from utils.text import split_sentences
+from typing import Iterable, Iterator, Tuple, Union
+import numpy as np
+import soundfile as sf
+import librosa
+import tempfile
+import threading
+import struct
 import os
 
+QUALITY_MODEL = "tts_models/en/ljspeech/vits"
+
+
+def wav_stream_header(sr: int, channels: int = 1, bits: int = 16) -> bytes:
+    """WAV header with unknown (maximum) length, for streamed PCM"""
+    byte_rate = sr * channels * bits // 8
+    block_align = channels * bits // 8
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sr, byte_rate, block_align, bits)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    samples = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (samples * 32767).astype("<i2").tobytes()
+
 class TTSEngine:
     """
     Text-to-speech with emotion-aware tone control
-    Supports both fast (pyttsx3) and quality (Coqui) modes
+    Supports both fast (pyttsx3) and quality (Coqui) modes; a quality
+    engine can still render single requests with pyttsx3 (fast=True)
     """
     
     def __init__(self, mode: str = None):
         self.mode = mode or TTS_MODE
+        self.fast_engine = None
+        # pyttsx3 engines are not thread-safe: one render at a time, start to finish
+        self._fast_lock = threading.RLock()
         print(f"🔊 Initializing TTS in {self.mode} mode...")
         
         # Fast mode: pyttsx3
@@ -26,7 +60,7 @@ class TTSEngine:
         elif self.mode == "quality":
             try:
                 self.quality_engine = TTS(
-                    model_name="tts_models/en/ljspeech/vits",
+                    model_name=QUALITY_MODEL,
                     gpu=False
                 )
                 print("✅ Coqui TTS initialized")
@@ -45,12 +79,23 @@ class TTSEngine:
             "neutral": {"rate": 150, "volume": 0.9},
             "surprised": {"rate": 170, "volume": 0.95}
         }
+        
+        # Synthesized audio keyed by (text, emotion, mode, voice)
+        self.cache = None
+        if TTS_CACHE_ENABLED:
+            self.cache = TTSCache(
+                OUTPUT_DIR / "tts_cache",
+                max_bytes=int(TTS_CACHE_MAX_MB * 1024 * 1024),
+                max_age_seconds=TTS_CACHE_MAX_AGE_HOURS * 3600
+            )
+            register_cache_metrics("tts", self.cache)
     
     def synthesize(
         self, 
         text: str, 
         emotion: str = "neutral",
-        output_path: str = None
+        output_path: str = None,
+        fast: bool = False
     ) -> str:
         """
         Generate speech with emotional tone
@@ -59,31 +104,109 @@ class TTSEngine:
             text: Text to synthesize
             emotion: Emotional context
             output_path: Where to save the audio file
+            fast: Render with pyttsx3 whatever the engine's mode (degraded tiers)
         
         Returns:
             Path to generated audio file
         """
         
-        if output_path is None:
-            output_path = f"outputs/tts_{emotion}_{os.urandom(4).hex()}.wav"
+        mode = "fast" if fast else self.mode
+        
+        if output_path is None and self.cache is not None:
+            return self._synthesize_cached(text, emotion, mode)
+        
+        generated = output_path is None
+        if generated:
+            output_path = str(OUTPUT_DIR / f"tts_{emotion}_{os.urandom(4).hex()}.wav")
         
         try:
-            if self.mode == "fast":
-                return self._synthesize_fast(text, emotion, output_path)
-            else:
-                return self._synthesize_quality(text, emotion, output_path)
+            with timed("tts"):
+                if mode == "fast":
+                    self._synthesize_fast(text, emotion, output_path)
+                else:
+                    self._synthesize_quality(text, emotion, output_path)
         except Exception as e:
             print(f"❌ TTS generation failed: {e}")
             raise
+        
+        # Generated files are reported relative to DATA_DIR ("outputs/..."), as /file serves them
+        return os.path.relpath(output_path, DATA_DIR) if generated else output_path
+    
+    def _cache_key(self, text: str, emotion: str, mode: str) -> str:
+        # Coqui output does not depend on emotion, so share entries across emotions
+        if mode == "fast":
+            return self.cache.key(text, emotion, mode, "pyttsx3")
+        return self.cache.key(text, "", mode, QUALITY_MODEL)
+    
+    def _synthesize_cached(self, text: str, emotion: str, mode: str) -> str:
+        """
+        Per-request output file for identical inputs, taken from the cache
+        (rendering on a miss). The file is linked out of the cache, so LRU
+        eviction never breaks a saved response_audio_path.
+        """
+        output_path = OUTPUT_DIR / f"tts_{emotion}_{os.urandom(4).hex()}.wav"
+        key = self._cache_key(text, emotion, mode)
+        
+        self._cached_file(text, emotion, mode, key)
+        if not self.cache.export(key, output_path):
+            # Evicted right away (larger than the whole cache, or by a concurrent put)
+            with timed("tts"):
+                if mode == "fast":
+                    self._synthesize_fast(text, emotion, str(output_path))
+                else:
+                    self._synthesize_quality(text, emotion, str(output_path))
+        
+        return os.path.relpath(output_path, DATA_DIR)
+    
+    def _cached_file(self, text: str, emotion: str, mode: str, key: str) -> str:
+        """Cached audio for identical inputs, rendering it on a miss"""
+        path = self.cache.get(key)
+        if path is None:
+            temp_path = str(self.cache.temp_path(key))
+            try:
+                with timed("tts"):
+                    if mode == "fast":
+                        self._synthesize_fast(text, emotion, temp_path)
+                    else:
+                        self._synthesize_quality(text, emotion, temp_path)
+                path = self.cache.put(key, temp_path)
+            except Exception as e:
+                print(f"❌ TTS generation failed: {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        return path
+    
+    def prewarm(self, phrases: dict, fast: bool = False):
+        """Render {emotion: text} into the cache ahead of time"""
+        if self.cache is None:
+            return
+        mode = "fast" if fast else self.mode
+        for emotion, text in phrases.items():
+            try:
+                self._cached_file(text, emotion, mode, self._cache_key(text, emotion, mode))
+            except Exception as e:
+                print(f"⚠️ TTS prewarm failed for {emotion}: {e}")
+        print(f"✅ TTS cache prewarmed with {len(phrases)} phrases ({mode})")
+    
+    def _get_fast_engine(self):
+        """pyttsx3 engine, created on first use when running in quality mode"""
+        with self._fast_lock:
+            if self.fast_engine is None:
+                self.fast_engine = pyttsx3.init()
+                print("✅ pyttsx3 initialized for fast requests")
+            return self.fast_engine
     
     def _synthesize_fast(self, text: str, emotion: str, output_path: str) -> str:
         """pyttsx3 synthesis with emotion control"""
         config = self.emotion_config.get(emotion, self.emotion_config["neutral"])
-        self.fast_engine.setProperty('rate', config['rate'])
-        self.fast_engine.setProperty('volume', config['volume'])
-        
-        self.fast_engine.save_to_file(text, output_path)
-        self.fast_engine.runAndWait()
+        with self._fast_lock:
+            fast_engine = self._get_fast_engine()
+            fast_engine.setProperty('rate', config['rate'])
+            fast_engine.setProperty('volume', config['volume'])
+            
+            fast_engine.save_to_file(text, output_path)
+            fast_engine.runAndWait()
         
         return output_path
     
@@ -94,3 +217,66 @@ class TTSEngine:
             file_path=output_path
         )
         return output_path
+
+    def synthesize_stream(
+        self,
+        text: Union[str, Iterable[str]],
+        emotion: str = "neutral",
+        fast: bool = False
+    ) -> Iterator[bytes]:
+        """
+        Sentence-by-sentence synthesis for streaming playback
+        
+        Yields a WAV header followed by 16-bit PCM for each sentence as soon
+        as it is rendered, so playback starts after the first sentence.
+        `text` may also be an iterable of sentences still being generated
+        (e.g. ResponseGenerator.generate_stream). fast=True renders with
+        pyttsx3 as in synthesize.
+        """
+        mode = "fast" if fast else self.mode
+        if isinstance(text, str) and self.cache is not None:
+            cached = self.cache.get(self._cache_key(text, emotion, mode))
+            if cached is not None:
+                samples, sr = sf.read(str(cached), dtype="float32")
+                if samples.ndim > 1:
+                    samples = samples.mean(axis=1)
+                yield wav_stream_header(sr)
+                yield to_pcm16(samples)
+                return
+        
+        sentences = split_sentences(text) if isinstance(text, str) else text
+        stream_sr = None
+        
+        for sentence in sentences:
+            try:
+                with timed("tts_sentence"):
+                    samples, sr = self._render_sentence(sentence, emotion, mode)
+            except Exception as e:
+                print(f"❌ TTS generation failed for sentence: {e}")
+                continue
+            
+            if stream_sr is None:
+                stream_sr = sr
+                yield wav_stream_header(stream_sr)
+            elif sr != stream_sr:
+                samples = librosa.resample(samples, orig_sr=sr, target_sr=stream_sr)
+            
+            yield to_pcm16(samples)
+    
+    def _render_sentence(self, text: str, emotion: str, mode: str) -> Tuple[np.ndarray, int]:
+        """Synthesize one sentence in memory"""
+        if mode == "fast":
+            # pyttsx3 can only render to a file
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                self._synthesize_fast(text, emotion, path)
+                samples, sr = sf.read(path, dtype="float32")
+            finally:
+                os.remove(path)
+            if samples.ndim > 1:
+                samples = samples.mean(axis=1)
+            return samples, sr
+        
+        samples = self.quality_engine.tts(text=text)
+        return np.asarray(samples, dtype=np.float32), self.quality_engine.synthesizer.output_sample_rate
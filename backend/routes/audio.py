@@ -1,105 +1,427 @@
 # backend/routes/audio.py
-from fastapi import APIRouter, UploadFile, File, Depends
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from contextlib import AsyncExitStack
+import asyncio
+import base64
+import functools
 import json
 import os
+import time
 
-from models.emotion_detector import EmotionDetector
-from models.response_generator import ResponseGenerator
-from models.tts_engine import TTSEngine
-from database.database import get_db
-from database.models import MoodEntry
-import whisper
+from models.registry import ModelRegistry
+from models.loaders import LOADERS, SERVED_MODELS, LAZY_MODELS, register_models
+from models.remote import register_remote_models
+from database.database import get_async_db
+from database.models import MoodEntry, MoodRollup, score_columns
+from database.rollups import PERIODS, ALL_USERS, bucket_start, rollup_statements, rollup_payload
+from utils.audio_buffer import AudioBuffer
+from utils.audio_processor import AudioProcessor
+from utils.uploads import UploadRejected, save_upload, decode_upload
+from utils.worker_pool import WorkerPool, PoolSaturated
+from utils.stage_graph import StageGraph
+from utils.degradation import DegradationPolicy, Tier, FULL
+from utils.logger import ACTIVE_WORKERS, DEGRADATION_TIER, QUEUE_DEPTH, timed
+from config import (
+    SAMPLE_RATE, INFERENCE_CONCURRENCY, INFERENCE_QUEUE_DEPTH, INFERENCE_QUEUE_TIMEOUT,
+    INFERENCE_STAGE_PARALLELISM, MODEL_LOAD_WORKERS, MODEL_SERVER_SOCKET,
+    VAD_ENABLED, DATA_DIR, UPLOAD_DIR, MAX_UPLOAD_MB, MAX_AUDIO_SECONDS, EMOTIONS,
+    DEGRADATION_ENABLED, DEGRADATION_MAX_TIER, DEGRADATION_TARGET_SECONDS,
+    DEGRADATION_STEP_UP, DEGRADATION_STEP_DOWN, DEGRADATION_STEP_SECONDS, DEGRADATION_RECOVER_SECONDS
+)
 
 router = APIRouter(prefix="/api/audio", tags=["audio"])
 
-# Initialize models (loaded once)
-emotion_detector = EmotionDetector()
-response_generator = ResponseGenerator()
-tts_engine = TTSEngine()
-whisper_model = whisper.load_model("base")
+# Largest page /history will return
+MAX_HISTORY_LIMIT = 200
+
+# Longest window /analytics will return
+MAX_ANALYTICS_DAYS = 730
+
+# Models are loaded once, in the background (see app lifespan) or on first use.
+# With a model server the heavy ones live there and this worker holds proxies.
+registry = ModelRegistry(max_workers=MODEL_LOAD_WORKERS)
+if MODEL_SERVER_SOCKET:
+    register_models(registry, [name for name in LOADERS if name not in SERVED_MODELS])
+    register_remote_models(registry, MODEL_SERVER_SOCKET, SERVED_MODELS, lazy=LAZY_MODELS)
+else:
+    register_models(registry)
+
+# Blocking model stages run here so the event loop stays responsive; each
+# admitted request may run several independent stages at once
+inference_pool = WorkerPool(
+    "inference",
+    max_concurrency=INFERENCE_CONCURRENCY,
+    queue_depth=INFERENCE_QUEUE_DEPTH,
+    queue_timeout=INFERENCE_QUEUE_TIMEOUT,
+    max_workers=INFERENCE_CONCURRENCY * max(1, INFERENCE_STAGE_PARALLELISM)
+)
+QUEUE_DEPTH.set_function(lambda: inference_pool.queued, queue="inference")
+ACTIVE_WORKERS.set_function(lambda: inference_pool.active, pool="inference")
+
+# Under load, requests step down to cheaper quality tiers instead of timing out
+degradation = DegradationPolicy(
+    in_flight=lambda: inference_pool.active + inference_pool.queued,
+    capacity=inference_pool.max_concurrency + inference_pool.queue_depth,
+    target_seconds=DEGRADATION_TARGET_SECONDS,
+    step_up=DEGRADATION_STEP_UP,
+    step_down=DEGRADATION_STEP_DOWN,
+    step_seconds=DEGRADATION_STEP_SECONDS,
+    recover_seconds=DEGRADATION_RECOVER_SECONDS,
+    max_tier=DEGRADATION_MAX_TIER,
+    enabled=DEGRADATION_ENABLED
+)
+DEGRADATION_TIER.set_function(lambda: degradation.level)
+
+# Voice activity detection (cheap; no model weights)
+vad = AudioProcessor(sr=SAMPLE_RATE)
+
+def speech_only(audio_buffer: AudioBuffer) -> AudioBuffer:
+    """Voiced part of a clip for Whisper; the emotion detector segments on its own"""
+    return vad.trim_silence(audio_buffer) if VAD_ENABLED else audio_buffer
+
+# Pipeline stages. Each one fetches its model itself, so a model still
+# loading only holds up the stages that need it.
+async def _transcribe(speech_buffer: AudioBuffer, cache_key: str = None, lite: bool = False) -> str:
+    name = "transcriber"
+    # The smaller Whisper is only registered when a reachable tier uses it, and
+    # loads lazily: until it is ready, degraded requests keep the full model
+    if lite and "transcriber_lite" in registry:
+        if registry.is_ready("transcriber_lite"):
+            name = "transcriber_lite"
+        else:
+            registry.start(["transcriber_lite"])
+    transcriber = await registry.aget(name)
+    return await inference_pool.run(transcriber.transcribe, speech_buffer, cache_key=cache_key)
+
+async def _no_transcription() -> str:
+    return ""
+
+async def _analyze_audio(audio_buffer: AudioBuffer, cache_key: str = None):
+    emotion_detector = await registry.aget("emotion_detector")
+    return await inference_pool.run(emotion_detector.analyze_audio, audio_buffer, cache_key)
+
+async def _score_text(transcription: str):
+    if not transcription:
+        return None
+    emotion_detector = await registry.aget("emotion_detector")
+    return await inference_pool.run(emotion_detector.score_text, transcription)
+
+async def _no_text_scores(transcription: str):
+    return None
+
+async def _fuse(analysis, text_scores) -> dict:
+    emotion_detector = await registry.aget("emotion_detector")
+    # Cheap numpy, but a call into the model server when one is configured
+    return await inference_pool.run(emotion_detector.fuse, analysis, text_scores)
+
+async def _generate_response(emotion_result: dict, transcription: str, template: bool = False) -> str:
+    response_generator = await registry.aget("response_generator")
+    return await inference_pool.run(
+        response_generator.generate,
+        emotion=emotion_result["primary_emotion"],
+        user_input=transcription,
+        template=template
+    )
+
+async def _synthesize(ai_response: str, emotion_result: dict, fast: bool = False) -> str:
+    tts_engine = await registry.aget("tts_engine")
+    return await inference_pool.run(
+        tts_engine.synthesize,
+        text=ai_response,
+        emotion=emotion_result["primary_emotion"],
+        fast=fast
+    )
+
+def analysis_graph(transcribe: bool, cache_key: str = None, tier: Tier = FULL) -> StageGraph:
+    """
+    Emotion analysis of a decoded clip (input "audio"):
+
+        audio → speech → transcription → text_scores ┐
+        audio → audio_analysis (segments + prosody) ─┴→ emotion
+
+    Transcription and audio emotion/prosody share no inputs, so they run
+    side by side; only fusion waits for both. A degraded `tier` may use the
+    smaller Whisper and skip text sentiment (audio + prosody only).
+    """
+    graph = StageGraph(inference_pool, inputs=("audio",))
+    if transcribe:
+        transcribe_stage = functools.partial(_transcribe, cache_key=cache_key, lite=tier.lite_whisper)
+        graph.add("speech", speech_only, after=("audio",))
+        graph.add("transcription", transcribe_stage, after=("speech",))
+    else:
+        graph.add("transcription", _no_transcription)
+    graph.add("audio_analysis", functools.partial(_analyze_audio, cache_key=cache_key), after=("audio",))
+    graph.add("text_scores", _score_text if tier.text_sentiment else _no_text_scores, after=("transcription",))
+    graph.add("emotion", _fuse, after=("audio_analysis", "text_scores"))
+    return graph
+
+async def save_mood_entry(
+    db: AsyncSession,
+    emotion_result: dict,
+    transcription: str,
+    audio_duration: float,
+    ai_response: str,
+    response_audio_path: str,
+    user_id: str = None
+) -> MoodEntry:
+    """Persist one processed recording"""
+    mood_entry = MoodEntry(
+        timestamp=datetime.utcnow(),
+        user_id=user_id,
+        primary_emotion=emotion_result["primary_emotion"],
+        emotion_scores=json.dumps(emotion_result["scores"]),
+        confidence=emotion_result["confidence"],
+        **score_columns(emotion_result["scores"]),
+        transcription=transcription,
+        audio_duration=audio_duration,
+        ai_response=ai_response,
+        response_audio_path=response_audio_path
+    )
+    with timed("db_commit"):
+        db.add(mood_entry)
+        await db.flush()
+        # Same transaction: the dashboards' day/week buckets never miss an entry
+        for stmt in rollup_statements(mood_entry, db.bind.dialect.name):
+            await db.execute(stmt)
+        # The async driver commits on its own thread; the event loop keeps serving
+        await db.commit()
+    return mood_entry
+
+def saturated_error(e: PoolSaturated) -> HTTPException:
+    """429 (queue full) or 503 (waited too long), with Retry-After"""
+    return HTTPException(
+        status_code=e.status_code,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def entry_response(mood_entry: MoodEntry, emotion_result: dict, tier: Tier = FULL) -> dict:
+    """API payload for a processed recording (tier: quality it was processed at)"""
+    return {
+        "session_id": mood_entry.id,
+        "emotion": emotion_result["primary_emotion"],
+        "confidence": emotion_result["confidence"],
+        "emotion_scores": emotion_result["scores"],
+        "transcription": mood_entry.transcription,
+        "ai_response": mood_entry.ai_response,
+        "response_audio_url": (
+            f"/api/audio/file/{mood_entry.response_audio_path}"
+            if mood_entry.response_audio_path else None
+        ),
+        "response_audio_stream_url": f"/api/audio/tts/stream/{mood_entry.id}",
+        "timestamp": mood_entry.timestamp.isoformat(),
+        "quality_tier": tier.name
+    }
 
 @router.post("/process")
-async def process_audio(audio: UploadFile = File(...), db: Session = Depends(get_db)):
+async def process_audio(
+    audio: UploadFile = File(...),
+    mode: str = "sync",
+    tts: str = "file",
+    transcribe: bool = True,
+    user_id: str = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Main endpoint: Process audio → Detect emotion → Generate response → TTS
+    
+    mode=job returns a job id immediately; poll GET /api/audio/jobs/{id}
+    tts=stream skips file synthesis; play response_audio_stream_url instead
+    transcribe=false skips Whisper (audio-only emotion, fastest)
+    user_id scopes the entry for /history
+    
+    Under load the request may run at a cheaper quality tier (fast TTS,
+    template reply, no text sentiment, smaller Whisper); the response
+    reports it as quality_tier.
     """
     
+    if mode == "job":
+        from routes.jobs import submit_job
+        return await submit_job(audio, db, transcribe=transcribe, user_id=user_id)
+    
+    audio_path = None
+    
     try:
-        # 1. Save uploaded audio
-        audio_path = f"uploads/{audio.filename}"
-        with open(audio_path, "wb") as f:
-            f.write(await audio.read())
+        # 1. Stream the upload to a unique file; its hash keys the inference cache
+        audio_path, content_key = await save_upload(
+            audio, UPLOAD_DIR, max_bytes=int(MAX_UPLOAD_MB * 1024 * 1024)
+        )
         
-        # 2. Transcribe audio
-        result = whisper_model.transcribe(audio_path, language="en")
-        transcription = result["text"]
+        # Quality tier for this request, from the load when it arrives
+        tier = degradation.current()
         
-        # 3. Detect emotion
-        emotion_result = emotion_detector.detect(audio_path, transcription)
+        async with inference_pool.admit():
+            # 2. Decode once (within the duration limit); every stage below reuses this buffer
+            audio_buffer = await inference_pool.run(decode_upload, audio_path, MAX_AUDIO_SECONDS)
+            
+            # 3-6. Transcribe (unless the client wants audio emotion alone) alongside
+            # audio emotion + prosody, fuse, generate the response, and start TTS
+            # as soon as its text exists (unless the client streams it)
+            graph = analysis_graph(transcribe, cache_key=content_key, tier=tier)
+            graph.add(
+                "ai_response",
+                functools.partial(_generate_response, template=tier.template_response),
+                after=("emotion", "transcription")
+            )
+            if tts != "stream":
+                graph.add(
+                    "response_audio_path",
+                    functools.partial(_synthesize, fast=tier.fast_tts),
+                    after=("ai_response", "emotion")
+                )
+            pipeline_start = time.perf_counter()
+            results = await graph.run(audio=audio_buffer)
+            degradation.observe(time.perf_counter() - pipeline_start)
         
-        # 4. Generate response
-        ai_response = response_generator.generate(
-            emotion=emotion_result["primary_emotion"],
-            user_input=transcription
-        )
+        emotion_result = results["emotion"]
         
-        # 5. Generate response audio (TTS)
-        response_audio_path = tts_engine.synthesize(
-            text=ai_response,
-            emotion=emotion_result["primary_emotion"]
+        # 7. Save to database
+        mood_entry = await save_mood_entry(
+            db,
+            emotion_result=emotion_result,
+            transcription=results["transcription"],
+            audio_duration=audio_buffer.duration,
+            ai_response=results["ai_response"],
+            response_audio_path=results.get("response_audio_path"),
+            user_id=user_id
         )
         
-        # 6. Save to database
-        mood_entry = MoodEntry(
-            timestamp=datetime.utcnow(),
-            primary_emotion=emotion_result["primary_emotion"],
-            emotion_scores=json.dumps(emotion_result["scores"]),
-            confidence=emotion_result["confidence"],
-            transcription=transcription,
-            audio_duration=0.0,  # Could calculate from audio
-            ai_response=ai_response,
-            response_audio_path=response_audio_path
-        )
-        db.add(mood_entry)
-        db.commit()
-        db.refresh(mood_entry)
-        
-        # 7. Return response
-        return {
-            "session_id": mood_entry.id,
-            "emotion": emotion_result["primary_emotion"],
-            "confidence": emotion_result["confidence"],
-            "emotion_scores": emotion_result["scores"],
-            "transcription": transcription,
-            "ai_response": ai_response,
-            "response_audio_url": f"/api/audio/file/{response_audio_path}",
-            "timestamp": mood_entry.timestamp.isoformat()
-        }
+        # 8. Return response
+        return entry_response(mood_entry, emotion_result, tier)
+    
+    except PoolSaturated as e:
+        print(f"⚠️ Rejecting audio request: {e}")
+        raise saturated_error(e)
+    
+    except UploadRejected as e:
+        print(f"⚠️ Rejecting upload: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
     except Exception as e:
         print(f"❌ Error processing audio: {e}")
-        return {"error": str(e)}, 500
+        raise HTTPException(status_code=500, detail=str(e))
     
     finally:
         # Cleanup
-        if os.path.exists(audio_path):
+        if audio_path and os.path.exists(audio_path):
             os.remove(audio_path)
 
 @router.get("/file/{file_path:path}")
 async def get_audio_file(file_path: str):
-    """Serve generated audio files"""
+    """Serve generated audio files (paths are relative to DATA_DIR)"""
     from fastapi.responses import FileResponse
     
-    if os.path.exists(file_path):
-        return FileResponse(file_path, media_type="audio/wav")
-    return {"error": "File not found"}, 404
+    data_dir = DATA_DIR.resolve()
+    path = (data_dir / file_path).resolve()
+    if path.is_relative_to(data_dir) and path.is_file():
+        return FileResponse(path, media_type="audio/wav")
+    raise HTTPException(status_code=404, detail="File not found")
+
+@router.get("/tts/stream/{session_id}")
+async def stream_response_audio(session_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Stream the AI response for a session as WAV, sentence by sentence"""
+    from fastapi.responses import StreamingResponse
+    from starlette.background import BackgroundTask
+    
+    mood_entry = await db.get(MoodEntry, session_id)
+    if mood_entry is None or not mood_entry.ai_response:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    tts_engine = await registry.aget("tts_engine")
+    fast = degradation.current().fast_tts
+    
+    # Sentences render on the worker pool, so the stream holds an admission
+    # slot until it ends; a busy node answers 429/503 before any audio is sent
+    slot = AsyncExitStack()
+    try:
+        await slot.enter_async_context(inference_pool.admit())
+        chunks = await inference_pool.run(
+            tts_engine.synthesize_stream, mood_entry.ai_response, mood_entry.primary_emotion, fast=fast
+        )
+    except PoolSaturated as e:
+        print(f"⚠️ Rejecting TTS stream: {e}")
+        raise saturated_error(e)
+    except Exception:
+        await slot.aclose()
+        raise
+    
+    async def release():
+        # Stop the sentence generator (no further renders), then free the slot
+        chunks.close()
+        await slot.aclose()
+    
+    async def audio_chunks():
+        # Render each sentence on the worker pool; send it while the next renders
+        rendering = None
+        try:
+            while True:
+                # Shielded: a disconnect cancels the wait, not the render in progress
+                rendering = asyncio.ensure_future(inference_pool.run(next, chunks, None))
+                chunk = await asyncio.shield(rendering)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            # On disconnect, the worker is busy until its sentence is done; the
+            # slot stays held until then, and the generator is closed after
+            if rendering is not None and not rendering.done():
+                await asyncio.gather(rendering, return_exceptions=True)
+            await release()
+    
+    # Also released after the response if the body was never iterated (early
+    # disconnect); releasing a second time does nothing
+    return StreamingResponse(audio_chunks(), media_type="audio/wav", background=BackgroundTask(release))
 
 @router.get("/history")
-async def get_mood_history(db: Session = Depends(get_db), limit: int = 30):
-    """Retrieve mood history"""
-    entries = db.query(MoodEntry).order_by(MoodEntry.timestamp.desc()).limit(limit).all()
+async def get_mood_history(
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = 30,
+    user_id: str = None,
+    cursor: str = None,
+    emotion: str = None,
+    min_score: float = None
+):
+    """
+    Retrieve mood history, newest first
+    
+    Pass next_cursor back as cursor for the following page (keyset
+    pagination, so deep pages cost the same as the first). emotion +
+    min_score keep only entries scoring at least min_score for emotion;
+    min_score on its own is rejected since it has no emotion to score.
+    """
+    limit = max(1, min(limit, MAX_HISTORY_LIMIT))
+    query = select(MoodEntry)
+    
+    if user_id is not None:
+        query = query.where(MoodEntry.user_id == user_id)
+    
+    if min_score is not None and emotion is None:
+        raise HTTPException(status_code=400, detail="min_score requires emotion")
+    
+    if emotion is not None:
+        if emotion not in EMOTIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown emotion '{emotion}'")
+        query = query.where(getattr(MoodEntry, f"score_{emotion}") >= (min_score or 0.0))
+    
+    if cursor:
+        try:
+            before_timestamp, before_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(or_(
+            MoodEntry.timestamp < before_timestamp,
+            and_(MoodEntry.timestamp == before_timestamp, MoodEntry.id < before_id)
+        ))
+    
+    result = await db.execute(
+        query.order_by(MoodEntry.timestamp.desc(), MoodEntry.id.desc()).limit(limit + 1)
+    )
+    entries = result.scalars().all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
     
     return {
         "entries": [
@@ -111,5 +433,52 @@ async def get_mood_history(db: Session = Depends(get_db), limit: int = 30):
                 "response": e.ai_response
             }
             for e in entries
-        ]
+        ],
+        "next_cursor": encode_cursor(entries[-1]) if has_more else None
+    }
+
+@router.get("/analytics")
+async def get_mood_analytics(
+    db: AsyncSession = Depends(get_async_db),
+    period: str = "day",
+    user_id: str = None,
+    days: int = 90
+):
+    """
+    Mood trends from precomputed rollups: one bucket per day or week
+    (oldest first) with entry count, mean confidence, primary-emotion
+    distribution and mean scores. Reads O(buckets) rows, never raw entries.
+    """
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of {', '.join(PERIODS)}")
+    days = max(1, min(days, MAX_ANALYTICS_DAYS))
+    
+    since = bucket_start(datetime.utcnow() - timedelta(days=days - 1), period)
+    result = await db.execute(
+        select(MoodRollup)
+        .where(
+            MoodRollup.period == period,
+            MoodRollup.user_key == (user_id or ALL_USERS),
+            MoodRollup.bucket_start >= since
+        )
+        .order_by(MoodRollup.bucket_start)
+    )
+    rollups = result.scalars().all()
+    
+    return {
+        "period": period,
+        "user_id": user_id,
+        "buckets": [rollup_payload(r) for r in rollups]
     }
+
+def encode_cursor(entry: MoodEntry) -> str:
+    """Opaque position after `entry` in (timestamp, id) order"""
+    raw = f"{entry.timestamp.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, entry_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(timestamp), int(entry_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,297 @@
+# backend/routes/jobs.py
+from fastapi import APIRouter, UploadFile, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+import asyncio
+import contextlib
+import json
+import os
+import uuid
+
+from database.database import get_async_db, AsyncSessionLocal
+from database.models import AudioJob, MoodEntry
+from routes.audio import (
+    registry, inference_pool, speech_only, save_mood_entry, entry_response
+)
+from utils.audio_buffer import AudioBuffer
+from utils.inference_cache import InferenceCache
+from utils.job_queue import JobQueue
+from utils.uploads import UploadRejected, save_upload, check_duration, decode_upload
+from utils.worker_pool import PoolSaturated
+from utils.logger import QUEUE_DEPTH
+from config import (
+    JOB_WORKERS, JOB_UPLOAD_DIR, JOB_POLL_SECONDS, JOB_HEARTBEAT_SECONDS, JOB_STALE_SECONDS,
+    MAX_UPLOAD_MB, MAX_AUDIO_SECONDS
+)
+
+router = APIRouter(prefix="/api/audio/jobs", tags=["jobs"])
+
+# Longest a client may block in GET /jobs/{id}?wait=...
+MAX_WAIT_SECONDS = 60
+
+# How often a long-poll re-reads a job another worker process is running
+WAIT_POLL_SECONDS = 0.5
+
+
+async def submit_job(
+    audio: UploadFile, db: AsyncSession, transcribe: bool = True, user_id: str = None
+) -> JSONResponse:
+    """Persist the upload, create a queued job and return its id (202)"""
+    job_id = uuid.uuid4().hex
+    audio_path = None
+    try:
+        audio_path, _ = await save_upload(
+            audio, JOB_UPLOAD_DIR, max_bytes=int(MAX_UPLOAD_MB * 1024 * 1024), name=job_id
+        )
+        check_duration(audio_path, MAX_AUDIO_SECONDS)
+    except UploadRejected as e:
+        if audio_path and os.path.exists(audio_path):
+            os.remove(audio_path)
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    job = AudioJob(
+        id=job_id, status="queued", stage="uploaded",
+        audio_path=audio_path, transcribe=transcribe, user_id=user_id
+    )
+    db.add(job)
+    await db.commit()
+
+    job_queue.enqueue(job_id)
+
+    return JSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": job.status,
+        "status_url": f"/api/audio/jobs/{job_id}"
+    })
+
+
+async def claim_job(db: AsyncSession, job_id: str) -> bool:
+    """Atomically move a queued job to running; False if another worker got it first"""
+    result = await db.execute(
+        update(AudioJob)
+        .where(AudioJob.id == job_id, AudioJob.status == "queued")
+        .values(status="running", attempts=func.coalesce(AudioJob.attempts, 0) + 1, error=None)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def _heartbeat(job_id: str):
+    """Keep updated_at fresh while the job runs, so other workers don't consider it stale"""
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(AudioJob)
+                    .where(AudioJob.id == job_id, AudioJob.status == "running")
+                    .values(updated_at=datetime.utcnow())
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"⚠️ Job {job_id} heartbeat failed: {e}")
+
+
+async def run_job(job_id: str):
+    """Claim a queued job and run its remaining stages, resuming after the last persisted one"""
+    async with AsyncSessionLocal() as db:
+        if not await claim_job(db, job_id):
+            return
+        job = await db.get(AudioJob, job_id)
+        heartbeat = asyncio.create_task(_heartbeat(job_id))
+
+        try:
+            while True:
+                try:
+                    async with inference_pool.admit():
+                        await _run_stages(job, db)
+                    break
+                except PoolSaturated as e:
+                    # Jobs wait for capacity instead of failing
+                    await asyncio.sleep(e.retry_after)
+
+            job.status = "completed"
+            await db.commit()
+
+            if os.path.exists(job.audio_path):
+                os.remove(job.audio_path)
+
+        except Exception as e:
+            print(f"❌ Job {job_id} failed after stage '{job.stage}': {e}")
+            await db.rollback()
+            await db.execute(
+                update(AudioJob).where(AudioJob.id == job_id).values(status="failed", error=str(e))
+            )
+            await db.commit()
+
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+
+
+async def _run_stages(job: AudioJob, db: AsyncSession):
+    audio_buffer = None
+    content_key = None
+
+    async def decode() -> AudioBuffer:
+        nonlocal audio_buffer, content_key
+        if audio_buffer is None:
+            audio_buffer = await inference_pool.run(decode_upload, job.audio_path, MAX_AUDIO_SECONDS)
+            # Resubmitted recordings reuse cached inference results
+            content_key = await inference_pool.run(InferenceCache.file_key, job.audio_path)
+        return audio_buffer
+
+    # 1. Transcribe (skipped for audio-only jobs)
+    if job.transcription is None:
+        buffer = await decode()
+        job.transcription = ""
+        if job.transcribe is not False:
+            speech_buffer = await inference_pool.run(speech_only, buffer)
+            transcriber = await registry.aget("transcriber")
+            job.transcription = await inference_pool.run(
+                transcriber.transcribe, speech_buffer, cache_key=content_key
+            )
+        job.audio_duration = buffer.duration
+        job.stage = "transcribed"
+        await db.commit()
+
+    # 2. Detect emotion
+    if job.emotion_result is None:
+        buffer = await decode()
+        emotion_detector = await registry.aget("emotion_detector")
+        emotion_result = await inference_pool.run(
+            emotion_detector.detect, buffer, job.transcription, cache_key=content_key
+        )
+        job.emotion_result = json.dumps(emotion_result)
+        job.stage = "detected"
+        await db.commit()
+
+    emotion_result = json.loads(job.emotion_result)
+
+    # 3. Generate response
+    if job.ai_response is None:
+        response_generator = await registry.aget("response_generator")
+        job.ai_response = await inference_pool.run(
+            response_generator.generate,
+            emotion=emotion_result["primary_emotion"],
+            user_input=job.transcription
+        )
+        job.stage = "responded"
+        await db.commit()
+
+    # 4. Generate response audio (TTS)
+    if job.response_audio_path is None:
+        tts_engine = await registry.aget("tts_engine")
+        job.response_audio_path = await inference_pool.run(
+            tts_engine.synthesize,
+            text=job.ai_response,
+            emotion=emotion_result["primary_emotion"]
+        )
+        job.stage = "synthesized"
+        await db.commit()
+
+    # 5. Save to database
+    if job.mood_entry_id is None:
+        async with AsyncSessionLocal() as entry_db:
+            mood_entry = await save_mood_entry(
+                entry_db,
+                emotion_result=emotion_result,
+                transcription=job.transcription,
+                audio_duration=job.audio_duration or 0.0,
+                ai_response=job.ai_response,
+                response_audio_path=job.response_audio_path,
+                user_id=job.user_id
+            )
+        job.mood_entry_id = mood_entry.id
+        job.stage = "saved"
+        await db.commit()
+
+
+async def pending_job_ids() -> list:
+    """
+    Queued jobs, oldest first. Running jobs whose heartbeat stopped (their
+    worker died or restarted) go back to queued first, so they resume.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(AudioJob)
+            .where(AudioJob.status == "running", AudioJob.updated_at < stale_before)
+            .values(status="queued")
+        )
+        await db.commit()
+        result = await db.execute(
+            select(AudioJob.id).where(AudioJob.status == "queued").order_by(AudioJob.created_at)
+        )
+        return list(result.scalars())
+
+
+job_queue = JobQueue(
+    "audio-jobs", run_job, workers=JOB_WORKERS, poll=pending_job_ids, poll_seconds=JOB_POLL_SECONDS
+)
+QUEUE_DEPTH.set_function(lambda: job_queue.depth, queue="jobs")
+
+
+async def _job_status(job: AudioJob, db: AsyncSession) -> dict:
+    payload = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+    if job.status == "completed" and job.mood_entry_id is not None:
+        mood_entry = await db.get(MoodEntry, job.mood_entry_id)
+        if mood_entry is not None:
+            payload["result"] = entry_response(mood_entry, json.loads(job.emotion_result))
+    return payload
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, wait: float = 0, db: AsyncSession = Depends(get_async_db)):
+    """
+    Job status. With ?wait=N the call blocks up to N seconds for the job
+    to finish (long-poll) instead of returning immediately.
+    """
+    job = await db.get(AudioJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if wait > 0:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + min(wait, MAX_WAIT_SECONDS)
+        # Any worker process may be running it: re-read the row (a run in this one wakes us at once)
+        while job.status in ("queued", "running"):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await job_queue.wait(job_id, timeout=min(WAIT_POLL_SECONDS, remaining))
+            await db.refresh(job)
+
+    return await _job_status(job, db)
+
+
+@router.post("/{job_id}/retry")
+async def retry_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Re-queue a failed job; it resumes from its last completed stage"""
+    job = await db.get(AudioJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Conditional, so two concurrent retries queue it once
+    result = await db.execute(
+        update(AudioJob).where(AudioJob.id == job_id, AudioJob.status == "failed").values(status="queued")
+    )
+    await db.commit()
+    await db.refresh(job)
+    if result.rowcount != 1:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, only failed jobs can be retried")
+
+    job_queue.enqueue(job_id)
+
+    return await _job_status(job, db)
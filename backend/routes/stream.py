@@ -0,0 +1,245 @@
+# backend/routes/stream.py
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import asyncio
+import json
+
+from database.database import AsyncSessionLocal
+from routes.audio import (
+    registry, inference_pool, degradation, analysis_graph, save_mood_entry, entry_response
+)
+from utils.stream_buffer import StreamBuffer
+from utils.worker_pool import PoolSaturated
+from config import (
+    SAMPLE_RATE, CHUNK_SIZE, STREAM_WINDOW_SECONDS,
+    STREAM_UPDATE_SECONDS, STREAM_MAX_SECONDS, STREAM_TRANSCRIBE_WINDOW_SECONDS
+)
+
+router = APIRouter(prefix="/api/audio", tags=["stream"])
+
+
+class PartialTranscript:
+    """
+    Transcript so far, for partial updates. Only the audio after the last
+    committed point is (re)transcribed; once that tail reaches
+    `window_seconds` its text is committed and the next tail starts where it
+    ended, so each partial costs at most one window of Whisper however long
+    the stream runs. (The final result transcribes the whole recording.)
+    """
+
+    def __init__(self, sr: int = SAMPLE_RATE, window_seconds: float = STREAM_TRANSCRIBE_WINDOW_SECONDS):
+        self.window_samples = int(window_seconds * sr)
+        self.committed = []
+        self.start = 0  # first sample not covered by committed text
+
+    def update(self, tail_text: str, tail_end: int) -> str:
+        """Record the transcript of samples [start, tail_end); returns the full text so far"""
+        tail_text = tail_text.strip()
+        if tail_end - self.start >= self.window_samples:
+            if tail_text:
+                self.committed.append(tail_text)
+            self.start = tail_end
+            tail_text = ""
+        return " ".join(self.committed + ([tail_text] if tail_text else []))
+
+
+@router.websocket("/stream")
+async def stream_audio(
+    websocket: WebSocket, format: str = "s16", transcribe: bool = True, user_id: str = None
+):
+    """
+    Real-time emotion over a WebSocket.
+
+    Client → server:
+        binary frames: mono PCM at SAMPLE_RATE (format=s16 or f32),
+                       ideally CHUNK_SIZE samples each
+        {"type": "end"}: stop recording and finalize
+    Server → client:
+        {"type": "partial", ...}: emotion over the last STREAM_WINDOW_SECONDS
+                                  and the transcript so far
+        {"type": "response_delta", "text": "..."}: AI reply, one sentence at a time
+        {"type": "final", ...}: same payload as POST /api/audio/process
+        {"type": "error", "error": "..."}
+    Query:
+        ?transcribe=false skips Whisper for partials and the final result
+        ?user_id=... scopes the saved entry for /history
+    """
+    await websocket.accept()
+
+    try:
+        stream = StreamBuffer(sr=SAMPLE_RATE, sample_format=format, max_seconds=STREAM_MAX_SECONDS)
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close(code=1003)
+        return
+
+    await websocket.send_json({
+        "type": "ready",
+        "sample_rate": SAMPLE_RATE,
+        "format": format,
+        "chunk_size": CHUNK_SIZE
+    })
+
+    partial_task = None
+    last_update = 0.0
+    transcript = PartialTranscript()
+
+    try:
+        while not stream.full:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes"):
+                stream.append(message["bytes"])
+
+                # One partial analysis in flight per connection; skip ticks while busy
+                due = stream.duration - last_update >= STREAM_UPDATE_SECONDS
+                if due and (partial_task is None or partial_task.done()):
+                    last_update = stream.duration
+                    partial_task = asyncio.create_task(_send_partial(websocket, stream, transcript, transcribe))
+
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    control = None
+                if not isinstance(control, dict):
+                    if partial_task is not None:
+                        partial_task.cancel()
+                    await websocket.send_json({"type": "error", "error": "Malformed control message"})
+                    await websocket.close(code=1003)
+                    return
+                if control.get("type") == "end":
+                    break
+
+        if partial_task is not None:
+            await partial_task
+
+        await _finalize(websocket, stream, transcribe, user_id)
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        if partial_task is not None:
+            partial_task.cancel()
+        print("⚠️ Stream client disconnected")
+
+
+async def _send_partial(
+    websocket: WebSocket, stream: StreamBuffer, transcript: PartialTranscript, transcribe: bool
+):
+    """Emotion over the sliding window plus the transcript so far"""
+    # Partials are best-effort: drop them rather than queue when busy or still loading
+    models_ready = registry.is_ready("emotion_detector") and (not transcribe or registry.is_ready("transcriber"))
+    if inference_pool.saturated or not models_ready:
+        return
+
+    window = stream.window(STREAM_WINDOW_SECONDS)
+    tail_end = len(stream)
+    tail = stream.slice(transcript.start, tail_end)
+
+    try:
+        async with inference_pool.admit():
+            emotion_detector = await registry.aget("emotion_detector")
+            text = ""
+            if transcribe:
+                transcriber = await registry.aget("transcriber")
+                # Only the uncommitted tail; earlier windows are already text
+                tail_text = await inference_pool.run(transcriber.transcribe, tail)
+                text = transcript.update(tail_text, tail_end)
+            emotion_result = await inference_pool.run(emotion_detector.detect, window, text)
+
+        await websocket.send_json({
+            "type": "partial",
+            "duration": round(tail_end / stream.sr, 2),
+            "emotion": emotion_result["primary_emotion"],
+            "confidence": emotion_result["confidence"],
+            "emotion_scores": emotion_result["scores"],
+            "transcription": text
+        })
+    except PoolSaturated:
+        pass
+    except Exception as e:
+        print(f"⚠️ Partial stream analysis failed: {e}")
+
+
+async def _send_deltas(websocket: WebSocket, deltas: asyncio.Queue):
+    """Forward reply sentences to the client until None"""
+    while True:
+        sentence = await deltas.get()
+        if sentence is None:
+            return
+        await websocket.send_json({"type": "response_delta", "text": sentence})
+
+
+async def _finalize(websocket: WebSocket, stream: StreamBuffer, transcribe: bool, user_id: str = None):
+    """Full pipeline over the whole recording, saved as a MoodEntry"""
+    if len(stream) == 0:
+        await websocket.send_json({"type": "error", "error": "No audio received"})
+        return
+
+    audio_buffer = stream.to_buffer()
+    tier = degradation.current()
+
+    sender = None
+    try:
+        try:
+            async with inference_pool.admit():
+                # Transcription runs alongside audio emotion + prosody
+                results = await analysis_graph(transcribe, tier=tier).run(audio=audio_buffer)
+                transcription = results["transcription"]
+                emotion_result = results["emotion"]
+
+                response_generator = await registry.aget("response_generator")
+                tts_engine = await registry.aget("tts_engine")
+
+                # Push reply sentences as Gemini streams them; a separate task
+                # sends them, so a slow client never holds the worker slot
+                deltas = asyncio.Queue()
+                sender = asyncio.create_task(_send_deltas(websocket, deltas))
+                sentences = []
+                reply = response_generator.generate_stream(
+                    emotion=emotion_result["primary_emotion"],
+                    user_input=transcription,
+                    template=tier.template_response
+                )
+                while True:
+                    sentence = await inference_pool.run(next, reply, None)
+                    if sentence is None:
+                        break
+                    sentences.append(sentence)
+                    deltas.put_nowait(sentence)
+                deltas.put_nowait(None)
+                ai_response = " ".join(sentences)
+
+                response_audio_path = await inference_pool.run(
+                    tts_engine.synthesize,
+                    text=ai_response,
+                    emotion=emotion_result["primary_emotion"],
+                    fast=tier.fast_tts
+                )
+
+            async with AsyncSessionLocal() as db:
+                mood_entry = await save_mood_entry(
+                    db,
+                    emotion_result=emotion_result,
+                    transcription=transcription,
+                    audio_duration=audio_buffer.duration,
+                    ai_response=ai_response,
+                    response_audio_path=response_audio_path,
+                    user_id=user_id
+                )
+            payload = entry_response(mood_entry, emotion_result, tier)
+
+            # Slot released and entry saved: now wait on the client
+            await sender
+            await websocket.send_json({"type": "final", **payload})
+        finally:
+            if sender is not None:
+                sender.cancel()
+                await asyncio.gather(sender, return_exceptions=True)
+
+    except PoolSaturated as e:
+        await websocket.send_json({"type": "error", "error": str(e), "retry_after": e.retry_after})
+    except Exception as e:
+        print(f"❌ Error finalizing stream: {e}")
+        await websocket.send_json({"type": "error", "error": str(e)})
@@ -0,0 +1,108 @@
+# backend/tests/bench.py
+"""
+Minimal benchmark harness: latency percentiles, throughput and a baseline
+file to catch regressions.
+
+    result = measure("extract_features[5s]", processor.extract_features, buffer)
+    print(format_table([result]))
+
+Results saved with save_baseline() can be compared on a later run; a
+benchmark regresses when its p95 exceeds the baseline p95 by more than
+the tolerance.
+"""
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+import numpy as np
+
+
+@dataclass
+class BenchResult:
+    name: str
+    latencies: List[float] = field(default_factory=list)  # seconds per call
+    wall_seconds: float = 0.0                              # whole run (calls may overlap)
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Completed calls per second of wall time"""
+        return self.count / self.wall_seconds if self.wall_seconds else 0.0
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.latencies, q)) if self.latencies else 0.0
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "throughput_per_s": round(self.throughput, 2),
+            "mean_ms": round(float(np.mean(self.latencies)) * 1000, 3) if self.latencies else 0.0,
+            "p50_ms": round(self.p50 * 1000, 3),
+            "p95_ms": round(self.p95 * 1000, 3),
+            "p99_ms": round(self.p99 * 1000, 3),
+        }
+
+
+def measure(name: str, fn: Callable, *args, rounds: int = 50, warmup: int = 3, **kwargs) -> BenchResult:
+    """Call fn(*args, **kwargs) `rounds` times back to back (after `warmup` untimed calls)"""
+    for _ in range(warmup):
+        fn(*args, **kwargs)
+
+    result = BenchResult(name)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        call_start = time.perf_counter()
+        fn(*args, **kwargs)
+        result.latencies.append(time.perf_counter() - call_start)
+    result.wall_seconds = time.perf_counter() - start
+    return result
+
+
+def format_table(results: List[BenchResult]) -> str:
+    header = f"{'benchmark':<44} {'n':>6} {'err':>4} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        s = r.summary()
+        lines.append(
+            f"{r.name:<44} {s['count']:>6} {s['errors']:>4} {s['throughput_per_s']:>10.1f} "
+            f"{s['p50_ms']:>10.2f} {s['p95_ms']:>10.2f} {s['p99_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def save_baseline(path: Path, results: List[BenchResult]):
+    Path(path).write_text(json.dumps({r.name: r.summary() for r in results}, indent=2, sort_keys=True))
+
+
+def load_baseline(path: Path) -> Dict[str, dict]:
+    return json.loads(Path(path).read_text())
+
+
+def regression(result: BenchResult, baseline: Dict[str, dict], tolerance: float) -> str:
+    """Description of a p95 regression against the baseline, or "" """
+    reference = baseline.get(result.name)
+    if not reference or not reference.get("p95_ms"):
+        return ""
+    limit = reference["p95_ms"] * (1 + tolerance)
+    p95_ms = result.p95 * 1000
+    if p95_ms > limit:
+        return f"{result.name}: p95 {p95_ms:.2f} ms > {limit:.2f} ms (baseline {reference['p95_ms']:.2f} ms +{tolerance:.0%})"
+    return ""
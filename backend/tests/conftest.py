@@ -0,0 +1,97 @@
+# backend/tests/conftest.py
+"""
+Tests and benchmarks run against the deterministic stub models
+(tests/stubs) in a scratch directory: no network, no GPU, and
+backend/moodmate.db and backend/outputs are never touched.
+
+    pytest tests/ -q                                   # results table at the end
+    pytest tests/ --bench-save bench_baseline.json
+    pytest tests/ --bench-compare bench_baseline.json  # fail on p95 regressions
+"""
+import asyncio
+import tempfile
+from pathlib import Path
+import pytest
+from tests import stubs
+
+# Before any test module imports config or the models
+stubs.isolate(Path(tempfile.mkdtemp(prefix="moodmate-bench-")))
+stubs.install()
+
+from tests.bench import BenchResult, format_table, load_baseline, measure, regression, save_baseline  # noqa: E402
+from tests.load_test import app_client  # noqa: E402
+
+# Manual check of the real Coqui / pyttsx3 engines, not part of the offline suite
+collect_ignore = ["test_tts.py"]
+
+_results = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-rounds", type=int, default=30, help="timed calls per microbenchmark")
+    group.addoption("--bench-save", help="write the results to this baseline file")
+    group.addoption("--bench-compare", help="fail benchmarks whose p95 regressed against this baseline")
+    group.addoption("--bench-tolerance", type=float, default=0.25, help="allowed p95 slowdown (0.25 = 25%%)")
+
+
+def _path_option(config, name: str):
+    # Options are relative to where pytest was started; the suite runs in its scratch directory
+    value = config.getoption(name, default=None)
+    return Path(config.invocation_params.dir) / value if value else None
+
+
+class Bench:
+    """`bench(fn, *args)` times fn like measure(); `bench.record(result)` reports an externally timed run"""
+
+    def __init__(self, request):
+        self.request = request
+        self.config = request.config
+
+    def __call__(self, fn, *args, rounds: int = None, warmup: int = 3, **kwargs) -> BenchResult:
+        rounds = rounds or self.config.getoption("--bench-rounds", default=30)
+        result = measure(self.request.node.name, fn, *args, rounds=rounds, warmup=warmup, **kwargs)
+        self.record(result)
+        return result
+
+    def record(self, result: BenchResult):
+        _results.append(result)
+        baseline = _path_option(self.config, "--bench-compare")
+        if baseline and baseline.exists():
+            tolerance = self.config.getoption("--bench-tolerance", default=0.25)
+            problem = regression(result, load_baseline(baseline), tolerance)
+            if problem:
+                pytest.fail(problem)
+
+
+@pytest.fixture
+def bench(request) -> Bench:
+    return Bench(request)
+
+
+@pytest.fixture(scope="session")
+def app_session():
+    """
+    (loop, client): one event loop and one app lifespan for every test
+    that calls the API (pools and queues are loop-bound)
+    """
+    import app as moodmate
+
+    loop = asyncio.new_event_loop()
+    session = app_client(moodmate.app)
+    client = loop.run_until_complete(session.__aenter__())
+    yield loop, client
+    loop.run_until_complete(session.__aexit__(None, None, None))
+    loop.close()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _results:
+        terminalreporter.write_sep("=", "benchmarks")
+        terminalreporter.write_line(format_table(_results))
+
+
+def pytest_sessionfinish(session):
+    path = _path_option(session.config, "--bench-save")
+    if path and _results:
+        save_baseline(path, _results)
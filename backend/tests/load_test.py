@@ -0,0 +1,137 @@
+# backend/tests/load_test.py
+"""
+End-to-end load generator for POST /api/audio/process.
+
+    python -m tests.load_test --requests 200 --concurrency 8
+    python -m tests.load_test --url http://localhost:8000 --corpus bench_corpus/ --params tts=stream
+
+Without --url the real app runs in-process (routes, worker pool,
+micro-batching, SQLite) with the deterministic models from tests/stubs
+in a scratch directory, so it needs no network, GPU or model downloads.
+Uploads cycle through the synthetic corpus (tests/corpus) or the WAV
+files in --corpus. Reports throughput and p50/p95/p99 latency of
+successful requests; anything else counts as an error.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Tuple
+import httpx
+from tests.bench import BenchResult, format_table
+
+PROCESS_PATH = "/api/audio/process"
+
+
+@asynccontextmanager
+async def app_client(app):
+    """httpx client bound to an in-process ASGI app, with its lifespan running"""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://moodmate.bench", timeout=300) as client:
+            yield client
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    payloads: List[bytes],
+    requests: int,
+    concurrency: int,
+    params: dict = None,
+    warmup: int = 0,
+    name: str = "process"
+) -> Tuple[BenchResult, Counter]:
+    """Send `requests` uploads with at most `concurrency` in flight; (timings, status counts)"""
+    statuses = Counter()
+
+    async def send(i: int) -> Tuple[bool, float]:
+        files = {"audio": (f"clip_{i}.wav", payloads[i % len(payloads)], "audio/wav")}
+        start = time.perf_counter()
+        try:
+            response = await client.post(PROCESS_PATH, files=files, params=params or {})
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            return False, 0.0
+        elapsed = time.perf_counter() - start
+        statuses[response.status_code] += 1
+        return response.status_code == 200, elapsed
+
+    for i in range(warmup):
+        await send(i)
+    statuses.clear()
+
+    result = BenchResult(name)
+    next_index = iter(range(requests))
+
+    async def worker():
+        for i in next_index:
+            ok, elapsed = await send(i)
+            if ok:
+                result.latencies.append(elapsed)
+            else:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    result.wall_seconds = time.perf_counter() - start
+    return result, statuses
+
+
+def corpus_payloads(corpus_dir: str = None, clips: int = 24, seed: int = 0) -> List[bytes]:
+    if corpus_dir:
+        paths = sorted(Path(corpus_dir).glob("*.wav"))
+        if not paths:
+            raise SystemExit(f"No .wav files in {corpus_dir}")
+        return [p.read_bytes() for p in paths]
+    from tests.corpus import generate_corpus
+    return [clip.wav_bytes() for clip in generate_corpus(clips, seed=seed)]
+
+
+async def _main(args):
+    params = dict(pair.split("=", 1) for pair in args.params.split("&") if "=" in pair)
+    corpus = str(Path(args.corpus).resolve()) if args.corpus else None
+    name = f"process[c={args.concurrency}{',' + args.params if args.params else ''}]"
+
+    if args.url:
+        payloads = corpus_payloads(corpus, args.clips, args.seed)
+        async with httpx.AsyncClient(base_url=args.url, timeout=300) as client:
+            return await run_load(client, payloads, args.requests, args.concurrency, params, args.warmup, name)
+
+    # In-process: scratch directory and stub models must be in place before the app is imported
+    from tests import stubs
+    stubs.isolate(Path(tempfile.mkdtemp(prefix="moodmate-load-")))
+    stubs.install()
+    payloads = corpus_payloads(corpus, args.clips, args.seed)
+    import app as moodmate
+
+    async with app_client(moodmate.app) as client:
+        return await run_load(client, payloads, args.requests, args.concurrency, params, args.warmup, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="running server (default: in-process app with stub models)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=4, help="untimed requests first")
+    parser.add_argument("--params", default="", help='query string for /process, e.g. "tts=stream&transcribe=false"')
+    parser.add_argument("--corpus", help="directory of .wav files (default: synthetic clips)")
+    parser.add_argument("--clips", type=int, default=24, help="synthetic clips to cycle through")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the summary here")
+    args = parser.parse_args()
+    json_path = Path(args.json).resolve() if args.json else None  # in-process runs chdir
+
+    result, statuses = asyncio.run(_main(args))
+    print(format_table([result]))
+    print("status:", dict(statuses))
+    if json_path:
+        json_path.write_text(json.dumps({result.name: result.summary()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
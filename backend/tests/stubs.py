@@ -0,0 +1,291 @@
+# backend/tests/stubs.py
+"""
+Offline, deterministic stand-ins for Whisper, the transformers pipelines,
+Coqui/pyttsx3 and Gemini, so the pipeline can be benchmarked without
+network, GPU or model downloads.
+
+Outputs depend only on the input (signal statistics, words, prompt hash),
+never on randomness, so two runs do identical work. Set BENCH_STUB_LATENCY
+(e.g. "whisper=80,audio=25,text=5,gemini=300,tts=40", milliseconds) to
+simulate model cost; by default the stubs are free and the benchmarks
+measure the app's own overhead.
+
+    from tests import stubs
+    stubs.isolate(tmp_dir)   # before importing config
+    stubs.install()          # before importing the models
+"""
+import os
+import sys
+import time
+import types
+import zlib
+from pathlib import Path
+import numpy as np
+import soundfile as sf
+
+AUDIO_LABELS = ["angry", "calm", "disgust", "fearful", "happy", "neutral", "sad", "surprised"]
+
+POSITIVE_WORDS = {"good", "great", "happy", "love", "excited", "calm", "better", "glad", "wonderful"}
+NEGATIVE_WORDS = {"bad", "sad", "tired", "angry", "worried", "anxious", "awful", "stressed", "lonely"}
+
+TRANSCRIPTS = [
+    "I feel great today, work went really well",
+    "I'm so tired and everything feels awful",
+    "I'm worried about the exam tomorrow and can't sleep",
+    "honestly I'm pretty calm, just a normal day",
+    "I can't believe it, that was such a surprise",
+    "I'm angry that nobody listened to me in the meeting",
+    "things are getting better and I'm glad I called my friend",
+    "I've been lonely and stressed this week",
+]
+
+REPLIES = [
+    "That sounds like a lot to carry. Try three slow breaths with me. What would help most right now?",
+    "I'm really glad to hear that! Savor this moment. What made today go so well?",
+    "It makes sense to feel this way. Be gentle with yourself tonight. Would a short walk help?",
+    "Thank you for sharing that with me. You're not alone in this. What's one small thing you could do for yourself?",
+]
+
+STUB_SAMPLE_RATE = 22050
+SECONDS_PER_CHAR = 0.06  # roughly natural speaking rate for rendered TTS
+
+
+def _latencies() -> dict:
+    spec = os.getenv("BENCH_STUB_LATENCY", "")
+    pairs = (item.split("=", 1) for item in spec.split(",") if "=" in item)
+    return {name.strip(): float(ms) / 1000.0 for name, ms in pairs}
+
+
+LATENCY = _latencies()
+
+
+def _simulate(model: str, units: int = 1):
+    seconds = LATENCY.get(model, 0.0)
+    if seconds:
+        time.sleep(seconds * units)
+
+
+def _signal_digest(samples: np.ndarray) -> int:
+    """Stable hash of a waveform (quantized, so float noise doesn't change it)"""
+    return zlib.crc32(np.round(np.asarray(samples, dtype=np.float32) * 1000).astype(np.int16).tobytes())
+
+
+# --- whisper -----------------------------------------------------------------
+
+class _WhisperModel:
+    def transcribe(self, audio, **options):
+        _simulate("whisper")
+        if len(audio) == 0:
+            return {"text": ""}
+        return {"text": " " + TRANSCRIPTS[_signal_digest(audio) % len(TRANSCRIPTS)]}
+
+
+def _whisper_module():
+    module = types.ModuleType("whisper")
+    module.load_model = lambda name, *args, **kwargs: _WhisperModel()
+    return module
+
+
+# --- transformers ------------------------------------------------------------
+
+class _Config:
+    def __init__(self, labels):
+        self.id2label = dict(enumerate(labels))
+
+
+class _Model:
+    def __init__(self, labels):
+        self.config = _Config(labels)
+
+
+class _AudioClassifier:
+    """Scores from RMS energy, zero-crossing rate and a waveform hash"""
+
+    def __init__(self):
+        self.model = _Model(AUDIO_LABELS)
+
+    def __call__(self, inputs, batch_size=None, top_k=5, **kwargs):
+        single = not isinstance(inputs, list)
+        items = [inputs] if single else inputs
+        _simulate("audio", len(items))
+        outputs = [self._classify(item["raw"] if isinstance(item, dict) else item, top_k) for item in items]
+        return outputs[0] if single else outputs
+
+    def _classify(self, samples: np.ndarray, top_k: int):
+        samples = np.asarray(samples, dtype=np.float32)
+        rms = float(np.sqrt(np.mean(samples ** 2))) if len(samples) else 0.0
+        zcr = float(np.mean(np.abs(np.diff(np.sign(samples)))) / 2) if len(samples) > 1 else 0.0
+        digest = _signal_digest(samples)
+
+        logits = np.array([(digest >> (4 * i)) % 16 / 8.0 for i in range(len(AUDIO_LABELS))])
+        logits[AUDIO_LABELS.index("happy")] += 6 * rms
+        logits[AUDIO_LABELS.index("angry")] += 4 * rms + 4 * zcr
+        logits[AUDIO_LABELS.index("sad")] += 2 * max(0.0, 0.2 - rms) * 10
+        logits[AUDIO_LABELS.index("calm")] += 2 * max(0.0, 0.1 - zcr) * 10
+        scores = np.exp(logits - logits.max())
+        scores /= scores.sum()
+
+        order = np.argsort(-scores)[:top_k]
+        return [{"label": AUDIO_LABELS[i], "score": float(scores[i])} for i in order]
+
+
+class _TextClassifier:
+    """POSITIVE/NEGATIVE by counting sentiment words"""
+
+    def __init__(self):
+        self.model = _Model(["NEGATIVE", "POSITIVE"])
+
+    def __call__(self, inputs, batch_size=None, **kwargs):
+        single = isinstance(inputs, str)
+        items = [inputs] if single else inputs
+        _simulate("text", len(items))
+        return [self._classify(text) for text in items]
+
+    @staticmethod
+    def _classify(text: str) -> dict:
+        words = text.lower().replace(",", " ").replace(".", " ").split()
+        balance = sum(w in POSITIVE_WORDS for w in words) - sum(w in NEGATIVE_WORDS for w in words)
+        score = 1.0 / (1.0 + np.exp(-1.5 * balance - 0.1))
+        if score >= 0.5:
+            return {"label": "POSITIVE", "score": float(score)}
+        return {"label": "NEGATIVE", "score": float(1.0 - score)}
+
+
+def _transformers_module():
+    module = types.ModuleType("transformers")
+
+    def pipeline(task, model=None, **kwargs):
+        return _AudioClassifier() if task == "audio-classification" else _TextClassifier()
+
+    module.pipeline = pipeline
+    return module
+
+
+# --- TTS (Coqui) and pyttsx3 ------------------------------------------------
+
+def _render(text: str) -> np.ndarray:
+    """A tone as long as the sentence would take to say"""
+    n = max(1, int(len(text) * SECONDS_PER_CHAR * STUB_SAMPLE_RATE))
+    t = np.arange(n, dtype=np.float32) / STUB_SAMPLE_RATE
+    pitch = 140 + zlib.crc32(text.encode("utf-8")) % 80
+    return (0.2 * np.sin(2 * np.pi * pitch * t)).astype(np.float32)
+
+
+class _Synthesizer:
+    output_sample_rate = STUB_SAMPLE_RATE
+
+
+class _CoquiTTS:
+    def __init__(self, model_name=None, gpu=False, **kwargs):
+        self.synthesizer = _Synthesizer()
+
+    def tts(self, text, **kwargs):
+        _simulate("tts")
+        return list(_render(text))
+
+    def tts_to_file(self, text, file_path, **kwargs):
+        _simulate("tts")
+        sf.write(file_path, _render(text), STUB_SAMPLE_RATE)
+        return file_path
+
+
+def _tts_modules():
+    package = types.ModuleType("TTS")
+    package.__path__ = []
+    api = types.ModuleType("TTS.api")
+    api.TTS = _CoquiTTS
+    package.api = api
+    return package, api
+
+
+class _Pyttsx3Engine:
+    def __init__(self):
+        self.properties = {}
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path):
+        _simulate("tts")
+        sf.write(path, _render(text), STUB_SAMPLE_RATE)
+
+    def say(self, text):
+        pass
+
+    def runAndWait(self):
+        pass
+
+
+def _pyttsx3_module():
+    module = types.ModuleType("pyttsx3")
+    module.init = lambda *args, **kwargs: _Pyttsx3Engine()
+    return module
+
+
+# --- Gemini ------------------------------------------------------------------
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _GenerativeModel:
+    def __init__(self, model_name=None, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        _simulate("gemini")
+        text = REPLIES[zlib.crc32(str(prompt).encode("utf-8")) % len(REPLIES)]
+        if not stream:
+            return _Response(text)
+        # Streamed in small chunks that split words and sentences, like the real API
+        return [_Response(text[i:i + 9]) for i in range(0, len(text), 9)]
+
+
+def _genai_module():
+    module = types.ModuleType("google.generativeai")
+    module.configure = lambda **kwargs: None
+    module.GenerativeModel = _GenerativeModel
+    return module
+
+
+def install():
+    """Replace the model libraries in sys.modules (before the app's models are imported)"""
+    tts_package, tts_api = _tts_modules()
+    sys.modules["whisper"] = _whisper_module()
+    sys.modules["transformers"] = _transformers_module()
+    sys.modules["TTS"] = tts_package
+    sys.modules["TTS.api"] = tts_api
+    sys.modules["pyttsx3"] = _pyttsx3_module()
+
+    try:
+        import google
+    except ImportError:
+        google = types.ModuleType("google")
+        google.__path__ = []
+        sys.modules["google"] = google
+    genai = _genai_module()
+    sys.modules["google.generativeai"] = genai
+    google.generativeai = genai
+
+
+def isolate(workdir: Path, caches: bool = False):
+    """
+    Point the app at a scratch directory (before config is imported): its own
+    SQLite file, with uploads, outputs and caches under workdir (DATA_DIR).
+    The on-disk caches are off unless `caches`, so benchmarks repeating a
+    clip still measure the models.
+    """
+    workdir = Path(workdir)
+    (workdir / "outputs").mkdir(parents=True, exist_ok=True)
+    os.environ["DATA_DIR"] = str(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.pop("MODEL_SERVER_SOCKET", None)
+    os.environ["DEGRADATION_ENABLED"] = "false"
+    os.environ["INFERENCE_CACHE_ENABLED"] = str(caches).lower()
+    os.environ["TTS_CACHE_ENABLED"] = str(caches).lower()
+    os.environ["TTS_CACHE_PREWARM"] = "false"
+    for name in ("EMOTION_BACKEND", "AUDIO_EMOTION_BACKEND", "TEXT_SENTIMENT_BACKEND"):
+        os.environ[name] = "pytorch"
+    os.chdir(workdir)
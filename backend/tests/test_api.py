@@ -0,0 +1,319 @@
+# backend/tests/test_api.py
+"""Mood history, analytics rollups and error statuses over the HTTP API (stub models)"""
+import asyncio
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from database.database import SessionLocal
+from database.models import MoodEntry, MoodRollup, score_columns
+from database.rollups import ALL_USERS, rebuild_rollups, update_rollups
+from tests.corpus import generate_corpus
+from config import EMOTIONS
+
+
+@pytest.fixture
+def api(app_session):
+    """Blocking helpers over the shared in-process client"""
+    loop, client = app_session
+
+    class Api:
+        def get(self, path, **params):
+            return loop.run_until_complete(client.get(path, params=params))
+
+        def post(self, path, **kwargs):
+            return loop.run_until_complete(client.post(path, **kwargs))
+
+        def run(self, coroutine):
+            return loop.run_until_complete(coroutine)
+
+    return Api()
+
+
+def add_entries(user_id: str, rows) -> list:
+    """Insert (timestamp, primary emotion, {emotion: score}) rows the way save_mood_entry does"""
+    db = SessionLocal()
+    try:
+        entries = []
+        for timestamp, emotion, scores in rows:
+            entry = MoodEntry(
+                timestamp=timestamp, user_id=user_id, primary_emotion=emotion,
+                emotion_scores=json.dumps(scores), confidence=scores[emotion],
+                **score_columns(scores)
+            )
+            db.add(entry)
+            db.flush()
+            update_rollups(db, entry)
+            entries.append(entry.id)
+        db.commit()
+        return entries
+    finally:
+        db.close()
+
+
+def scores_for(emotion: str, value: float) -> dict:
+    rest = (1.0 - value) / (len(EMOTIONS) - 1)
+    return {e: (value if e == emotion else rest) for e in EMOTIONS}
+
+
+def new_user() -> str:
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+# --- /history ---------------------------------------------------------------
+
+def test_history_pages_cover_every_entry_once(api):
+    user = new_user()
+    base = datetime.utcnow() - timedelta(hours=1)
+    # Several entries share a timestamp: the id breaks ties
+    rows = [(base + timedelta(minutes=i // 3), EMOTIONS[i % len(EMOTIONS)], scores_for(EMOTIONS[i % len(EMOTIONS)], 0.5)) for i in range(14)]
+    add_entries(user, rows)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"user_id": user, "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        body = api.get("/api/audio/history", **params).json()
+        seen.extend(body["entries"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 4
+    assert len(seen) == 14
+    assert len({e["id"] for e in seen}) == 14
+    order = [(e["timestamp"], e["id"]) for e in seen]
+    assert order == sorted(order, reverse=True)
+
+
+def test_history_filters_by_emotion_score(api):
+    user = new_user()
+    now = datetime.utcnow()
+    add_entries(user, [
+        (now - timedelta(minutes=3), "sad", scores_for("sad", 0.9)),
+        (now - timedelta(minutes=2), "sad", scores_for("sad", 0.4)),
+        (now - timedelta(minutes=1), "happy", scores_for("happy", 0.8)),
+    ])
+
+    strong = api.get("/api/audio/history", user_id=user, emotion="sad", min_score=0.5).json()["entries"]
+    any_sad = api.get("/api/audio/history", user_id=user, emotion="sad").json()["entries"]
+
+    assert [e["emotion"] for e in strong] == ["sad"]
+    assert len(any_sad) == 3  # no min_score: every entry has some sad score
+    assert len(api.get("/api/audio/history", user_id=new_user()).json()["entries"]) == 0
+
+
+@pytest.mark.parametrize("params", [
+    {"min_score": 0.5},
+    {"emotion": "bored"},
+    {"cursor": "not-a-cursor"},
+])
+def test_history_rejects_bad_parameters(api, params):
+    assert api.get("/api/audio/history", **params).status_code == 400
+
+
+# --- /analytics -------------------------------------------------------------
+
+def test_analytics_buckets_by_day_and_week(api):
+    user = new_user()
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    rows = [
+        (today, "happy", scores_for("happy", 0.8)),
+        (today, "sad", scores_for("sad", 0.6)),
+        (today - timedelta(days=1), "happy", scores_for("happy", 0.7)),
+        (today - timedelta(days=8), "calm", scores_for("calm", 0.5)),
+    ]
+    add_entries(user, rows)
+
+    daily = api.get("/api/audio/analytics", user_id=user, period="day", days=30).json()["buckets"]
+    assert [b["count"] for b in daily] == [1, 1, 2]
+    latest = daily[-1]
+    assert latest["start"] == today.date().isoformat()
+    assert latest["distribution"]["happy"] == 0.5
+    assert latest["mean_confidence"] == pytest.approx(0.7)
+    assert latest["mean_scores"]["happy"] == pytest.approx((0.8 + 0.4 / 6) / 2, abs=1e-4)
+
+    weekly = api.get("/api/audio/analytics", user_id=user, period="week", days=30).json()["buckets"]
+    assert sum(b["count"] for b in weekly) == 4
+    for bucket in weekly:
+        assert datetime.fromisoformat(bucket["start"]).weekday() == 0
+
+    # Older than the window
+    assert api.get("/api/audio/analytics", user_id=user, period="day", days=2).json()["buckets"][0]["count"] == 1
+    assert api.get("/api/audio/analytics", period="month").status_code == 400
+
+
+def test_processed_entries_update_rollups(api):
+    user = new_user()
+    clips = generate_corpus(3, seed=5)
+    for clip in clips:
+        files = {"audio": (f"{clip.name}.wav", clip.wav_bytes(), "audio/wav")}
+        response = api.post("/api/audio/process", files=files, params={"user_id": user, "tts": "stream"})
+        assert response.status_code == 200
+
+    buckets = api.get("/api/audio/analytics", user_id=user, period="day").json()["buckets"]
+    assert sum(b["count"] for b in buckets) == 3
+    assert sum(sum(b["distribution"].values()) for b in buckets) == pytest.approx(len(buckets))
+
+
+def test_rebuilt_rollups_match_incremental_ones(api):
+    add_entries(new_user(), [
+        (datetime.utcnow() - timedelta(days=d, hours=d), EMOTIONS[d % len(EMOTIONS)], scores_for(EMOTIONS[d % len(EMOTIONS)], 0.6))
+        for d in range(20)
+    ])
+
+    def snapshot():
+        db = SessionLocal()
+        try:
+            return {
+                (r.period, r.bucket_start, r.user_key): (r.count, round(r.confidence_sum, 6), r.happy_count, round(r.sad_score_sum, 6))
+                for r in db.query(MoodRollup)
+            }
+        finally:
+            db.close()
+
+    incremental = snapshot()
+    db = SessionLocal()
+    try:
+        entries = rebuild_rollups(db)
+        assert rebuild_rollups(db) == entries
+        total = db.query(MoodRollup).filter_by(period="day", user_key=ALL_USERS).with_entities(MoodRollup.count).all()
+    finally:
+        db.close()
+
+    assert snapshot() == incremental
+    assert sum(count for (count,) in total) == entries
+
+
+# --- Errors -----------------------------------------------------------------
+
+def test_process_failure_returns_server_error(api, monkeypatch):
+    from routes import audio
+    tts_engine = api.run(audio.registry.aget("tts_engine"))
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("speaker on fire")
+
+    monkeypatch.setattr(tts_engine, "synthesize", broken)
+    clip = generate_corpus(1, seed=9)[0]
+    files = {"audio": ("clip.wav", clip.wav_bytes(), "audio/wav")}
+
+    response = api.post("/api/audio/process", files=files)
+
+    assert response.status_code == 500
+    assert "speaker on fire" in response.json()["detail"]
+
+
+def test_process_rejects_undecodable_upload(api):
+    files = {"audio": ("clip.wav", b"definitely not audio", "audio/wav")}
+    assert api.post("/api/audio/process", files=files).status_code == 415
+
+
+# --- /tts/stream --------------------------------------------------------------
+
+def test_tts_stream_stops_rendering_when_the_client_leaves(api, monkeypatch):
+    from database.database import AsyncSessionLocal
+    from routes import audio
+    tts_engine = api.run(audio.registry.aget("tts_engine"))
+    second_started, finish_second = threading.Event(), threading.Event()
+    rendered, closed = [], []
+
+    def sentences(text, emotion, fast=False):
+        try:
+            for i in range(10):
+                if i == 1:
+                    second_started.set()
+                    finish_second.wait(10)
+                rendered.append(i)
+                yield bytes(100)
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(tts_engine, "synthesize_stream", sentences)
+    entry_id = add_entries(new_user(), [(datetime.utcnow(), "calm", scores_for("calm", 0.7))])[0]
+    db = SessionLocal()
+    try:
+        db.get(MoodEntry, entry_id).ai_response = "One. Two. Three."
+        db.commit()
+    finally:
+        db.close()
+
+    async def leave_mid_sentence():
+        async with AsyncSessionLocal() as session:
+            response = await audio.stream_response_audio(entry_id, session)
+        active = audio.inference_pool.active
+        body = response.body_iterator
+        await body.__anext__()
+        reading = asyncio.ensure_future(body.__anext__())
+        await asyncio.get_running_loop().run_in_executor(None, second_started.wait, 10)
+
+        reading.cancel()  # the client disconnects while sentence two renders
+        await asyncio.sleep(0.05)
+        # The worker is still busy, so the slot is too
+        assert audio.inference_pool.active == active
+
+        finish_second.set()
+        await asyncio.gather(reading, return_exceptions=True)
+        # No sentence after the one in progress, and the slot is back
+        assert closed == [True]
+        assert audio.inference_pool.active == active - 1
+        return response
+
+    api.run(leave_mid_sentence())
+    assert rendered == [0, 1]
+
+
+# --- /stream ------------------------------------------------------------------
+
+class SlowClient:
+    """WebSocket stand-in whose response_delta sends block until `unblock` is set"""
+
+    def __init__(self):
+        self.messages = []
+        self.blocked = False
+        self.unblock = asyncio.Event()
+
+    async def send_json(self, message: dict):
+        if message["type"] == "response_delta":
+            self.blocked = True
+            await self.unblock.wait()
+        self.messages.append(message)
+
+
+def test_stream_finalize_frees_its_slot_before_waiting_on_the_client(api):
+    from routes import audio
+    from routes.stream import _finalize
+    from utils.stream_buffer import StreamBuffer
+    clip = generate_corpus(1, seed=13)[0]
+    stream = StreamBuffer()
+    stream.append((clip.samples * 32767).astype("<i2").tobytes())
+    client = SlowClient()
+
+    async def until(condition):
+        for _ in range(1000):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError("timed out")
+
+    async def finalize_for_a_slow_client():
+        idle = audio.inference_pool.active
+        finalizing = asyncio.ensure_future(_finalize(client, stream, transcribe=True))
+        await until(lambda: client.blocked)
+        # The client is stuck on the first sentence; the slot comes back anyway
+        await until(lambda: audio.inference_pool.active == idle)
+        assert not finalizing.done()
+        assert client.messages == []
+
+        client.unblock.set()
+        await finalizing
+
+    api.run(finalize_for_a_slow_client())
+
+    types = [message["type"] for message in client.messages]
+    assert types[-1] == "final"
+    assert set(types[:-1]) == {"response_delta"}
+    assert " ".join(m["text"] for m in client.messages[:-1]) == client.messages[-1]["ai_response"]
@@ -0,0 +1,72 @@
+# backend/tests/test_benchmarks.py
+"""Microbenchmarks of the per-request hot path (stub models; see conftest)"""
+from pathlib import Path
+import numpy as np
+import pytest
+from tests.corpus import synth_utterance
+from tests.stubs import REPLIES
+from utils.audio_buffer import AudioBuffer
+from utils.audio_processor import AudioProcessor
+from config import SAMPLE_RATE, EMOTIONS
+
+
+def make_clip(seconds: float, emotion: str = "neutral", seed: int = 0) -> AudioBuffer:
+    return AudioBuffer(synth_utterance(seconds, emotion, np.random.default_rng(seed)), SAMPLE_RATE)
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return AudioProcessor(sr=SAMPLE_RATE)
+
+
+@pytest.fixture(scope="module")
+def detector():
+    from models.emotion_detector import EmotionDetector
+    return EmotionDetector()
+
+
+@pytest.fixture(scope="module")
+def tts_engine():
+    from models.tts_engine import TTSEngine
+    return TTSEngine(mode="quality")
+
+
+@pytest.mark.parametrize("seconds", [2, 10, 60])
+def test_extract_features(bench, processor, seconds):
+    clip = make_clip(seconds, "happy")
+    bench(processor.extract_features, clip)
+
+    features = processor.extract_features(clip)
+    assert features.shape == processor._get_default_features().shape
+    assert np.isfinite(features).all()
+
+
+@pytest.mark.parametrize("segments", [1, 8, 32])
+def test_fuse_emotions(bench, detector, processor, segments):
+    rng = np.random.default_rng(segments)
+    rows = rng.dirichlet(np.ones(len(EMOTIONS)), size=segments).astype(np.float32)
+    text_row = rng.dirichlet(np.ones(len(EMOTIONS))).astype(np.float32)
+    weights = list(rng.uniform(0.5, 10.0, size=segments))
+    features = processor.extract_features(make_clip(3))
+
+    bench(detector._fuse_emotions, rows, text_row, features, audio_weights=weights)
+
+    result = detector._fuse_emotions(rows, text_row, features, audio_weights=weights)
+    assert result["primary_emotion"] in EMOTIONS
+    assert abs(sum(result["scores"].values()) - 1.0) < 1e-3
+
+
+@pytest.mark.parametrize("seconds", [3, 15])
+def test_detect(bench, detector, seconds):
+    clip = make_clip(seconds, "sad", seed=seconds)
+    bench(detector.detect, clip, "I've been lonely and stressed this week")
+
+    assert detector.detect(clip, "")["primary_emotion"] in EMOTIONS
+
+
+@pytest.mark.parametrize("replies", [1, len(REPLIES)])
+def test_tts_synthesize(bench, tts_engine, replies):
+    text = " ".join(REPLIES[:replies])
+    bench(tts_engine.synthesize, text, "calm", rounds=10)
+
+    assert Path(tts_engine.synthesize(text, "calm")).exists()
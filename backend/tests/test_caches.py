@@ -0,0 +1,239 @@
+# backend/tests/test_caches.py
+"""TTS audio cache, Gemini response cache and per-upload inference cache"""
+import os
+import time
+import numpy as np
+import pytest
+import utils.inference_cache as inference_cache
+import utils.ttl_cache as ttl_cache
+from models.response_generator import ResponseGenerator
+from utils.audio_buffer import AudioBuffer
+from utils.inference_cache import InferenceCache
+from utils.tts_cache import TTSCache
+from utils.ttl_cache import TTLCache
+from config import DATA_DIR, SAMPLE_RATE
+
+
+# --- TTS audio --------------------------------------------------------------
+
+@pytest.fixture
+def tts_engine(monkeypatch, tmp_path):
+    """Quality-mode engine with its cache on (in a private dir), counting renders"""
+    import models.tts_engine as tts_module
+    monkeypatch.setattr(tts_module, "TTS_CACHE_ENABLED", True)
+    monkeypatch.setattr(tts_module, "OUTPUT_DIR", DATA_DIR / "outputs")
+    engine = tts_module.TTSEngine(mode="quality")
+    engine.cache = TTSCache(tmp_path / "tts_cache", max_bytes=10 * 1024 * 1024, max_age_seconds=3600)
+
+    renders = []
+    render = engine.quality_engine.tts_to_file
+
+    def counting_render(text, file_path, **kwargs):
+        renders.append(text)
+        return render(text=text, file_path=file_path, **kwargs)
+
+    monkeypatch.setattr(engine.quality_engine, "tts_to_file", counting_render)
+    engine.renders = renders
+    return engine
+
+
+def test_tts_cache_renders_identical_text_once(tts_engine):
+    first = tts_engine.synthesize("Take a slow breath with me.", "calm")
+    second = tts_engine.synthesize("Take  a slow breath with me.", "calm")
+
+    assert len(tts_engine.renders) == 1
+    assert tts_engine.cache.stats()["hits"] == 1
+    # Each response gets its own file with the same audio
+    assert first != second
+    assert (DATA_DIR / first).read_bytes() == (DATA_DIR / second).read_bytes()
+
+
+def test_tts_outputs_survive_cache_eviction(tts_engine):
+    path = tts_engine.synthesize("You are doing better than you think.", "happy")
+
+    tts_engine.cache.max_bytes = 0
+    tts_engine.cache.evict()
+
+    assert not any(tts_engine.cache.cache_dir.glob("*.wav"))
+    assert (DATA_DIR / path).stat().st_size > 0
+
+    # Evicted entries render again
+    tts_engine.cache.max_bytes = 10 * 1024 * 1024
+    tts_engine.synthesize("You are doing better than you think.", "happy")
+    assert len(tts_engine.renders) == 2
+
+
+def test_tts_output_served_after_eviction(tts_engine, app_session):
+    loop, client = app_session
+    path = tts_engine.synthesize("I'm here whenever you want to talk.", "neutral")
+    tts_engine.cache.max_bytes = 0
+    tts_engine.cache.evict()
+
+    response = loop.run_until_complete(client.get(f"/api/audio/file/{path}"))
+    assert response.status_code == 200
+    assert response.content == (DATA_DIR / path).read_bytes()
+
+    missing = loop.run_until_complete(client.get("/api/audio/file/outputs/missing.wav"))
+    assert missing.status_code == 404
+
+
+def test_tts_cache_evicts_least_recently_used(tmp_path):
+    cache = TTSCache(tmp_path / "cache", max_bytes=2500, max_age_seconds=3600)
+
+    def put(key: str):
+        source = tmp_path / f"{key}.src"
+        source.write_bytes(b"x" * 1000)
+        cache.put(key, str(source))
+
+    for i, key in enumerate(["a", "b"]):
+        put(key)
+        mtime = time.time() - 100 + i
+        os.utime(cache.path_for(key), (mtime, mtime))
+    cache.get("a")  # refresh a: b is now the oldest
+    put("c")        # over max_bytes: evicts b
+
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.get("b") is None
+    assert cache.export("b", tmp_path / "b.wav") is False
+
+
+# --- Gemini responses -------------------------------------------------------
+
+class CountingModel:
+    """generate_content stand-in that counts calls and can fail"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        text = f"Reply number {self.calls}. I'm listening."
+        if not stream:
+            return type("Response", (), {"text": text})()
+        return [type("Chunk", (), {"text": text})()]
+
+
+def test_response_cache_keys_on_normalized_input():
+    model = CountingModel()
+    generator = ResponseGenerator(model=model)
+
+    first = generator.generate("sad", "I had a rough day.")
+    again = generator.generate("sad", "  i had a ROUGH day ")
+    other_emotion = generator.generate("anxious", "I had a rough day.")
+
+    assert first == again
+    assert other_emotion != first
+    assert model.calls == 2
+    # The streaming path reads the same entries
+    assert " ".join(generator.generate_stream("sad", "I had a rough day")) == first
+    assert model.calls == 2
+
+
+def test_response_cache_skips_fallbacks():
+    model = CountingModel()
+    generator = ResponseGenerator(model=model)
+
+    model.fail = True
+    assert generator.generate("calm", "hello") == generator._fallback_response("calm")
+    model.fail = False
+    assert generator.generate("calm", "hello") == "Reply number 2. I'm listening."
+
+
+def test_ttl_cache_expiry_and_lru(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_size=2, ttl_seconds=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # evicts b, the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+# --- Inference results by upload hash --------------------------------------
+
+def test_inference_cache_stays_under_max_bytes_across_instances(tmp_path):
+    path = tmp_path / "inference.sqlite3"
+    first = InferenceCache(path, max_bytes=10_000)
+    second = InferenceCache(path, max_bytes=10_000)
+
+    for i in range(30):
+        (first if i % 2 else second).put(f"upload-{i}", "features:x", bytes(1000))
+
+    for cache in (first, second):
+        assert cache.stats()["bytes"] <= 10_000
+    assert first.get("upload-29", "features:x") is not None
+    assert first.get("upload-0", "features:x") is None
+
+
+def test_inference_cache_round_trips_arrays_and_text(tmp_path):
+    cache = InferenceCache(tmp_path / "inference.sqlite3", max_bytes=1 << 20)
+    scores = np.random.default_rng(0).random((3, 7)).astype(np.float32)
+
+    cache.put_array("k", "audio-emotion:x", scores)
+    cache.put_text("k", "transcription:x", "héllo")
+
+    np.testing.assert_array_equal(cache.get_array("k", "audio-emotion:x"), scores)
+    assert cache.get_text("k", "transcription:x") == "héllo"
+    assert cache.get_text("k", "transcription:other") is None
+
+
+@pytest.fixture
+def shared_inference_cache(monkeypatch, tmp_path):
+    """Turn the process-wide inference cache on, in a private file"""
+    cache = InferenceCache(tmp_path / "inference.sqlite3", max_bytes=1 << 20)
+    monkeypatch.setattr(inference_cache, "INFERENCE_CACHE_ENABLED", True)
+    monkeypatch.setattr(inference_cache, "_shared", cache)
+    return cache
+
+
+def test_transcriber_reuses_cached_transcript(shared_inference_cache):
+    from models.transcriber import Transcriber
+    transcriber = Transcriber()
+    calls = []
+    model = transcriber._pool.get()
+    transcribe = model.transcribe
+    model.transcribe = lambda samples, **options: calls.append(1) or transcribe(samples, **options)
+    transcriber._pool.put(model)
+    clip = AudioBuffer(np.random.default_rng(1).normal(0, 0.1, SAMPLE_RATE).astype(np.float32), SAMPLE_RATE)
+
+    text = transcriber.transcribe(clip, cache_key="upload-1")
+
+    assert transcriber.transcribe(clip, cache_key="upload-1") == text
+    assert len(calls) == 1
+    assert shared_inference_cache.stats()["hits"] == 1
+
+
+def test_transcriber_fingerprint_covers_vad_settings(monkeypatch, shared_inference_cache):
+    import models.transcriber as transcriber_module
+    baseline = transcriber_module.Transcriber().cache_kind
+
+    for name, value in [("VAD_MIN_SPEECH_MS", 999), ("VAD_MIN_SILENCE_MS", 999), ("VAD_ENABLED", False)]:
+        with monkeypatch.context() as patch:
+            patch.setattr(transcriber_module, name, value)
+            assert transcriber_module.Transcriber().cache_kind != baseline, name
+
+
+def test_emotion_detector_reuses_cached_analysis(shared_inference_cache):
+    from models.emotion_detector import EmotionDetector
+    from tests.corpus import synth_utterance
+    detector = EmotionDetector()
+    clip = AudioBuffer(synth_utterance(3.0, "happy", np.random.default_rng(2)), SAMPLE_RATE)
+
+    first = detector.detect(clip, "I feel great today", cache_key="upload-2")
+    lookups = shared_inference_cache.stats()["hits"]
+    second = detector.detect(clip, "I feel great today", cache_key="upload-2")
+
+    assert second == first
+    # Audio scores, features and text sentiment all came from the cache
+    assert shared_inference_cache.stats()["hits"] - lookups == 3
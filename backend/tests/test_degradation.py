@@ -0,0 +1,169 @@
+# backend/tests/test_degradation.py
+"""Quality-tier transitions of DegradationPolicy under a simulated clock"""
+import pytest
+import utils.degradation as degradation
+from utils.degradation import DegradationPolicy, TIERS
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(degradation.time, "monotonic", clock)
+    return clock
+
+
+def make_policy(in_flight, **kwargs) -> DegradationPolicy:
+    options = dict(
+        capacity=10, target_seconds=10.0, step_up=0.8, step_down=0.5,
+        step_seconds=5.0, recover_seconds=20.0
+    )
+    options.update(kwargs)
+    return DegradationPolicy(in_flight=lambda: in_flight[0], **options)
+
+
+def test_steps_down_one_tier_per_interval_under_load(clock):
+    in_flight = [9]
+    policy = make_policy(in_flight)
+
+    assert policy.current().name == "fast_tts"
+    # Still overloaded, but the next drop waits for step_seconds
+    clock.advance(1)
+    assert policy.current().name == "fast_tts"
+    clock.advance(5)
+    assert policy.current().name == "template"
+    clock.advance(5)
+    assert policy.current().name == "minimal"
+    clock.advance(5)
+    assert policy.current() is TIERS[-1]
+
+
+def test_recovers_after_sustained_calm(clock):
+    in_flight = [9]
+    policy = make_policy(in_flight)
+    policy.current()
+    clock.advance(5)
+    assert policy.current().name == "template"
+
+    in_flight[0] = 1
+    policy.current()
+    clock.advance(19)
+    assert policy.current().name == "template"
+    clock.advance(1)
+    assert policy.current().name == "fast_tts"
+    # Each further step up needs its own calm period
+    clock.advance(1)
+    assert policy.current().name == "fast_tts"
+    clock.advance(20)
+    assert policy.current().name == "full"
+
+
+def test_idle_node_recovers_on_its_next_request(clock):
+    in_flight = [9]
+    policy = make_policy(in_flight)
+    policy.current()
+    clock.advance(5)
+    assert policy.current().name == "template"
+
+    # No requests at all while idle: the next one is served in full
+    in_flight[0] = 0
+    clock.advance(600)
+    assert policy.current().name == "full"
+
+
+def test_calm_counts_from_when_load_dropped(clock):
+    in_flight = [9]
+    policy = make_policy(in_flight)
+    policy.current()
+    clock.advance(5)
+    assert policy.current().name == "template"
+
+    # The first calm request, 25s after the spike, finds one recover period served
+    in_flight[0] = 1
+    clock.advance(25)
+    assert policy.current().name == "fast_tts"
+
+
+def test_finishing_requests_report_load(clock):
+    in_flight = [9]
+    policy = make_policy(in_flight)
+    policy.current()
+    clock.advance(5)
+    assert policy.current().name == "template"
+
+    # The node stays busy until the last request completes
+    in_flight[0] = 6
+    clock.advance(25)
+    policy.observe(1.0)
+    in_flight[0] = 0
+    clock.advance(15)
+    assert policy.current().name == "template"
+    clock.advance(5)
+    assert policy.current().name == "fast_tts"
+
+
+def test_load_between_thresholds_holds_the_tier(clock):
+    in_flight = [9]
+    policy = make_policy(in_flight)
+    assert policy.current().name == "fast_tts"
+
+    in_flight[0] = 6  # 0.6: neither overloaded nor calm
+    for _ in range(10):
+        clock.advance(10)
+        assert policy.current().name == "fast_tts"
+
+    # A load spike resets the calm timer
+    in_flight[0] = 1
+    policy.current()
+    clock.advance(15)
+    in_flight[0] = 6
+    policy.current()
+    in_flight[0] = 1
+    clock.advance(10)
+    assert policy.current().name == "fast_tts"
+
+
+def test_latency_counts_only_while_busy(clock):
+    in_flight = [0]
+    policy = make_policy(in_flight)
+    policy.observe(30.0)  # a slow request on an otherwise idle node
+
+    assert policy.current().name == "full"
+    in_flight[0] = 1
+    assert policy.load() == pytest.approx(3.0)
+    assert policy.current().name == "fast_tts"
+
+
+def test_latency_is_smoothed(clock):
+    policy = make_policy([1], smoothing=0.5)
+    policy.observe(4.0)
+    policy.observe(8.0)
+
+    assert policy.status()["latency_seconds"] == pytest.approx(6.0)
+
+
+def test_max_tier_caps_degradation(clock):
+    policy = make_policy([10], max_tier=1)
+    for _ in range(5):
+        policy.current()
+        clock.advance(10)
+
+    assert policy.level == 1
+
+
+def test_disabled_policy_never_degrades(clock):
+    policy = make_policy([10], enabled=False)
+    for _ in range(5):
+        assert policy.current().name == "full"
+        clock.advance(10)
+    assert policy.status()["enabled"] is False
@@ -0,0 +1,208 @@
+# backend/tests/test_emotion.py
+"""Emotion fusion (parity with the original dict implementation) and VAD segmentation"""
+import numpy as np
+import pytest
+from models.emotion_fusion import EmotionFusion, AUDIO_LABEL_MAP
+from tests.corpus import synth_utterance
+from tests.stubs import AUDIO_LABELS
+from utils.audio_buffer import AudioBuffer
+from utils.audio_processor import AudioProcessor, FEATURE_INDEX, N_FEATURES
+from config import SAMPLE_RATE, EMOTIONS, VAD_MIN_SILENCE_MS
+
+
+# --- Reference: the per-dict fusion EmotionFusion replaced -------------------
+
+def legacy_audio_scores(predictions):
+    scores = {e: 0.0 for e in EMOTIONS}
+    for pred in predictions:
+        mapped = AUDIO_LABEL_MAP.get(pred["label"].lower(), "neutral")
+        scores[mapped] = max(scores[mapped], pred["score"])
+    return scores
+
+
+def legacy_text_scores(prediction):
+    scores = {e: 0.0 for e in EMOTIONS}
+    if prediction["label"].lower() == "positive":
+        scores["happy"] = prediction["score"]
+        scores["calm"] = prediction["score"] * 0.3
+    else:
+        scores["sad"] = prediction["score"]
+        scores["anxious"] = prediction["score"] * 0.4
+    return scores
+
+
+def legacy_prosody_scores(features):
+    scores = {e: 0.1 for e in EMOTIONS}
+    pitch_mean = features[FEATURE_INDEX["pitch_mean"]]
+    pitch_std = features[FEATURE_INDEX["pitch_std"]]
+    energy_mean = features[FEATURE_INDEX["energy_mean"]]
+    if pitch_mean > 150 and energy_mean > 0.1:
+        scores["happy"], scores["surprised"] = 0.8, 0.4
+    elif pitch_mean < 100 and energy_mean < 0.05:
+        scores["sad"], scores["calm"] = 0.7, 0.3
+    elif pitch_std > 50 and energy_mean > 0.08:
+        scores["anxious"], scores["angry"] = 0.6, 0.3
+    elif pitch_std < 30 and 0.05 < energy_mean < 0.1:
+        scores["calm"], scores["neutral"] = 0.7, 0.4
+    return scores
+
+
+def legacy_fuse(segment_scores, weights, text_scores, features):
+    if segment_scores:
+        total_weight = sum(weights)
+        audio = {
+            e: sum(s[e] * w for s, w in zip(segment_scores, weights)) / total_weight
+            for e in EMOTIONS
+        }
+    else:
+        audio = {e: 0.0 for e in EMOTIONS}
+    text = text_scores or {e: 0.0 for e in EMOTIONS}
+    prosody = legacy_prosody_scores(features)
+
+    fused = {e: audio[e] * 0.6 + text[e] * 0.3 + prosody[e] * 0.1 for e in EMOTIONS}
+    total = sum(fused.values())
+    fused = {e: v / total for e, v in fused.items()}
+    primary = max(fused.items(), key=lambda item: item[1])
+    return {
+        "primary_emotion": primary[0],
+        "confidence": round(primary[1], 4),
+        "scores": {e: round(v, 4) for e, v in fused.items()},
+    }
+
+
+def random_case(rng):
+    segments = int(rng.integers(0, 5))
+    predictions = [
+        [{"label": label, "score": float(s)} for label, s in zip(AUDIO_LABELS, rng.dirichlet(np.ones(8)))]
+        for _ in range(segments)
+    ]
+    weights = list(rng.uniform(0.2, 10.0, size=segments))
+    text = None
+    if rng.random() < 0.7:
+        text = {"label": str(rng.choice(["POSITIVE", "NEGATIVE"])), "score": float(rng.uniform(0.5, 1.0))}
+    features = np.zeros(N_FEATURES, dtype=np.float32)
+    features[FEATURE_INDEX["pitch_mean"]] = rng.uniform(60, 260)
+    features[FEATURE_INDEX["pitch_std"]] = rng.uniform(0, 80)
+    features[FEATURE_INDEX["energy_mean"]] = rng.uniform(0, 0.15)
+    return predictions, weights, text, features
+
+
+@pytest.fixture(scope="module")
+def fusion():
+    return EmotionFusion(weights=(0.6, 0.3, 0.1))
+
+
+def test_fusion_matches_legacy_dicts(fusion):
+    rng = np.random.default_rng(14)
+    for _ in range(300):
+        predictions, weights, text, features = random_case(rng)
+
+        expected = legacy_fuse(
+            [legacy_audio_scores(p) for p in predictions], weights,
+            legacy_text_scores(text) if text else None, features
+        )
+
+        audio = fusion.aggregate_segments(fusion.audio_scores(predictions), weights)
+        text_row = fusion.text_scores([text]) if text else None
+        prosody = fusion.prosody_scores(features)
+        result = fusion.to_results(fusion.fuse(audio, text_row, prosody))[0]
+
+        for emotion in EMOTIONS:
+            assert result["scores"][emotion] == pytest.approx(expected["scores"][emotion], abs=2e-4)
+        assert result["confidence"] == pytest.approx(expected["confidence"], abs=2e-4)
+        if sorted(expected["scores"].values())[-2] < expected["confidence"] - 1e-3:
+            assert result["primary_emotion"] == expected["primary_emotion"]
+
+
+def test_fusion_batch_equals_rows(fusion):
+    rng = np.random.default_rng(7)
+    audio = rng.dirichlet(np.ones(len(EMOTIONS)), size=16).astype(np.float32)
+    text = rng.dirichlet(np.ones(len(EMOTIONS)), size=16).astype(np.float32)
+    features = np.zeros((16, N_FEATURES), dtype=np.float32)
+    features[:, FEATURE_INDEX["pitch_mean"]] = rng.uniform(60, 260, size=16)
+    features[:, FEATURE_INDEX["energy_mean"]] = rng.uniform(0, 0.15, size=16)
+
+    batch = fusion.fuse(audio, text, fusion.prosody_scores(features))
+    for i in range(16):
+        row = fusion.fuse(audio[i], text[i], fusion.prosody_scores(features[i]))
+        np.testing.assert_allclose(batch[i], row[0], atol=1e-6)
+
+
+def test_unknown_sentiment_labels_count_as_negative(fusion):
+    predictions = [{"label": "LABEL_0", "score": 0.9}, {"label": "mixed", "score": 0.6}]
+
+    scores = fusion.text_scores(predictions)
+
+    for row, prediction in zip(scores, predictions):
+        expected = legacy_text_scores(prediction)
+        np.testing.assert_allclose(row, [expected[e] for e in EMOTIONS], atol=1e-6)
+
+
+def test_fusion_without_signals_is_neutral(fusion):
+    result = fusion.to_results(fusion.fuse(np.zeros(len(EMOTIONS))))[0]
+    assert result["primary_emotion"] == "neutral"
+    assert result["confidence"] == 1.0
+
+
+# --- VAD segmentation ------------------------------------------------------
+
+def tone(seconds: float, hz: float = 180.0, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * hz * t)).astype(np.float32)
+
+
+def silence(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(0.0, 0.001, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return AudioProcessor(sr=SAMPLE_RATE)
+
+
+def test_speech_segments_find_voiced_regions(processor):
+    clip = AudioBuffer(np.concatenate([silence(1.0), tone(1.5), silence(1.0, 1), tone(0.8), silence(1.0, 2)]), SAMPLE_RATE)
+
+    segments = processor.speech_segments(clip)
+
+    assert len(segments) == 2
+    assert segments[0].duration == pytest.approx(1.5, abs=0.3)
+    assert segments[1].duration == pytest.approx(0.8, abs=0.3)
+    assert processor.trim_silence(clip).duration == pytest.approx(2.3, abs=0.5)
+
+
+def test_short_pauses_stay_inside_a_segment(processor):
+    pause = VAD_MIN_SILENCE_MS / 1000 / 2
+    clip = AudioBuffer(np.concatenate([silence(0.5), tone(1.0), silence(pause, 1), tone(1.0), silence(0.5, 2)]), SAMPLE_RATE)
+
+    assert len(processor.speech_segments(clip)) == 1
+
+
+def test_long_speech_is_split_into_bounded_segments(processor):
+    clip = AudioBuffer(np.concatenate([silence(2.0), tone(9.0), silence(2.0, 1)]), SAMPLE_RATE)
+
+    segments = processor.speech_segments(clip, max_seconds=2.0)
+
+    assert len(segments) >= 5
+    assert all(segment.duration <= 2.0 + 1e-6 for segment in segments)
+    assert sum(segment.duration for segment in segments) == pytest.approx(9.0, abs=0.5)
+
+
+def test_silence_falls_back_to_the_whole_clip(processor):
+    clip = AudioBuffer(silence(2.0), SAMPLE_RATE)
+
+    segments = processor.speech_segments(clip)
+
+    assert sum(segment.duration for segment in segments) == pytest.approx(2.0)
+    assert processor.trim_silence(clip).duration == pytest.approx(2.0)
+
+
+def test_speech_segments_on_synthetic_speech(processor):
+    rng = np.random.default_rng(3)
+    samples = np.concatenate([silence(1.0), synth_utterance(4.0, "calm", rng), silence(1.0, 1)])
+
+    segments = processor.speech_segments(AudioBuffer(samples, SAMPLE_RATE))
+
+    voiced = sum(segment.duration for segment in segments)
+    assert 1.0 < voiced < 5.0
@@ -0,0 +1,126 @@
+# backend/tests/test_jobs.py
+"""Async job pipeline: completion, failure, resume-on-retry and stale-job recovery"""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from database.database import SessionLocal
+from database.models import AudioJob
+from tests.corpus import generate_corpus
+
+
+@pytest.fixture(scope="module")
+def clip_bytes() -> bytes:
+    return generate_corpus(1, seed=21)[0].wav_bytes()
+
+
+@pytest.fixture
+def jobs_api(app_session, clip_bytes):
+    loop, client = app_session
+
+    class JobsApi:
+        def submit(self, **params) -> str:
+            files = {"audio": ("clip.wav", clip_bytes, "audio/wav")}
+            response = loop.run_until_complete(
+                client.post("/api/audio/process", files=files, params={"mode": "job", **params})
+            )
+            assert response.status_code == 202
+            return response.json()["job_id"]
+
+        def wait(self, job_id: str, seconds: float = 20) -> dict:
+            response = loop.run_until_complete(client.get(f"/api/audio/jobs/{job_id}", params={"wait": seconds}))
+            assert response.status_code == 200
+            return response.json()
+
+        def retry(self, job_id: str):
+            return loop.run_until_complete(client.post(f"/api/audio/jobs/{job_id}/retry"))
+
+        def run(self, coroutine):
+            return loop.run_until_complete(coroutine)
+
+    return JobsApi()
+
+
+def test_job_completes_with_a_result(jobs_api):
+    job = jobs_api.wait(jobs_api.submit(user_id="jobs"))
+
+    assert job["status"] == "completed"
+    assert job["stage"] == "saved"
+    assert job["attempts"] == 1
+    assert job["result"]["session_id"] is not None
+    assert job["result"]["response_audio_url"]
+
+
+def test_failed_job_resumes_from_its_last_stage_on_retry(jobs_api, monkeypatch):
+    from routes import audio
+    tts_engine = jobs_api.run(audio.registry.aget("tts_engine"))
+    response_generator = jobs_api.run(audio.registry.aget("response_generator"))
+
+    generated = []
+    generate = response_generator.generate
+    monkeypatch.setattr(response_generator, "generate", lambda **kw: generated.append(1) or generate(**kw))
+
+    def tts_down(**kwargs):
+        raise RuntimeError("TTS down")
+
+    synthesize = tts_engine.synthesize
+    monkeypatch.setattr(tts_engine, "synthesize", tts_down)
+
+    job_id = jobs_api.submit()
+    failed = jobs_api.wait(job_id)
+    assert failed["status"] == "failed"
+    assert failed["stage"] == "responded"
+    assert "TTS down" in failed["error"]
+
+    monkeypatch.setattr(tts_engine, "synthesize", synthesize)
+    retried = jobs_api.retry(job_id)
+    assert retried.status_code == 200
+    assert retried.json()["status"] in ("queued", "running", "completed")
+
+    done = jobs_api.wait(job_id)
+    assert done["status"] == "completed"
+    assert done["attempts"] == 2
+    assert done["error"] is None
+    # Stages persisted before the failure were not run again
+    assert len(generated) == 1
+
+
+def test_only_failed_jobs_can_be_retried(jobs_api):
+    job_id = jobs_api.submit()
+    assert jobs_api.wait(job_id)["status"] == "completed"
+
+    assert jobs_api.retry(job_id).status_code == 409
+    assert jobs_api.retry(uuid.uuid4().hex).status_code == 404
+
+
+def test_stale_running_jobs_are_requeued(jobs_api):
+    from routes import jobs
+    from config import JOB_STALE_SECONDS
+
+    job_id = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        # Claimed by a worker that died: running, heartbeat long gone
+        db.add(AudioJob(
+            id=job_id, status="running", stage="uploaded", audio_path="/nonexistent.wav", attempts=1,
+            updated_at=datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS * 2)
+        ))
+        fresh_id = uuid.uuid4().hex
+        db.add(AudioJob(id=fresh_id, status="running", stage="uploaded", audio_path="/nonexistent.wav", attempts=1))
+        db.commit()
+    finally:
+        db.close()
+
+    pending = jobs_api.run(jobs.pending_job_ids())
+
+    assert job_id in pending
+    assert fresh_id not in pending
+    # A second worker can't claim what the first one already took
+    jobs_api.run(_claim_twice(job_id))
+
+
+async def _claim_twice(job_id: str):
+    from database.database import AsyncSessionLocal
+    from routes.jobs import claim_job
+    async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+        assert await claim_job(first, job_id) is True
+        assert await claim_job(second, job_id) is False
@@ -0,0 +1,30 @@
+# backend/tests/test_load.py
+"""End-to-end load on POST /api/audio/process (in-process app, stub models)"""
+import pytest
+from tests.corpus import generate_corpus
+from tests.load_test import run_load
+
+REQUESTS = 24
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    return [clip.wav_bytes() for clip in generate_corpus(12, seed=1)]
+
+
+@pytest.mark.parametrize("concurrency, params", [
+    (1, {}),
+    (4, {}),
+    (4, {"tts": "stream", "transcribe": "false"}),
+])
+def test_process_load(bench, app_session, payloads, concurrency, params):
+    loop, client = app_session
+    name = f"process[c={concurrency}{''.join(f',{k}={v}' for k, v in params.items())}]"
+
+    result, statuses = loop.run_until_complete(
+        run_load(client, payloads, REQUESTS, concurrency, params=params, warmup=2, name=name)
+    )
+    bench.record(result)
+
+    assert result.errors == 0, dict(statuses)
+    assert result.count == REQUESTS
@@ -0,0 +1,82 @@
+# backend/tests/test_model_server.py
+"""Model server round trip over a Unix socket: plain calls, shared-memory arrays, streams, errors"""
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+import pytest
+from models.emotion_detector import EmotionDetector
+from models.remote import ModelServerClient
+from models.tts_engine import TTSEngine
+from tests.corpus import synth_utterance
+from utils.audio_buffer import AudioBuffer
+from config import BACKEND_DIR, SAMPLE_RATE
+
+SERVER = """
+import asyncio, sys
+from tests import stubs
+stubs.install()
+from model_server import ModelServer
+asyncio.run(ModelServer(sys.argv[1], names=("emotion_detector", "tts_engine"), threads=2).serve())
+"""
+
+
+@pytest.fixture(scope="module")
+def remote(tmp_path_factory):
+    """(client, proxies) for a stub-model server in its own process, as in production"""
+    socket_path = str(tmp_path_factory.mktemp("model_server") / "models.sock")
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+    server = subprocess.Popen([sys.executable, "-c", SERVER, socket_path], env=env)
+    try:
+        deadline = time.monotonic() + 60
+        while not os.path.exists(socket_path):
+            assert server.poll() is None, "model server exited"
+            assert time.monotonic() < deadline, "model server did not start"
+            time.sleep(0.05)
+        client = ModelServerClient(socket_path, timeout=60)
+        yield client, {name: client.connect(name) for name in ("emotion_detector", "tts_engine")}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    # SIGTERM shuts down cleanly, removing the socket
+    assert not os.path.exists(socket_path)
+
+
+def test_socket_is_owner_only(remote):
+    client, models = remote
+    assert os.stat(client.socket_path).st_mode & 0o777 == 0o600
+
+
+@pytest.mark.parametrize("seconds", [0.5, 3.0])
+def test_detect_matches_local_model(remote, seconds):
+    client, models = remote
+    # 0.5 s is pickled inline; 3 s is over MODEL_SERVER_SHM_MIN_KB and goes through shared memory
+    clip = AudioBuffer(synth_utterance(seconds, "happy", np.random.default_rng(4)), SAMPLE_RATE)
+
+    result = models["emotion_detector"].detect(clip, "I feel great today")
+
+    assert result == EmotionDetector().detect(clip, "I feel great today")
+
+
+def test_streamed_synthesis_round_trips(remote):
+    client, models = remote
+    sentences = ["Hello there.", "Take your time."]
+
+    chunks = list(models["tts_engine"].synthesize_stream(sentences, "calm"))
+
+    assert len(chunks) > 1
+    assert b"".join(chunks) == b"".join(TTSEngine().synthesize_stream(sentences, "calm"))
+    # The connection went back to the pool and still works
+    assert client.status()["tts_engine"]["state"] == "ready"
+
+
+def test_errors_come_back_as_exceptions(remote):
+    client, models = remote
+
+    with pytest.raises(AttributeError):
+        client.call("tts_engine", "_synthesize_fast", "hi")
+    with pytest.raises(AttributeError):
+        client.call("tts_engine", "no_such_method")
+    with pytest.raises(AttributeError):
+        models["tts_engine"]._cache
@@ -0,0 +1,60 @@
+# backend/utils/audio_buffer.py
+import librosa
+import numpy as np
+from pathlib import Path
+from typing import List, Union
+from config import SAMPLE_RATE
+
+
+class AudioBuffer:
+    """
+    Decoded mono float32 waveform at a fixed sample rate.
+    Decode an upload once and hand this object to Whisper, the
+    emotion classifier and AudioProcessor instead of a file path.
+    """
+
+    def __init__(self, samples: np.ndarray, sr: int = SAMPLE_RATE):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sr = sr
+
+    @classmethod
+    def from_file(
+        cls, audio_path: Union[str, Path], sr: int = SAMPLE_RATE, max_seconds: float = None
+    ) -> "AudioBuffer":
+        """Decode and resample a file to mono float32 (at most max_seconds of it)"""
+        y, _ = librosa.load(str(audio_path), sr=sr, mono=True, duration=max_seconds)
+        return cls(y, sr)
+
+    @classmethod
+    def coerce(cls, audio: Union["AudioBuffer", str, Path], sr: int = SAMPLE_RATE) -> "AudioBuffer":
+        """Accept either a decoded buffer or a path (legacy callers)"""
+        if isinstance(audio, AudioBuffer):
+            return audio if audio.sr == sr else audio.resample(sr)
+        return cls.from_file(audio, sr)
+
+    @classmethod
+    def concat(cls, buffers: List["AudioBuffer"], sr: int = SAMPLE_RATE) -> "AudioBuffer":
+        """Join buffers that share a sample rate"""
+        if not buffers:
+            return cls(np.zeros(0, dtype=np.float32), sr)
+        return cls(np.concatenate([b.samples for b in buffers]), buffers[0].sr)
+
+    def slice(self, start: int, end: int) -> "AudioBuffer":
+        """Sample range [start, end) as a new buffer (a view, no copy)"""
+        return AudioBuffer(self.samples[start:end], self.sr)
+
+    def resample(self, sr: int) -> "AudioBuffer":
+        y = librosa.resample(self.samples, orig_sr=self.sr, target_sr=sr)
+        return AudioBuffer(y, sr)
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds"""
+        return len(self.samples) / float(self.sr) if self.sr else 0.0
+
+    def as_pipeline_input(self) -> dict:
+        """Input format accepted by transformers audio pipelines"""
+        return {"raw": self.samples, "sampling_rate": self.sr}
+
+    def __len__(self) -> int:
+        return len(self.samples)
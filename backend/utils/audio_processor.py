@@ -1,113 +1,314 @@
 # backend/utils/audio_processor.py
 import librosa
 import numpy as np
-from scipy import signal
-from typing import Tuple
+from typing import List, Tuple, Union
 import warnings
+from utils.audio_buffer import AudioBuffer
+from config import (
+    VAD_MARGIN_DB, VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_PAD_MS, MAX_SEGMENT_SECONDS
+)
 
 # Suppress librosa warnings
 warnings.filterwarnings('ignore')
 
+# Analysis frame shared by every feature (librosa defaults)
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+N_MFCC = 13
+
+# Pitch search range (Hz)
+PITCH_FMIN = 50
+PITCH_FMAX = 500
+
+# Voice activity frames: 25 ms windows every 10 ms
+VAD_FRAME_MS = 25
+VAD_HOP_MS = 10
+
+# Fixed feature-vector layout returned by AudioProcessor.extract_features
+FEATURE_NAMES = (
+    ["pitch_mean", "pitch_std", "energy_mean", "energy_std",
+     "spectral_centroid", "zero_crossing_rate", "tempo"]
+    + [f"mfcc_mean_{i}" for i in range(N_MFCC)]
+    + [f"mfcc_std_{i}" for i in range(N_MFCC)]
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+N_FEATURES = len(FEATURE_NAMES)
+MFCC_MEAN = slice(FEATURE_INDEX["mfcc_mean_0"], FEATURE_INDEX["mfcc_mean_0"] + N_MFCC)
+MFCC_STD = slice(FEATURE_INDEX["mfcc_std_0"], FEATURE_INDEX["mfcc_std_0"] + N_MFCC)
+
+# Bump when extraction changes its output, so cached features are recomputed
+FEATURE_VERSION = 2
+
+
+class Spectrogram:
+    """One framing + STFT + mel representation of a clip, shared by all features"""
+
+    def __init__(self, frames: np.ndarray, power: np.ndarray, mel_db: np.ndarray, sr: int):
+        self.frames = frames          # (N_FFT, n_frames) time-domain frames
+        self.power = power            # (1 + N_FFT // 2, n_frames) |STFT|^2
+        self.magnitude = np.sqrt(power)
+        self.mel_db = mel_db          # (N_MELS, n_frames) log-mel power
+        self.sr = sr
+
+    @property
+    def n_frames(self) -> int:
+        return self.power.shape[1]
+
+
 class AudioProcessor:
     """Extract audio features for emotion detection"""
-    
+
     def __init__(self, sr: int = 16000):
         self.sr = sr
-    
-    def extract_features(self, audio_path: str) -> dict:
+        self._window = librosa.filters.get_window("hann", N_FFT, fftbins=True).astype(np.float32)
+        self._mel_basis = librosa.filters.mel(sr=sr, n_fft=N_FFT, n_mels=N_MELS)
+        # Autocorrelation of the window, used to undo its taper in pitch tracking
+        window_acf = np.fft.irfft(np.abs(np.fft.rfft(self._window)) ** 2, n=N_FFT)
+        self._window_acf = window_acf / window_acf[0]
+        self._min_lag = max(1, int(sr // PITCH_FMAX))
+        self._max_lag = min(N_FFT // 2, int(np.ceil(sr / PITCH_FMIN)))
+
+    def extract_features(self, audio: Union[AudioBuffer, str]) -> np.ndarray:
         """
         Extract prosodic and spectral features from audio
-        Returns: dict with features for emotion detection
+        Accepts a decoded AudioBuffer (preferred) or a file path
+        Returns: float32 vector laid out as FEATURE_NAMES
         """
         try:
-            # Load audio
-            y, sr = librosa.load(audio_path, sr=self.sr)
-            
-            # Extract features
-            features = {}
-            
-            # 1. Pitch-based features (safe method)
+            # Reuse the decoded waveform; only paths hit the decoder
+            buffer = AudioBuffer.coerce(audio, self.sr)
+            spec = self.analyze(buffer.samples)
+
+            features = self._get_default_features()
+
+            # 1. Pitch-based features
             try:
-                features['pitch_mean'], features['pitch_std'] = self._extract_pitch(y, sr)
+                pitch = self._extract_pitch(spec)
+                features[FEATURE_INDEX['pitch_mean']], features[FEATURE_INDEX['pitch_std']] = pitch
             except:
-                features['pitch_mean'] = 0.0
-                features['pitch_std'] = 0.0
-            
+                pass
+
             # 2. Energy features
             try:
-                features['energy_mean'], features['energy_std'] = self._extract_energy(y)
+                energy = self._extract_energy(spec)
+                features[FEATURE_INDEX['energy_mean']], features[FEATURE_INDEX['energy_std']] = energy
             except:
-                features['energy_mean'] = 0.0
-                features['energy_std'] = 0.0
-            
+                pass
+
             # 3. MFCCs (Mel-Frequency Cepstral Coefficients)
             try:
-                mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-                features['mfcc_mean'] = np.mean(mfccs, axis=1)
-                features['mfcc_std'] = np.std(mfccs, axis=1)
+                mfccs = librosa.feature.mfcc(S=spec.mel_db, n_mfcc=N_MFCC)
+                features[MFCC_MEAN] = np.mean(mfccs, axis=1)
+                features[MFCC_STD] = np.std(mfccs, axis=1)
             except:
-                features['mfcc_mean'] = np.zeros(13)
-                features['mfcc_std'] = np.zeros(13)
-            
+                pass
+
             # 4. Spectral features
             try:
-                spec = np.abs(librosa.stft(y))
-                features['spectral_centroid'] = np.mean(librosa.feature.spectral_centroid(S=spec, sr=sr))
+                centroid = librosa.feature.spectral_centroid(S=spec.magnitude, sr=spec.sr, n_fft=N_FFT)
+                features[FEATURE_INDEX['spectral_centroid']] = np.mean(centroid)
             except:
-                features['spectral_centroid'] = 0.0
-            
-            # 5. Zero crossing rate
+                pass
+
+            # 5. Zero crossing rate (from the same frames as the STFT)
             try:
-                features['zero_crossing_rate'] = np.mean(librosa.feature.zero_crossing_rate(y))
+                features[FEATURE_INDEX['zero_crossing_rate']] = np.mean(self._zero_crossing_rate(spec.frames))
             except:
-                features['zero_crossing_rate'] = 0.0
-            
-            # 6. Tempo (use new librosa API)
+                pass
+
+            # 6. Tempo from the onset envelope of the shared mel spectrogram
             try:
-                # New API for librosa 0.10+
-                features['tempo'] = librosa.feature.rhythm.tempo(y=y, sr=sr)[0]
+                onset_env = librosa.onset.onset_strength(S=spec.mel_db, sr=spec.sr)
+                features[FEATURE_INDEX['tempo']] = librosa.feature.rhythm.tempo(
+                    onset_envelope=onset_env, sr=spec.sr, hop_length=HOP_LENGTH
+                )[0]
             except:
-                try:
-                    # Fallback to old API
-                    features['tempo'] = librosa.beat.tempo(y=y, sr=sr)[0]
-                except:
-                    features['tempo'] = 100.0  # Default
-            
+                pass
+
             return features
-        
+
         except Exception as e:
             print(f"⚠️ Error extracting audio features: {e}")
             # Return safe defaults
             return self._get_default_features()
-    
-    def _extract_pitch(self, y: np.ndarray, sr: int) -> Tuple[float, float]:
-        """Extract fundamental frequency (pitch) - safe method"""
+
+    def analyze(self, y: np.ndarray) -> Spectrogram:
+        """Frame the signal once and compute the STFT power and log-mel spectrogram"""
+        y = np.ascontiguousarray(y, dtype=np.float32)
+        # Centered frames, matching librosa.stft(center=True, pad_mode="constant")
+        padded = np.pad(y, N_FFT // 2, mode="constant")
+        if len(padded) < N_FFT:
+            padded = np.pad(padded, (0, N_FFT - len(padded)), mode="constant")
+        frames = librosa.util.frame(padded, frame_length=N_FFT, hop_length=HOP_LENGTH)
+
+        stft = np.fft.rfft(frames * self._window[:, None], axis=0)
+        power = (stft.real ** 2 + stft.imag ** 2).astype(np.float32)
+        mel_db = librosa.power_to_db(self._mel_basis @ power)
+
+        return Spectrogram(frames, power, mel_db, self.sr)
+
+    def _extract_pitch(self, spec: Spectrogram) -> Tuple[float, float]:
+        """
+        Fundamental frequency from the autocorrelation of each frame,
+        taken as the inverse FFT of the shared power spectrum
+        """
         try:
-            # Use a simpler, more stable method
-            f0 = librosa.yin(y, fmin=50, fmax=500, sr=sr)
-            f0 = f0[f0 > 0]  # Remove unvoiced frames
-            
+            acf = np.fft.irfft(spec.power, n=N_FFT, axis=0)[: self._max_lag + 1]
+            energy = acf[0]
+            voiced_energy = energy > 1e-3 * (np.max(energy) + 1e-10)
+
+            nacf = acf / (energy + 1e-10) / self._window_acf[: self._max_lag + 1, None]
+            search = nacf[self._min_lag:]
+            peak = np.max(search, axis=0)
+
+            # The first lobe reaching close to the peak avoids octave multiples;
+            # its own maximum (not where it crosses 0.9 * peak) is the period
+            above = search >= 0.9 * peak
+            first = np.argmax(above, axis=0)
+            index = np.arange(search.shape[0])[:, None]
+            past_lobe = (index >= first) & ~above
+            lobe_end = np.where(past_lobe.any(axis=0), np.argmax(past_lobe, axis=0), search.shape[0])
+            in_lobe = (index >= first) & (index < lobe_end)
+            lag = np.argmax(np.where(in_lobe, search, -np.inf), axis=0) + self._min_lag
+
+            # Parabolic interpolation between neighbouring lags for sub-sample precision
+            columns = np.arange(nacf.shape[1])
+            inner = (lag > 0) & (lag < nacf.shape[0] - 1)
+            prev_lag = np.clip(lag - 1, 0, nacf.shape[0] - 1)
+            next_lag = np.clip(lag + 1, 0, nacf.shape[0] - 1)
+            left, centre, right = nacf[prev_lag, columns], nacf[lag, columns], nacf[next_lag, columns]
+            curvature = left - 2 * centre + right
+            peaked = inner & (curvature < 0)
+            shift = np.zeros(len(columns))
+            shift[peaked] = 0.5 * (left[peaked] - right[peaked]) / curvature[peaked]
+            lag = lag + np.clip(shift, -0.5, 0.5)
+
+            voiced = voiced_energy & (peak > 0.5)
+            f0 = spec.sr / lag[voiced]
+            f0 = f0[(f0 >= PITCH_FMIN) & (f0 <= PITCH_FMAX)]
+
             if len(f0) > 0:
                 return float(np.mean(f0)), float(np.std(f0))
         except:
             pass
-        
+
         return 100.0, 20.0  # Safe defaults
-    
-    def _extract_energy(self, y: np.ndarray) -> Tuple[float, float]:
-        """Extract energy envelope - safe method"""
+
+    def _extract_energy(self, spec: Spectrogram) -> Tuple[float, float]:
+        """Extract energy envelope from the shared STFT"""
         try:
-            # Use a simpler method to avoid NumPy issues
-            # Compute RMS energy frame by frame
-            frame_length = 2048
-            hop_length = 512
-            
-            S = np.abs(librosa.stft(y, n_fft=frame_length, hop_length=hop_length))
-            energy = np.sqrt(np.sum(S**2, axis=0))
-            
+            energy = self._frame_energy(spec)
+
             if len(energy) > 0:
                 return float(np.mean(energy)), float(np.std(energy))
         except:
             pass
-        
+
         return 0.05, 0.02  # Safe defaults
+
+    def _frame_energy(self, spec: Spectrogram) -> np.ndarray:
+        """Per-frame spectral energy"""
+        return np.sqrt(np.sum(spec.power, axis=0))
+
+    def _zero_crossing_rate(self, frames: np.ndarray) -> np.ndarray:
+        """Per-frame zero crossing rate of (frame_length, n_frames) frames"""
+        signs = np.signbit(frames)
+        return np.mean(signs[1:] != signs[:-1], axis=0)
+
+    def speech_segments(
+        self,
+        audio: Union[AudioBuffer, str],
+        max_seconds: float = MAX_SEGMENT_SECONDS
+    ) -> List[AudioBuffer]:
+        """
+        Voiced regions of the clip, each at most `max_seconds` long.
+        Falls back to the whole clip (chunked) when nothing is detected as
+        speech, so a too-strict threshold never drops a recording.
+        """
+        buffer = AudioBuffer.coerce(audio, self.sr)
+        ranges = self._speech_ranges(buffer.samples) or [(0, len(buffer))]
+        return self._bounded_segments(buffer, ranges, max_seconds)
+
+    def split_segments(
+        self,
+        audio: Union[AudioBuffer, str],
+        max_seconds: float = MAX_SEGMENT_SECONDS
+    ) -> List[AudioBuffer]:
+        """Whole clip in pieces of at most `max_seconds` (no VAD)"""
+        buffer = AudioBuffer.coerce(audio, self.sr)
+        return self._bounded_segments(buffer, [(0, len(buffer))], max_seconds)
+
+    def _bounded_segments(self, buffer: AudioBuffer, ranges: List[Tuple[int, int]], max_seconds: float) -> List[AudioBuffer]:
+        # Split long regions into equal pieces no longer than max_seconds
+        max_samples = max(1, int(max_seconds * self.sr))
+        segments = []
+        for start, end in ranges:
+            pieces = max(1, int(np.ceil((end - start) / max_samples)))
+            bounds = np.linspace(start, end, pieces + 1).astype(int)
+            segments.extend(buffer.slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a)
+        return segments or [buffer]
+
+    def trim_silence(self, audio: Union[AudioBuffer, str]) -> AudioBuffer:
+        """Clip with leading, trailing and long internal silences removed"""
+        buffer = AudioBuffer.coerce(audio, self.sr)
+        ranges = self._speech_ranges(buffer.samples)
+        if not ranges:
+            return buffer
+        return AudioBuffer.concat([buffer.slice(a, b) for a, b in ranges], self.sr)
+
+    def _speech_ranges(self, y: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Sample ranges containing speech, from frame energy and zero crossings.
+        A frame is speech if its energy clears the clip's noise floor by
+        VAD_MARGIN_DB, or if it is a quieter high-ZCR frame (fricatives).
+        """
+        frame_length = int(self.sr * VAD_FRAME_MS / 1000)
+        hop_length = int(self.sr * VAD_HOP_MS / 1000)
+        if len(y) < frame_length:
+            return []
+
+        frames = librosa.util.frame(np.ascontiguousarray(y, dtype=np.float32), frame_length=frame_length, hop_length=hop_length)
+        rms_db = 10 * np.log10(np.mean(frames ** 2, axis=0) + 1e-10)
+        zcr = self._zero_crossing_rate(frames)
+
+        noise_floor = np.percentile(rms_db, 10)
+        threshold = max(noise_floor + VAD_MARGIN_DB, np.max(rms_db) - 50, -60.0)
+        voiced = (rms_db > threshold) | ((zcr > 0.25) & (rms_db > threshold - VAD_MARGIN_DB / 2))
+
+        # Runs of voiced frames → [start, end) frame ranges
+        edges = np.diff(np.concatenate([[0], voiced.astype(np.int8), [0]]))
+        runs = list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+        # Bridge short pauses, then drop blips
+        min_gap = VAD_MIN_SILENCE_MS // VAD_HOP_MS
+        merged = []
+        for start, end in runs:
+            if merged and start - merged[-1][1] < min_gap:
+                merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        min_run = VAD_MIN_SPEECH_MS // VAD_HOP_MS
+        merged = [(a, b) for a, b in merged if b - a >= min_run]
+
+        # Frames → padded sample ranges
+        pad = int(self.sr * VAD_PAD_MS / 1000)
+        ranges = []
+        for start, end in merged:
+            a = max(0, start * hop_length - pad)
+            b = min(len(y), end * hop_length + frame_length + pad)
+            if ranges and a <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], b)
+            else:
+                ranges.append((a, b))
+        return ranges
+
+    def _get_default_features(self) -> np.ndarray:
+        """Safe defaults in FEATURE_NAMES layout"""
+        features = np.zeros(N_FEATURES, dtype=np.float32)
+        features[FEATURE_INDEX['pitch_mean']] = 100.0
+        features[FEATURE_INDEX['pitch_std']] = 20.0
+        features[FEATURE_INDEX['energy_mean']] = 0.05
+        features[FEATURE_INDEX['energy_std']] = 0.02
+        features[FEATURE_INDEX['tempo']] = 100.0
+        return features
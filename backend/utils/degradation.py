@@ -0,0 +1,130 @@
+# backend/utils/degradation.py
+import math
+import threading
+import time
+from typing import Callable, NamedTuple
+
+
+class Tier(NamedTuple):
+    """What a request may spend at one quality level"""
+    name: str
+    fast_tts: bool           # pyttsx3 instead of Coqui
+    template_response: bool  # canned reply instead of a Gemini call
+    text_sentiment: bool     # score the transcript with the text model
+    lite_whisper: bool       # smaller Whisper model
+
+
+# Cheapest savings first: Coqui is the slowest stage, then Gemini, then the models
+TIERS = (
+    Tier("full", fast_tts=False, template_response=False, text_sentiment=True, lite_whisper=False),
+    Tier("fast_tts", fast_tts=True, template_response=False, text_sentiment=True, lite_whisper=False),
+    Tier("template", fast_tts=True, template_response=True, text_sentiment=True, lite_whisper=False),
+    Tier("minimal", fast_tts=True, template_response=True, text_sentiment=False, lite_whisper=True),
+)
+FULL = TIERS[0]
+
+
+class DegradationPolicy:
+    """
+    Steps requests down to cheaper quality tiers while the node is
+    overloaded and back up once it recovers.
+
+    Load is the larger of two ratios: requests in flight (running + queued)
+    over `capacity`, and a moving average of pipeline latency over
+    `target_seconds`. Latency only counts while other requests are in
+    flight, so a slow model on an idle node is not mistaken for overload.
+    At or above `step_up` the policy drops one tier (at most every
+    `step_seconds`); it climbs back one tier for every `recover_seconds`
+    that load has stayed at or below `step_down`. Calm time counts from
+    the last time load was seen above `step_down` (requests arriving or
+    finishing), so an idle node recovers on its next request. The gap
+    between the thresholds keeps it from flapping.
+    """
+
+    def __init__(
+        self,
+        in_flight: Callable[[], int],
+        capacity: int,
+        target_seconds: float,
+        step_up: float = 0.8,
+        step_down: float = 0.5,
+        step_seconds: float = 5.0,
+        recover_seconds: float = 20.0,
+        max_tier: int = len(TIERS) - 1,
+        enabled: bool = True,
+        smoothing: float = 0.3
+    ):
+        self.in_flight = in_flight
+        self.capacity = max(1, capacity)
+        self.target_seconds = target_seconds
+        self.step_up = step_up
+        self.step_down = step_down
+        self.step_seconds = step_seconds
+        self.recover_seconds = recover_seconds
+        self.max_tier = max(0, min(max_tier, len(TIERS) - 1))
+        self.enabled = enabled
+        self.smoothing = smoothing
+
+        self.level = 0
+        self._latency = 0.0           # moving average of pipeline seconds
+        self._changed_at = -math.inf  # monotonic time of the last tier change
+        self._busy_at = -math.inf     # monotonic time load was last seen above step_down
+        self._lock = threading.Lock()
+
+    @property
+    def tier(self) -> Tier:
+        return TIERS[self.level]
+
+    def load(self) -> float:
+        in_flight = self.in_flight()
+        load = in_flight / self.capacity
+        if in_flight and self.target_seconds:
+            load = max(load, self._latency / self.target_seconds)
+        return load
+
+    def current(self) -> Tier:
+        """Tier for a request arriving now (re-evaluates the load, not counting it)"""
+        self._update()
+        return self.tier
+
+    def observe(self, seconds: float):
+        """Record one request's pipeline latency and re-evaluate the load"""
+        with self._lock:
+            if self._latency:
+                self._latency += self.smoothing * (seconds - self._latency)
+            else:
+                self._latency = seconds
+        self._update()
+
+    def status(self) -> dict:
+        return {
+            "tier": self.tier.name,
+            "level": self.level,
+            "enabled": self.enabled,
+            "load": round(self.load(), 3),
+            "latency_seconds": round(self._latency, 3),
+        }
+
+    def _update(self):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            load = self.load()
+            if load > self.step_down:
+                self._busy_at = now
+            if load >= self.step_up:
+                if self.level < self.max_tier and now - self._changed_at >= self.step_seconds:
+                    self._change(self.level + 1, now, load)
+            elif load <= self.step_down and self.level > 0:
+                # One tier per recover_seconds of calm, however long ago that began
+                calm_for = now - max(self._busy_at, self._changed_at)
+                steps = int(calm_for // self.recover_seconds)
+                if steps > 0:
+                    self._change(max(0, self.level - steps), now, load)
+
+    def _change(self, level: int, now: float, load: float):
+        arrow = "⬇️ Degrading" if level > self.level else "⬆️ Recovering"
+        print(f"{arrow} to quality tier '{TIERS[level].name}' (load {load:.2f})")
+        self.level = level
+        self._changed_at = now
@@ -0,0 +1,153 @@
+# backend/utils/inference_cache.py
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from utils.logger import register_cache_metrics
+from config import INFERENCE_CACHE_ENABLED, INFERENCE_CACHE_PATH, INFERENCE_CACHE_MAX_MB
+
+
+class InferenceCache:
+    """
+    Per-recording inference results keyed by a hash of the uploaded bytes.
+
+    Each entry is (key, kind): `kind` names the stage plus a fingerprint of
+    the model/config that produced it, so changing a model or decoding
+    setting never serves stale results. Values live in one SQLite file;
+    reads refresh an entry's access time and the least recently used
+    entries are evicted once the store exceeds `max_bytes`. Several worker
+    processes may share the file, so its size is always read from the table.
+    """
+
+    def __init__(self, db_path: Path, max_bytes: int):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT NOT NULL, kind TEXT NOT NULL, value BLOB NOT NULL,"
+            " size INTEGER NOT NULL, accessed REAL NOT NULL,"
+            " PRIMARY KEY (key, kind))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        """Content hash of an upload"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def file_key(path) -> str:
+        """Content hash of an upload saved to disk (same value as key())"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        """Short hash of whatever config determines a stage's output"""
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+    def get(self, key: str, kind: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND kind = ?", (key, kind)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ? AND kind = ?", (time.time(), key, kind)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, kind: str, value: bytes):
+        with self._lock:
+            # The insert opens the write transaction, so the size check below
+            # sees every other process's entries and none can slip in meanwhile
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, kind, value, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, value, len(value), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def get_array(self, key: str, kind: str) -> Optional[np.ndarray]:
+        value = self.get(key, kind)
+        return None if value is None else np.load(io.BytesIO(value), allow_pickle=False)
+
+    def put_array(self, key: str, kind: str, array: np.ndarray):
+        buf = io.BytesIO()
+        np.save(buf, np.asarray(array), allow_pickle=False)
+        self.put(key, kind, buf.getvalue())
+
+    def get_text(self, key: str, kind: str) -> Optional[str]:
+        value = self.get(key, kind)
+        return None if value is None else value.decode("utf-8")
+
+    def put_text(self, key: str, kind: str, text: str):
+        self.put(key, kind, text.encode("utf-8"))
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used entries until 90% of max_bytes (lock held, in the write transaction)"""
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, kind, size FROM entries ORDER BY accessed").fetchall()
+        for key, kind, size in rows:
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ? AND kind = ?", (key, kind))
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self._total_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_inference_cache() -> Optional[InferenceCache]:
+    """Process-wide cache shared by the transcriber and emotion detector (None if disabled)"""
+    global _shared
+    if not INFERENCE_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = InferenceCache(INFERENCE_CACHE_PATH, int(INFERENCE_CACHE_MAX_MB * 1024 * 1024))
+            register_cache_metrics("inference", _shared)
+        return _shared
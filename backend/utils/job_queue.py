@@ -0,0 +1,104 @@
+# backend/utils/job_queue.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+
+class JobQueue:
+    """
+    In-process queue of job ids drained by a fixed number of asyncio workers.
+    Job state lives in the database; the queue only carries ids, so pending
+    jobs can be re-enqueued after a restart.
+
+    Every web worker runs its own queue over the same table, so the same id
+    may sit in several of them: the handler must claim a job atomically and
+    return without doing anything when another process got it first.
+    `poll` (optional) returns the ids waiting in the database; it runs every
+    `poll_seconds` so jobs left behind by a dead worker are picked up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[str], Awaitable[None]],
+        workers: int = 1,
+        poll: Optional[Callable[[], Awaitable[List[str]]]] = None,
+        poll_seconds: float = 15.0
+    ):
+        self.name = name
+        self.handler = handler
+        self.num_workers = max(1, workers)
+        self.poll = poll
+        self.poll_seconds = poll_seconds
+
+        self._queue: asyncio.Queue = None
+        self._queued: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._waiters: Dict[str, asyncio.Event] = {}
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self, pending: Iterable[str] = ()):
+        """Start workers and re-enqueue jobs left over from a previous run"""
+        self._queue = asyncio.Queue()
+        self._queued.clear()
+        for job_id in pending:
+            self.enqueue(job_id)
+
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-{i}")
+            for i in range(self.num_workers)
+        ]
+        if self.poll is not None:
+            self._workers.append(asyncio.create_task(self._poller(), name=f"{self.name}-poll"))
+        print(f"✅ {self.name} queue started with {self.num_workers} worker(s)")
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def enqueue(self, job_id: str):
+        if job_id not in self._queued:
+            self._queued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> bool:
+        """Block until the job finishes here (completed or failed) or timeout"""
+        event = self._waiters.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            # It may be running in another process; don't keep the event forever
+            if self._waiters.get(job_id) is event:
+                del self._waiters[job_id]
+            return False
+
+    def _notify(self, job_id: str):
+        event = self._waiters.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _poller(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                for job_id in await self.poll():
+                    self.enqueue(job_id)
+            except Exception as e:
+                print(f"⚠️ {self.name} poll failed: {e}")
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                await self.handler(job_id)
+            except Exception as e:
+                print(f"❌ {self.name} job {job_id} crashed: {e}")
+            finally:
+                self._notify(job_id)
+                self._queue.task_done()
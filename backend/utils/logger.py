@@ -0,0 +1,259 @@
+# backend/utils/logger.py
+"""
+Per-stage timing and resource metrics.
+
+    with timed("whisper"):
+        result = model.transcribe(...)
+
+records the stage in the `moodmate_stage_seconds` histogram and, inside a
+request (see `request_timer()`, opened by the app middleware), in that
+request's Server-Timing header. Gauges are callbacks read at scrape time,
+so queue depths, cache hit ratios and model load times cost nothing
+between scrapes. `metrics.render()` produces Prometheus text format.
+
+Metrics are per process: with several uvicorn workers, scrape each one
+(or run the model server with --metrics-port for the model stages).
+"""
+import contextvars
+import os
+import resource
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Seconds: 5 ms (a cache hit) .. 60 s (Whisper on a long clip)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+RSS_BUCKETS = tuple(2 ** n * 1024 * 1024 for n in range(7, 15))  # 128 MB .. 16 GB
+
+INF_LABEL = 'le="+Inf"'
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """Resident set size now (Linux), else the process peak"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Highest resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # macOS reports bytes, Linux KiB
+
+
+def _label_key(labelnames: Tuple[str, ...], labels: dict) -> Tuple[str, ...]:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames: Tuple[str, ...], key: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, INF_LABEL)} {values[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(float(values[-2]))}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-1]}"
+
+
+class Gauge:
+    """Value read from a callback per label set when rendered (counters use kind="counter")"""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._functions: Dict[tuple, Callable[[], Optional[float]]] = {}
+
+    def set_function(self, fn: Callable[[], Optional[float]], **labels):
+        """Report fn() for these labels; None skips the sample"""
+        self._functions[_label_key(self.labelnames, labels)] = fn
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, fn in sorted(self._functions.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=STAGE_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames, kind="counter"))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "moodmate_stage_seconds", "Latency of one pipeline stage", ("stage",)
+)
+REQUEST_SECONDS = metrics.histogram(
+    "moodmate_request_seconds", "HTTP request latency", ("method", "route", "status")
+)
+REQUEST_PEAK_RSS = metrics.histogram(
+    "moodmate_request_peak_rss_bytes", "Highest RSS sampled during a request (at stage boundaries)",
+    ("route",), buckets=RSS_BUCKETS
+)
+BATCH_SIZE = metrics.histogram(
+    "moodmate_batch_size", "Items per micro-batched model call", ("batcher",), buckets=BATCH_SIZE_BUCKETS
+)
+QUEUE_DEPTH = metrics.gauge("moodmate_queue_depth", "Items waiting in a queue", ("queue",))
+ACTIVE_WORKERS = metrics.gauge("moodmate_active_workers", "Requests or jobs currently running", ("pool",))
+CACHE_HITS = metrics.counter("moodmate_cache_hits_total", "Cache hits", ("cache",))
+CACHE_MISSES = metrics.counter("moodmate_cache_misses_total", "Cache misses", ("cache",))
+CACHE_HIT_RATIO = metrics.gauge("moodmate_cache_hit_ratio", "Cache hits / lookups since start", ("cache",))
+MODEL_LOAD_SECONDS = metrics.gauge("moodmate_model_load_seconds", "Time to load a model", ("model",))
+MODEL_WARMUP_SECONDS = metrics.gauge("moodmate_model_warmup_seconds", "Time to warm up a model", ("model",))
+PROCESS_RSS = metrics.gauge("moodmate_process_rss_bytes", "Resident set size")
+PROCESS_PEAK_RSS = metrics.gauge("moodmate_process_peak_rss_bytes", "Highest resident set size so far")
+DEGRADATION_TIER = metrics.gauge("moodmate_degradation_tier", "Quality tier new requests get (0 = full)")
+PROCESS_RSS.set_function(current_rss_bytes)
+PROCESS_PEAK_RSS.set_function(peak_rss_bytes)
+
+
+def register_cache_metrics(name: str, cache):
+    """Export hits, misses and hit ratio of any cache with .hits / .misses counters"""
+    CACHE_HITS.set_function(lambda: cache.hits, cache=name)
+    CACHE_MISSES.set_function(lambda: cache.misses, cache=name)
+
+    def hit_ratio():
+        lookups = cache.hits + cache.misses
+        return round(cache.hits / lookups, 4) if lookups else None
+
+    CACHE_HIT_RATIO.set_function(hit_ratio, cache=name)
+
+
+class RequestTimer:
+    """Stage durations and peak RSS of one request (shared by its tasks and worker threads)"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.peak_rss = current_rss_bytes()
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        rss = current_rss_bytes()
+        with self._lock:
+            # Repeated stages (e.g. TTS per sentence) add up
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+            self.peak_rss = max(self.peak_rss, rss)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        with self._lock:
+            stages = list(self.stages.items())
+        entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages]
+        entries.append(f"total;dur={self.elapsed * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_request: contextvars.ContextVar = contextvars.ContextVar("request_timer", default=None)
+
+
+@contextmanager
+def request_timer():
+    """Collect the stages timed by this request (its tasks, and worker threads via WorkerPool.run)"""
+    timer = RequestTimer()
+    token = _current_request.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_request.reset(token)
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a block as `stage` (histogram + current request's Server-Timing)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        timer = _current_request.get()
+        if timer is not None:
+            timer.add(stage, seconds)
@@ -0,0 +1,97 @@
+# backend/utils/micro_batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+from utils.logger import BATCH_SIZE, QUEUE_DEPTH, timed
+
+
+class MicroBatcher:
+    """
+    Dynamic batcher for blocking model calls.
+
+    Callers on different threads `enqueue()` items and get Futures; a
+    background thread collects them for up to `max_wait_ms` or
+    `max_batch_size` items, runs `batch_fn` once on the list and resolves
+    each caller's future with its own result. `batch_fn` must return one
+    result per input, in order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        QUEUE_DEPTH.set_function(self._queue.qsize, queue=f"batcher:{name}")
+
+    def enqueue(self, item: Any) -> Future:
+        """Queue one item without waiting; the caller can do other work meanwhile"""
+        return self.enqueue_many([item])[0]
+
+    def enqueue_many(self, items: List[Any]) -> List[Future]:
+        """Queue several items at once (they can share a batch)"""
+        futures = []
+        self._ensure_started()
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return futures
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name=f"batcher-{self.name}", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+
+            BATCH_SIZE.observe(len(items), batcher=self.name)
+            try:
+                with timed(f"{self.name}-batch"):
+                    results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: batch_fn returned {len(results)} results for {len(items)} inputs"
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
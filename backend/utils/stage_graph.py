@@ -0,0 +1,68 @@
+# backend/utils/stage_graph.py
+import asyncio
+import inspect
+import time
+from typing import Callable, Dict, Iterable
+
+
+class StageGraph:
+    """
+    Small dependency graph of pipeline stages.
+
+    `add(name, fn, after=(...))` declares a stage; `fn` is called with the
+    results of its dependencies, in order. `run(**inputs)` starts every
+    stage as soon as its dependencies are done, so independent branches
+    overlap. Blocking functions run on the worker pool, coroutine
+    functions on the event loop. The first failure cancels whatever is
+    still pending and is re-raised from `run()`.
+
+    Stages only depend on inputs or on stages added before them, so a
+    graph can never contain a cycle.
+    """
+
+    def __init__(self, pool, inputs: Iterable[str] = ()):
+        self.pool = pool
+        self.inputs = set(inputs)
+        self._stages = {}   # name -> (fn, dependency names), in insertion order
+        self.timings = {}   # name -> seconds, filled in by run()
+
+    def add(self, name: str, fn: Callable, after: Iterable[str] = ()) -> "StageGraph":
+        after = tuple(after)
+        if name in self._stages or name in self.inputs:
+            raise ValueError(f"Stage '{name}' is already defined")
+        for dep in after:
+            if dep not in self._stages and dep not in self.inputs:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = (fn, after)
+        return self
+
+    async def run(self, **inputs) -> Dict[str, object]:
+        """Run every stage; returns inputs and stage results by name"""
+        missing = self.inputs - set(inputs)
+        if missing:
+            raise ValueError(f"Missing graph inputs: {', '.join(sorted(missing))}")
+
+        tasks = {}
+        for name, (fn, after) in self._stages.items():
+            tasks[name] = asyncio.ensure_future(self._run_stage(name, fn, after, inputs, tasks))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {**inputs, **{name: task.result() for name, task in tasks.items()}}
+
+    async def _run_stage(self, name: str, fn: Callable, after: tuple, inputs: dict, tasks: dict):
+        args = [inputs[dep] if dep in inputs else await tasks[dep] for dep in after]
+
+        start = time.perf_counter()
+        if inspect.iscoroutinefunction(fn):
+            result = await fn(*args)
+        else:
+            result = await self.pool.run(fn, *args)
+        self.timings[name] = time.perf_counter() - start
+        return result
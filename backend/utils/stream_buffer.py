@@ -0,0 +1,76 @@
+# backend/utils/stream_buffer.py
+import numpy as np
+from config import SAMPLE_RATE
+from utils.audio_buffer import AudioBuffer
+
+SAMPLE_FORMATS = {
+    "s16": (np.int16, 1.0 / 32768.0),   # 16-bit little-endian PCM
+    "f32": (np.float32, 1.0),           # 32-bit float PCM
+}
+
+
+class StreamBuffer:
+    """
+    Growing mono PCM buffer for streamed audio.
+    Chunks arrive as raw bytes at `sr`; any partial sample left at the end
+    of a chunk is carried over to the next one.
+    """
+
+    def __init__(self, sr: int = SAMPLE_RATE, sample_format: str = "s16", max_seconds: float = 120.0):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format: {sample_format}")
+
+        self.sr = sr
+        self._dtype, self._scale = SAMPLE_FORMATS[sample_format]
+        self._itemsize = np.dtype(self._dtype).itemsize
+        self.max_samples = int(max_seconds * sr)
+
+        self._data = np.zeros(sr * 4, dtype=np.float32)
+        self._length = 0
+        self._remainder = b""
+
+    def append(self, chunk: bytes) -> int:
+        """Add raw PCM bytes; returns the number of samples kept"""
+        chunk = self._remainder + chunk
+        usable = len(chunk) - len(chunk) % self._itemsize
+        self._remainder = chunk[usable:]
+
+        samples = np.frombuffer(chunk[:usable], dtype=self._dtype).astype(np.float32)
+        if self._scale != 1.0:
+            samples *= self._scale
+
+        samples = samples[: self.max_samples - self._length]
+        needed = self._length + len(samples)
+        if needed > len(self._data):
+            grown = np.zeros(max(needed, 2 * len(self._data)), dtype=np.float32)
+            grown[: self._length] = self._data[: self._length]
+            self._data = grown
+
+        self._data[self._length:needed] = samples
+        self._length = needed
+        return len(samples)
+
+    @property
+    def duration(self) -> float:
+        return self._length / float(self.sr)
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_samples
+
+    def window(self, seconds: float) -> AudioBuffer:
+        """Copy of the most recent `seconds` of audio"""
+        start = max(0, self._length - int(seconds * self.sr))
+        return AudioBuffer(self._data[start:self._length].copy(), self.sr)
+
+    def slice(self, start: int, end: int = None) -> AudioBuffer:
+        """Copy of samples [start, end) (end defaults to everything received)"""
+        end = self._length if end is None else min(end, self._length)
+        return AudioBuffer(self._data[start:end].copy(), self.sr)
+
+    def to_buffer(self) -> AudioBuffer:
+        """Copy of everything received so far"""
+        return AudioBuffer(self._data[: self._length].copy(), self.sr)
+
+    def __len__(self) -> int:
+        return self._length
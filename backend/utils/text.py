@@ -0,0 +1,53 @@
+# backend/utils/text.py
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+# Sentence boundary: end punctuation followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+')
+
+# Sentences shorter than this are merged into the next one
+MIN_SENTENCE_CHARS = 20
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a reply into sentence-sized synthesis units"""
+    sentences, pending = _take_sentences(text.strip())
+    if pending:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+
+def stream_sentences(fragments: Iterable[str]) -> Iterator[str]:
+    """Re-chunk streamed text fragments into complete sentences"""
+    buffer = ""
+    for fragment in fragments:
+        buffer += fragment
+        # The last part may still be growing; only emit parts followed by a boundary
+        parts = SENTENCE_BOUNDARY.split(buffer)
+        if len(parts) < 2:
+            continue
+        sentences, pending = _take_sentences(" ".join(parts[:-1]))
+        yield from sentences
+        buffer = f"{pending} {parts[-1]}".strip() if pending else parts[-1]
+
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form used for cache keys"""
+    return " ".join((text or "").lower().split()).strip(" .!?")
+
+
+def _take_sentences(text: str) -> Tuple[List[str], str]:
+    sentences = []
+    pending = ""
+    for part in SENTENCE_BOUNDARY.split(text):
+        pending = f"{pending} {part}".strip() if pending else part.strip()
+        if len(pending) >= MIN_SENTENCE_CHARS:
+            sentences.append(pending)
+            pending = ""
+    return sentences, pending
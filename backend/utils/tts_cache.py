@@ -0,0 +1,115 @@
+# backend/utils/tts_cache.py
+import hashlib
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class TTSCache:
+    """
+    Content-addressed on-disk cache of synthesized audio.
+
+    Files are named by a hash of (text, emotion, mode, voice). Access
+    refreshes a file's mtime, so eviction is LRU: entries older than
+    `max_age_seconds` go first, then the least recently used until the
+    directory fits in `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, max_age_seconds: float):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, emotion: str, mode: str, voice: str) -> str:
+        payload = "\x1f".join([mode, voice, emotion, " ".join(text.split())])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.wav"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Cached file for key (refreshing its LRU position), or None"""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key: str, source_path: str) -> Path:
+        """Move a freshly rendered file into the cache"""
+        path = self.path_for(key)
+        os.replace(source_path, path)
+        self.evict()
+        return path
+
+    def export(self, key: str, dest_path: Path) -> bool:
+        """
+        Give the cached file a second, permanent name outside the cache
+        (hard link, or a copy across filesystems), so eviction never breaks
+        a path handed out to a client. False if the entry was evicted.
+        """
+        path = self.path_for(key)
+        try:
+            try:
+                os.link(path, dest_path)
+            except OSError as e:
+                if isinstance(e, FileNotFoundError):
+                    raise
+                shutil.copyfile(path, dest_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def temp_path(self, key: str) -> Path:
+        """Unique scratch path in the cache dir (same filesystem as put())"""
+        return self.cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp.wav"
+
+    def evict(self):
+        """Drop expired entries, then least recently used until under max_bytes"""
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file() or entry.name.startswith("."):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+
+        for mtime, size, path in entries:
+            expired = now - mtime > self.max_age_seconds
+            if not expired and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
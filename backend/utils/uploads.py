@@ -0,0 +1,85 @@
+# backend/utils/uploads.py
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Tuple
+import soundfile as sf
+from fastapi import UploadFile
+from utils.audio_buffer import AudioBuffer
+from utils.logger import timed
+from config import SAMPLE_RATE
+
+# Read uploads in 1 MiB chunks so request memory stays flat
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+
+class UploadRejected(Exception):
+    """Raised when an upload exceeds the size or duration limits, or isn't audio"""
+
+    def __init__(self, message: str, status_code: int = 413):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def save_upload(
+    upload: UploadFile,
+    dest_dir: Path,
+    max_bytes: int,
+    name: str = None
+) -> Tuple[str, str]:
+    """
+    Stream an upload to a uniquely named file in dest_dir.
+
+    Returns (path, sha256 of the content). Never holds more than one
+    chunk in memory; raises UploadRejected (and removes the partial
+    file) as soon as the upload passes max_bytes.
+    """
+    suffix = os.path.splitext(upload.filename or "")[1].lower() or ".wav"
+    path = str(Path(dest_dir) / f"{name or uuid.uuid4().hex}{suffix}")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with timed("upload"), open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"Upload exceeds {max_bytes // (1024 * 1024)} MB limit")
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return path, digest.hexdigest()
+
+
+def check_duration(path: str, max_seconds: float):
+    """
+    Reject recordings longer than max_seconds from the file header alone.
+    Formats soundfile can't probe pass here; decoding caps them instead.
+    """
+    try:
+        duration = sf.info(path).duration
+    except Exception:
+        return
+    if duration > max_seconds:
+        raise UploadRejected(f"Recording is {duration:.0f}s; the limit is {max_seconds:.0f}s")
+
+
+def decode_upload(path: str, max_seconds: float, sr: int = SAMPLE_RATE) -> AudioBuffer:
+    """Decode a saved upload, refusing (without decoding it all) anything over max_seconds"""
+    check_duration(path, max_seconds)
+    with timed("decode"):
+        try:
+            buffer = AudioBuffer.from_file(path, sr, max_seconds=max_seconds + 1.0)
+        except Exception as e:
+            raise UploadRejected(f"Could not decode the upload as audio: {type(e).__name__}", status_code=415) from e
+    if buffer.duration > max_seconds:
+        raise UploadRejected(f"Recording is longer than the {max_seconds:.0f}s limit")
+    return buffer
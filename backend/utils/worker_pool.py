@@ -0,0 +1,112 @@
+# backend/utils/worker_pool.py
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Callable
+
+
+class PoolSaturated(Exception):
+    """Raised when a request cannot be admitted to the worker pool"""
+
+    def __init__(self, message: str, status_code: int = 503, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class WorkerPool:
+    """
+    Bounded executor for blocking model stages.
+
+    Requests are admitted with `admit()`: at most `max_concurrency` run at
+    once and at most `queue_depth` wait for a slot. A full queue is
+    rejected immediately (429), a request that waits longer than
+    `queue_timeout` seconds is rejected with 503. Admitted requests push
+    their blocking calls off the event loop with `run()`.
+
+    kind="thread" suits the in-process models (torch releases the GIL);
+    kind="process" only works for picklable, module-level callables.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 2,
+        queue_depth: int = 8,
+        queue_timeout: float = 30.0,
+        kind: str = "thread",
+        max_workers: int = None
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_depth = max(0, queue_depth)
+        self.queue_timeout = queue_timeout
+        self.kind = kind
+
+        workers = max_workers or self.max_concurrency
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._pending = 0   # admitted + waiting
+        self._active = 0    # holding a slot
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return self._pending - self._active
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self.max_concurrency + self.queue_depth
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+        }
+
+    @asynccontextmanager
+    async def admit(self):
+        """Reserve a slot for one request, or raise PoolSaturated"""
+        if self.saturated:
+            raise PoolSaturated(f"{self.name} queue is full", status_code=429)
+
+        self._pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise PoolSaturated(f"{self.name} timed out waiting for a worker", status_code=503)
+
+            self._active += 1
+            try:
+                yield self
+            finally:
+                self._active -= 1
+                self._slots.release()
+        finally:
+            self._pending -= 1
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run a blocking callable on the executor"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        if self.kind == "thread":
+            # Carry the request context over, so stages timed in the thread reach its Server-Timing
+            call = functools.partial(contextvars.copy_context().run, call)
+        return await loop.run_in_executor(self._executor, call)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,97 @@
+# scripts/download_models.py
+"""
+Download the emotion classifiers and prepare an optimized CPU backend.
+
+    python scripts/download_models.py                          # PyTorch weights only
+    python scripts/download_models.py --backend onnx --parity  # export ONNX + parity check
+    python scripts/download_models.py --backend int8 --parity --audio-dir samples/
+
+--parity scores the same inputs with the PyTorch reference and the chosen
+backend and fails (exit code 1) if scores drift more than --max-diff or
+top-1 labels agree less than --min-agreement.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+from config import SAMPLE_RATE
+from models.emotion_detector import AUDIO_EMOTION_MODEL, TEXT_SENTIMENT_MODEL
+from models.inference_backends import BACKENDS, build_classifier, parity_report
+from utils.audio_buffer import AudioBuffer
+
+PARITY_SENTENCES = [
+    "I had a really great day today and I feel amazing.",
+    "Nothing is going right and I just feel tired of everything.",
+    "I'm so angry about how they treated me at work.",
+    "I keep worrying that something bad is going to happen.",
+    "It's a quiet evening and I feel pretty relaxed.",
+    "I went to the store and bought some groceries.",
+    "Wow, I did not expect that at all!",
+    "I don't know how I feel right now.",
+]
+
+
+def synthetic_clips(count: int = 8, seconds: float = 2.0) -> list:
+    """Voiced-like test clips: harmonic tones with vibrato and noise at varied pitch/energy"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    clips = []
+    for i in range(count):
+        f0 = 90 + 30 * i + 10 * np.sin(2 * np.pi * (2 + i % 3) * t)
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        y = sum(np.sin(k * phase) / k for k in range(1, 6))
+        y = (0.05 + 0.05 * i) * y + 0.01 * rng.standard_normal(len(t))
+        clips.append(y.astype(np.float32))
+    return clips
+
+
+def audio_inputs(audio_dir: str = None) -> list:
+    buffers = [AudioBuffer(y) for y in synthetic_clips()]
+    if audio_dir:
+        for path in sorted(Path(audio_dir).glob("*.wav")):
+            buffers.append(AudioBuffer.from_file(path))
+    return [b.as_pipeline_input() for b in buffers]
+
+
+def check(name: str, task: str, model_id: str, backend: str, inputs: list, args) -> bool:
+    reference = build_classifier(task, model_id, backend="pytorch")
+    candidate = build_classifier(task, model_id, backend=backend)
+
+    report = parity_report(candidate, reference, inputs)
+    passed = report["max_abs_diff"] <= args.max_diff and report["top1_agreement"] >= args.min_agreement
+
+    status = "✅" if passed else "❌"
+    print(f"{status} {name} [{backend} vs pytorch]: {report}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS, default="pytorch")
+    parser.add_argument("--parity", action="store_true", help="compare the backend against PyTorch")
+    parser.add_argument("--audio-dir", help="extra .wav files for the audio parity check")
+    parser.add_argument("--max-diff", type=float, default=0.05, help="max absolute score difference")
+    parser.add_argument("--min-agreement", type=float, default=0.95, help="min top-1 label agreement")
+    args = parser.parse_args()
+
+    if not args.parity or args.backend == "pytorch":
+        build_classifier("audio-classification", AUDIO_EMOTION_MODEL, backend=args.backend)
+        build_classifier("sentiment-analysis", TEXT_SENTIMENT_MODEL, backend=args.backend)
+        return
+
+    audio_ok = check(
+        "audio emotion", "audio-classification", AUDIO_EMOTION_MODEL,
+        args.backend, audio_inputs(args.audio_dir), args
+    )
+    text_ok = check(
+        "text sentiment", "sentiment-analysis", TEXT_SENTIMENT_MODEL,
+        args.backend, PARITY_SENTENCES, args
+    )
+    sys.exit(0 if audio_ok and text_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+# scripts/reanalyze_audio.py
+"""
+Re-score a corpus of recordings offline (e.g. after changing FUSION_WEIGHTS).
+
+    python scripts/reanalyze_audio.py recordings/ -o scores.csv
+    python scripts/reanalyze_audio.py manifest.txt -o scores.parquet --transcribe --workers 8
+    python scripts/reanalyze_audio.py recordings/ --db                # write to mood_entries
+
+Input is a directory (searched recursively for audio files) or a manifest:
+one path per line, or a CSV with a `path` column. Relative manifest paths
+resolve against the manifest's directory.
+
+Decoding, VAD and feature extraction run in a multiprocessing pool
+(spawned before the models load); the emotion models run once per
+--batch-size clips in the parent process. With --db, each recording
+keeps one entry keyed by its path, so re-runs update it in place.
+Finished paths are appended to a progress file (--progress, default
+<output>.progress) after each batch is written, so an interrupted run
+picks up where it stopped. Failed files are not recorded and are retried.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+from config import SAMPLE_RATE, EMOTIONS, VAD_ENABLED, EMOTION_BATCH_SIZE
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".ogg", ".m4a", ".webm"}
+
+COLUMNS = (
+    ["path", "duration", "primary_emotion", "confidence"]
+    + [f"score_{emotion}" for emotion in EMOTIONS]
+    + ["transcription"]
+)
+
+_processor = None
+_keep_speech = False
+
+
+def list_inputs(source: str) -> list:
+    """Audio paths from a directory or a manifest file"""
+    source = Path(source)
+    if source.is_dir():
+        return sorted(str(p) for p in source.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS)
+
+    base = source.parent
+    with open(source, newline="") as f:
+        if source.suffix.lower() == ".csv":
+            paths = [row["path"] for row in csv.DictReader(f)]
+        else:
+            paths = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [str(p if Path(p).is_absolute() else base / p) for p in paths]
+
+
+def _init_worker(keep_speech: bool):
+    global _processor, _keep_speech
+    from utils.audio_processor import AudioProcessor
+    _processor = AudioProcessor(sr=SAMPLE_RATE)
+    _keep_speech = keep_speech
+
+
+def prepare(path: str) -> dict:
+    """Worker: decode → VAD segments → prosody features (CPU-bound, no models)"""
+    from utils.audio_buffer import AudioBuffer
+
+    try:
+        audio = AudioBuffer.from_file(path)
+        if VAD_ENABLED:
+            segments = _processor.speech_segments(audio)
+            speech = AudioBuffer.concat(segments)
+        else:
+            segments = _processor.split_segments(audio)
+            speech = audio
+        return {
+            "path": path,
+            "duration": audio.duration,
+            "segments": segments,
+            "speech": speech if _keep_speech else None,  # only Whisper needs it
+            "features": _processor.extract_features(speech),
+        }
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+class CSVSink:
+    def __init__(self, path: Path):
+        self.path = path
+        self.write_header = not path.exists() or path.stat().st_size == 0
+
+    def write(self, rows: list):
+        with open(self.path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            if self.write_header:
+                writer.writeheader()
+                self.write_header = False
+            writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class ParquetSink:
+    """Writes one part file per batch; parts are merged into the output on close"""
+
+    def __init__(self, path: Path):
+        import pandas  # noqa: F401 - fail fast if pandas/pyarrow are missing
+        self.path = path
+        self.parts_dir = path.with_name(path.name + ".parts")
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        self.next_part = len(list(self.parts_dir.glob("part-*.parquet")))
+
+    def write(self, rows: list):
+        import pandas as pd
+        part = self.parts_dir / f"part-{self.next_part:05d}.parquet"
+        pd.DataFrame(rows, columns=COLUMNS).to_parquet(part, index=False)
+        self.next_part += 1
+
+    def close(self):
+        import pandas as pd
+        parts = sorted(self.parts_dir.glob("part-*.parquet"))
+        if parts:
+            pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True).to_parquet(self.path, index=False)
+            print(f"✅ Merged {len(parts)} parts into {self.path}")
+
+
+class DatabaseSink:
+    """
+    One MoodEntry per recording, keyed by its resolved path: new recordings
+    are inserted (timestamped with the file's mtime), re-scored ones updated
+    """
+
+    def __init__(self):
+        from database.database import SessionLocal, init_db
+        init_db()
+        self.SessionLocal = SessionLocal
+        self.updated = 0
+
+    def write(self, rows: list):
+        from database.models import MoodEntry, score_columns
+        from database.rollups import update_rollups
+
+        paths = [str(Path(row["path"]).resolve()) for row in rows]
+        db = self.SessionLocal()
+        try:
+            existing = {
+                entry.audio_path: entry
+                for entry in db.query(MoodEntry).filter(MoodEntry.audio_path.in_(paths))
+            }
+            created = []
+            for path, row in zip(paths, rows):
+                scores = {e: row[f"score_{e}"] for e in EMOTIONS}
+                values = dict(
+                    primary_emotion=row["primary_emotion"],
+                    emotion_scores=json.dumps(scores),
+                    confidence=row["confidence"],
+                    audio_duration=row["duration"],
+                    **score_columns(scores)
+                )
+                if row["transcription"]:
+                    values["transcription"] = row["transcription"]
+
+                entry = existing.get(path)
+                if entry is None:
+                    entry = MoodEntry(
+                        timestamp=datetime.utcfromtimestamp(Path(path).stat().st_mtime),
+                        audio_path=path,
+                        ai_response=None,
+                        response_audio_path=None,
+                        **values
+                    )
+                    db.add(entry)
+                    created.append(entry)
+                else:
+                    for name, value in values.items():
+                        setattr(entry, name, value)
+                    self.updated += 1
+            db.flush()
+            for entry in created:
+                update_rollups(db, entry)
+            db.commit()
+        finally:
+            db.close()
+
+    def close(self):
+        if not self.updated:
+            return
+        # Re-scored entries may have changed emotion: recount the rollups once
+        from database.rollups import rebuild_rollups
+        db = self.SessionLocal()
+        try:
+            rebuild_rollups(db)
+        finally:
+            db.close()
+        print(f"✅ Updated {self.updated} existing entries and rebuilt mood rollups")
+
+
+def make_sink(args):
+    if args.db:
+        return DatabaseSink()
+    output = Path(args.output)
+    if output.suffix.lower() == ".parquet":
+        return ParquetSink(output)
+    return CSVSink(output)
+
+
+def score_batch(prepared: list, detector, transcriber, batch_size: int) -> list:
+    """Models + fusion for one batch of prepared clips → output rows"""
+    transcriptions = None
+    if transcriber is not None:
+        transcriptions = [transcriber.transcribe(item["speech"]) for item in prepared]
+
+    results = detector.detect_batch(
+        [item["segments"] for item in prepared],
+        np.stack([item["features"] for item in prepared]),
+        transcriptions,
+        batch_size=batch_size
+    )
+
+    rows = []
+    for i, (item, result) in enumerate(zip(prepared, results)):
+        row = {
+            "path": item["path"],
+            "duration": round(item["duration"], 3),
+            "primary_emotion": result["primary_emotion"],
+            "confidence": result["confidence"],
+            "transcription": transcriptions[i] if transcriptions else "",
+        }
+        row.update({f"score_{e}": result["scores"][e] for e in EMOTIONS})
+        rows.append(row)
+    return rows
+
+
+def _flush(batch, detector, transcriber, sink, progress, batch_size) -> int:
+    rows = score_batch(batch, detector, transcriber, batch_size)
+    sink.write(rows)
+    # Only after the sink has the rows, so a crash never skips unsaved work
+    progress.write("".join(row["path"] + "\n" for row in rows))
+    progress.flush()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory of recordings or a manifest (.txt / .csv)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("-o", "--output", help="results file (.csv or .parquet)")
+    target.add_argument("--db", action="store_true", help="write results to mood_entries (re-runs update them)")
+    parser.add_argument("--progress", help="progress file (default: <output>.progress)")
+    parser.add_argument("--transcribe", action="store_true", help="run Whisper and include text sentiment")
+    parser.add_argument("--workers", type=int, default=max(1, multiprocessing.cpu_count() - 1))
+    parser.add_argument("--batch-size", type=int, default=max(32, EMOTION_BATCH_SIZE), help="clips per model call")
+    args = parser.parse_args()
+
+    progress_path = Path(args.progress or (f"{args.output}.progress" if args.output else "mood_entries.progress"))
+    done = set(progress_path.read_text().splitlines()) if progress_path.exists() else set()
+
+    paths = [p for p in list_inputs(args.source) if p not in done]
+    print(f"🎧 {len(paths)} recordings to score ({len(done)} already done)")
+    if not paths:
+        return
+
+    scored, failed = 0, 0
+    start = time.perf_counter()
+
+    # Workers are spawned before any model or database connection exists in
+    # this process, so they inherit none of it; they start decoding while
+    # the models load below
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.workers, initializer=_init_worker, initargs=(args.transcribe,)) as pool, \
+            open(progress_path, "a") as progress:
+        items = pool.imap(prepare, paths, chunksize=4)
+
+        from models.emotion_detector import EmotionDetector
+        detector = EmotionDetector()
+        transcriber = None
+        if args.transcribe:
+            from models.transcriber import Transcriber
+            transcriber = Transcriber(pool_size=1)
+        sink = make_sink(args)
+
+        batch = []
+        for item in items:
+            if "error" in item:
+                failed += 1
+                print(f"❌ {item['path']}: {item['error']}")
+            else:
+                batch.append(item)
+
+            if len(batch) >= args.batch_size:
+                scored += _flush(batch, detector, transcriber, sink, progress, args.batch_size)
+                batch = []
+                rate = scored / (time.perf_counter() - start)
+                print(f"   {scored + failed}/{len(paths)} ({rate:.1f} clips/s)")
+
+        if batch:
+            scored += _flush(batch, detector, transcriber, sink, progress, args.batch_size)
+
+    sink.close()
+    print(f"✅ Scored {scored} recordings in {time.perf_counter() - start:.1f}s ({failed} failed)")
+
+
+if __name__ == "__main__":
+    main()